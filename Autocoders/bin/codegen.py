@@ -11,13 +11,17 @@ import os
 import sys
 import time
 import glob
+import imp
 import logging
 import exceptions
+import multiprocessing
 
 from optparse import OptionParser
 
 from utils import Logger
 from utils import ConfigManager
+from utils import DiffAndRename
+from utils import CodegenProfile
 
 
 # Meta-model for Component only generation
@@ -30,6 +34,7 @@ from models import ModelParser
 
 # Parsers to read the XML
 from parsers import XmlParser
+from parsers import XmlCache
 from parsers import XmlComponentParser
 from parsers import XmlPortsParser
 from parsers import XmlSerializeParser
@@ -75,6 +80,14 @@ BUILD_ROOT = None
 # Deployment name from topology XML only
 DEPLOYMENT = None
 
+# Order in which a batch generates XML files, by file name suffix as in
+# mk/src/parsers/mod_mk_parser.py.  Each level may use the code and the
+# parsed XML of the levels before it.
+BATCH_LEVELS = ["SerializableAi.xml", "PortAi.xml", "ComponentAi.xml", "AppAi.xml"]
+
+# Options of a batch, set before its workers are forked
+BATCH_OPT = None
+
 # Version label for now
 class Version:
     id      = "0.1"
@@ -188,6 +201,25 @@ def pinit():
 
     parser.add_option("-r", "--gen_report", dest="gen_report",
         help="Generate reports on component interfaces", action="store_true", default=False)
+
+    parser.add_option("-B", "--batch", dest="batch",
+        help="Batch mode: generate XML files in any directory, serializables, then ports, components and topologies, with a process pool. A dependency file option names a directory, relative to each XML file, for its <name>.dep file (def: False)",
+        action="store_true", default=False)
+
+    parser.add_option("-j", "--jobs", dest="jobs", type="int",
+        help="Number of batch mode worker processes (def: number of CPUs)", default=None)
+
+    parser.add_option("--modules", dest="modules", action="append", default=[],
+        help="Batch mode: also generate the Ai.xml files of the modules of DEPLOYMENT in mk/configs/modules/modules.mk. Requires -b.", metavar="DEPLOYMENT")
+
+    parser.add_option("--suffix", dest="suffixes", action="append", default=[],
+        help="Batch mode: only generate XML files whose name ends with SUFFIX, e.g. ComponentAi.xml")
+
+    parser.add_option("--xml_cache", dest="xml_cache", type="string", default=None,
+        help="File of the content hashes of XML files already validated against their schema. Only XML not in it is validated, and newly validated XML is added to it.", metavar="FILE")
+
+    parser.add_option("--profile", dest="profile", action="store_true", default=False,
+        help="Report the time spent in each visitor and model query (def: False)")
 #    author = os.environ['USER']
 #    parser.add_option("-a", "--author", dest="author", type="string",
 #        help="Specify the new FSW author (def: %s)." % author,
@@ -281,14 +313,10 @@ def generate_topology(the_parsed_topology_xml, xml_filename, opt):
 #                         PRINT.info("Channel {} of component type {} has the same abbreviation ({}) as channel {} of component type {}. Please make the abbreviations unique.".format(chan.get_name() , parsed_xml_type , chan.get_abbrev() , abbrev_dictionary[chan.get_abbrev()][0] , abbrev_dictionary[chan.get_abbrev()][1]))
 #                         raise Exception()
         #
-        # Hack to set up deployment path for instanced dictionaries (if one exists remove old one)
+        # Hack to set up deployment path for instanced dictionaries (stale files of the old one are removed below)
         #
         os.environ["DICT_DIR"] = BUILD_ROOT + os.sep + "Gse/generated" + os.sep + DEPLOYMENT
         dict_dir = os.environ["DICT_DIR"]
-        PRINT.info("Removing old instanced topology dictionaries in: %s", dict_dir)
-        import shutil
-        if os.path.exists(dict_dir):
-            shutil.rmtree(dict_dir)
         PRINT.info("Overriding for instanced topology dictionaries the --dict_dir option with xml derived path: %s", dict_dir)    
         #
         xml_list = []         
@@ -299,6 +327,10 @@ def generate_topology(the_parsed_topology_xml, xml_filename, opt):
             xml_list.append(parsed_xml_dict[parsed_xml_type])
             generate_component_instance_dictionary(parsed_xml_dict[parsed_xml_type] , opt , topology_model)
 
+        # Unchanged dictionaries were left alone; remove those not generated this time
+        PRINT.info("Removing old instanced topology dictionaries in: %s", dict_dir)
+        DiffAndRename.removeUnwritten(dict_dir)
+
         topology_model.set_instance_xml_list(xml_list)
     
     initFiles   = generator.create("initFiles")
@@ -347,7 +379,7 @@ def generate_component_instance_dictionary(the_parsed_component_xml , opt , topo
         if not os.path.exists(port_file):
             PRINT.info("ERROR: Port xml specification file %s does not exist!" % port_file)
             sys.exit(-1)
-        xml_parser_obj = XmlPortsParser.XmlPortsParser(port_file)
+        xml_parser_obj = XmlCache.parse(XmlPortsParser.XmlPortsParser, port_file)
         #print xml_parser_obj.get_args()
         parsed_port_xml_list.append(xml_parser_obj)
         del(xml_parser_obj)
@@ -360,7 +392,7 @@ def generate_component_instance_dictionary(the_parsed_component_xml , opt , topo
         if not os.path.exists(serializable_file):
             PRINT.info("ERROR: Serializable xml specification file %s does not exist!" % serializable_file)
             sys.exit(-1)
-        xml_parser_obj = XmlSerializeParser.XmlSerializeParser(serializable_file) # Telemetry/Params can only use generated serializable types
+        xml_parser_obj = XmlCache.parse(XmlSerializeParser.XmlSerializeParser, serializable_file) # Telemetry/Params can only use generated serializable types
         # check to make sure that the serializables don't have things that channels and parameters can't have
         # can't have external non-xml members
         if len(xml_parser_obj.get_include_header_files()):
@@ -446,7 +478,7 @@ def generate_component(the_parsed_component_xml, xml_filename, opt , topology_mo
 
     parsed_port_xml_list = []
     if opt.gen_report:
-        report_file = open("%sReport.txt"%xml_filename.replace("Ai.xml",""),"w")
+        report_file = DiffAndRename.WriteIfChanged("%sReport.txt"%xml_filename.replace("Ai.xml",""))
         num_input_ports = 0
         num_output_ports = 0
         
@@ -511,6 +543,7 @@ def generate_component(the_parsed_component_xml, xml_filename, opt , topology_mo
                 for id in parameter.get_ids():
                     idList += id + ","
             report_file.write("Parameters: %d\n ParamIds: %s\n"%(parameters,idList[:-1]))
+        report_file.close()
     #
     # Configure the meta-model for the component
     #        
@@ -524,7 +557,7 @@ def generate_component(the_parsed_component_xml, xml_filename, opt , topology_mo
         if not os.path.exists(port_file):
             PRINT.info("ERROR: Port xml specification file %s does not exist!" % port_file)
             sys.exit(-1)
-        xml_parser_obj = XmlPortsParser.XmlPortsParser(port_file)
+        xml_parser_obj = XmlCache.parse(XmlPortsParser.XmlPortsParser, port_file)
         #print xml_parser_obj.get_args()
         parsed_port_xml_list.append(xml_parser_obj)
         del(xml_parser_obj)
@@ -541,7 +574,7 @@ def generate_component(the_parsed_component_xml, xml_filename, opt , topology_mo
         if not os.path.exists(serializable_file):
             PRINT.info("ERROR: Serializable xml specification file %s does not exist!" % serializable_file)
             sys.exit(-1)
-        xml_parser_obj = XmlSerializeParser.XmlSerializeParser(serializable_file) # Telemetry/Params can only use generated serializable types
+        xml_parser_obj = XmlCache.parse(XmlSerializeParser.XmlSerializeParser, serializable_file) # Telemetry/Params can only use generated serializable types
         # check to make sure that the serializables don't have things that channels and parameters can't have
         # can't have external non-xml members
         if len(xml_parser_obj.get_include_header_files()):
@@ -944,7 +977,7 @@ def generate_dependency_file(filename, target_file, subst_path, parser, type):
     
             
     # open dependency file
-    dep_file = open(filename,'w')
+    dep_file = DiffAndRename.WriteIfChanged(filename)
     # get working directory and normalize path
     target_directory = os.getcwd().replace('\\','/')
     target_file_local = target_file.replace('\\','/').replace("Ai.xml","Ac.cpp")
@@ -999,6 +1032,179 @@ def generate_dependency_file(filename, target_file, subst_path, parser, type):
     # close file
     dep_file.close()
     
+def process_xml(xml_filename, opt, dependency_file=None):
+    """
+    Generate the code of one XML file in the current directory.
+    Returns False if the XML type is not supported.
+    """
+    global DEPLOYMENT
+
+    xml_type = XmlParser.XmlParser(xml_filename)()
+
+    if xml_type == "component":
+        DEBUG.info("Detected Component XML so Generating Component C++ Files...")
+        the_parsed_component_xml = XmlComponentParser.XmlComponentParser(xml_filename)
+        generate_component(the_parsed_component_xml, xml_filename, opt)
+        dependency_parser = the_parsed_component_xml
+    elif xml_type == "interface":
+        DEBUG.info("Detected Port type XML so Generating Port type C++ Files...")
+        the_parsed_port_xml = XmlPortsParser.XmlPortsParser(xml_filename)
+        generate_port(the_parsed_port_xml, xml_filename)
+        dependency_parser = the_parsed_port_xml
+    elif xml_type == "serializable":
+        DEBUG.info("Detected Serializable XML so Generating Serializable C++ Files...")
+        the_serial_xml = XmlSerializeParser.XmlSerializeParser(xml_filename)
+        generate_serializable(the_serial_xml,opt)
+        dependency_parser = the_serial_xml
+    elif xml_type == "assembly" or xml_type == "deployment":
+        DEBUG.info("Detected Topology XML so Generating Topology C++ Files...")
+        the_parsed_topology_xml = XmlTopologyParser.XmlTopologyParser(xml_filename)
+        DEPLOYMENT = the_parsed_topology_xml.get_deployment()
+        print "Found assembly or deployment named: %s\n" % DEPLOYMENT
+        generate_topology(the_parsed_topology_xml, xml_filename, opt)
+        dependency_parser = the_parsed_topology_xml
+    else:
+        PRINT.info("Invalid XML found...this format not supported")
+        return False
+
+    if dependency_file != None:
+        if opt.build_root_flag:
+            generate_dependency_file(dependency_file, xml_filename, BUILD_ROOT, dependency_parser,xml_type)
+    return True
+
+
+def module_xml_files(deployment):
+    """
+    Return the Ai.xml files in the SRC lists of the mod.mk of every module
+    of a deployment in mk/configs/modules/modules.mk.
+    """
+    # Not importable by package, mk/src/parsers clashes with the Autocoders parsers
+    variable_list_parser = imp.load_source("variable_list_parser",
+        BUILD_ROOT + "/mk/src/parsers/variable_list_parser.py")
+
+    modules_file = BUILD_ROOT + "/mk/configs/modules/modules.mk"
+    modules = variable_list_parser.VariableListParser(modules_file, ":=").variable_dictionary
+    if deployment + "_MODULES" not in modules:
+        PRINT.info("ERROR: No %s_MODULES in %s" % (deployment, modules_file))
+        sys.exit(-1)
+
+    xml_files = []
+    for module in modules[deployment + "_MODULES"].split():
+        module_dir = BUILD_ROOT + os.sep + module
+        variables = variable_list_parser.VariableListParser(module_dir + os.sep + "mod.mk").variable_dictionary
+        for (name, value) in sorted(variables.items()):
+            if not name.startswith("SRC"):
+                continue
+            for f in value.split():
+                if f.endswith("Ai.xml"):
+                    xml_files.append(module_dir + os.sep + f)
+    return xml_files
+
+
+def batch_level(xml_filename):
+    """
+    Index in BATCH_LEVELS of an XML file, or None if it is of no level.
+    """
+    for level, suffix in enumerate(BATCH_LEVELS):
+        if xml_filename.endswith(suffix):
+            return level
+    return None
+
+
+def generate_batch_file(xml_filename):
+    """
+    Pool worker: generate one XML file of a batch in its own directory.
+    Returns (xml_filename, error message or None, seconds, profile totals).
+    """
+    start = time.time()
+    error = None
+    try:
+        os.chdir(os.path.dirname(xml_filename))
+        name = os.path.basename(xml_filename)
+        dependency_file = None
+        if BATCH_OPT.dependency_file != None:
+            dependency_dir = os.path.abspath(BATCH_OPT.dependency_file)
+            if not os.path.isdir(dependency_dir):
+                os.makedirs(dependency_dir)
+            dependency_file = dependency_dir + os.sep + os.path.splitext(name)[0] + ".dep"
+        if not process_xml(name, BATCH_OPT, dependency_file):
+            error = "unsupported XML type"
+    except SystemExit, e:
+        error = "exited with status %s" % e.code
+    except Exception, e:
+        error = "%s: %s" % (type(e).__name__, e)
+    XmlCache.save()
+    profile = CodegenProfile.totals()
+    CodegenProfile.reset()
+    return (xml_filename, error, time.time() - start, profile)
+
+
+def generate_batch(xml_filenames, opt):
+    """
+    Generate a batch of XML files in level order.  The files of a level
+    are generated by a pool of worker processes forked once the XML of the
+    earlier levels is parsed, so every worker shares it.  Returns False if
+    any file failed.
+    """
+    global BATCH_OPT
+
+    xml_filenames = [os.path.abspath(f) for f in xml_filenames]
+    for deployment in opt.modules:
+        if BUILD_ROOT == None:
+            PRINT.info("ERROR: --modules requires the -b option.")
+            sys.exit(-1)
+        xml_filenames += module_xml_files(deployment)
+    if opt.suffixes:
+        xml_filenames = [f for f in xml_filenames if [s for s in opt.suffixes if f.endswith(s)]]
+
+    levels = [[] for l in BATCH_LEVELS]
+    seen = set()
+    for xml_filename in xml_filenames:
+        if xml_filename in seen:
+            continue
+        seen.add(xml_filename)
+        level = batch_level(xml_filename)
+        if level == None:
+            PRINT.info("ERROR: %s is not a serializable, port, component or topology XML file." % xml_filename)
+            return False
+        levels[level].append(xml_filename)
+
+    BATCH_OPT = opt
+    jobs = opt.jobs or multiprocessing.cpu_count()
+    ok = True
+    start = time.time()
+    for level, files in enumerate(levels):
+        if not files:
+            continue
+        if jobs > 1 and len(files) > 1:
+            pool = multiprocessing.Pool(min(jobs, len(files)))
+            results = pool.map(generate_batch_file, files, 1)
+            pool.close()
+            pool.join()
+        else:
+            results = map(generate_batch_file, files)
+        for (xml_filename, error, seconds, profile) in results:
+            CodegenProfile.merge(profile)
+            if error != None:
+                PRINT.info("ERROR: %s: %s" % (xml_filename, error))
+                ok = False
+            DEBUG.info("Generated %s in %.2f seconds" % (xml_filename, seconds))
+        if not ok:
+            break
+        # Share the parsed serializables, ports and components with the next levels
+        for xml_filename in files:
+            if level == 0:
+                XmlCache.parse(XmlSerializeParser.XmlSerializeParser, xml_filename)
+            elif level == 1:
+                XmlCache.parse(XmlPortsParser.XmlPortsParser, xml_filename)
+            elif level == 2:
+                XmlCache.parse(XmlComponentParser.XmlComponentParser, xml_filename)
+
+    XmlCache.save()
+    PRINT.info("Generated %d XML files in %.2f seconds" % (len(seen), time.time() - start))
+    return ok
+
+
 def main():
     """
     Main program.
@@ -1058,7 +1264,7 @@ def main():
     #
     #  Parse the input Component XML file and create internal meta-model
     #
-    if len(args) == 0:
+    if len(args) == 0 and not opt.modules:
         PRINT.info("Usage: %s [options] xml_filename" % sys.argv[0])
         return
     else:
@@ -1076,41 +1282,22 @@ def main():
             ModelParser.BUILD_ROOT = BUILD_ROOT
             #PRINT.info("BUILD_ROOT set to %s"%BUILD_ROOT)
    
-    for xml_filename in xml_filenames:       
-        
-        xml_filename = os.path.basename(xml_filename)
-        xml_type = XmlParser.XmlParser(xml_filename)()
-
-        if xml_type == "component":
-            DEBUG.info("Detected Component XML so Generating Component C++ Files...")
-            the_parsed_component_xml = XmlComponentParser.XmlComponentParser(xml_filename)
-            generate_component(the_parsed_component_xml, xml_filename, opt)
-            dependency_parser = the_parsed_component_xml
-        elif xml_type == "interface":
-            DEBUG.info("Detected Port type XML so Generating Port type C++ Files...")
-            the_parsed_port_xml = XmlPortsParser.XmlPortsParser(xml_filename)
-            generate_port(the_parsed_port_xml, xml_filename)
-            dependency_parser = the_parsed_port_xml
-        elif xml_type == "serializable":
-            DEBUG.info("Detected Serializable XML so Generating Serializable C++ Files...")
-            the_serial_xml = XmlSerializeParser.XmlSerializeParser(xml_filename)
-            generate_serializable(the_serial_xml,opt)
-            dependency_parser = the_serial_xml
-        elif xml_type == "assembly" or xml_type == "deployment":
-            DEBUG.info("Detected Topology XML so Generating Topology C++ Files...")
-            the_parsed_topology_xml = XmlTopologyParser.XmlTopologyParser(xml_filename)
-            DEPLOYMENT = the_parsed_topology_xml.get_deployment()
-            print "Found assembly or deployment named: %s\n" % DEPLOYMENT
-            generate_topology(the_parsed_topology_xml, xml_filename, opt)
-            dependency_parser = the_parsed_topology_xml
-        else:
-            PRINT.info("Invalid XML found...this format not supported")
-            ERROR=True
-            
-        if opt.dependency_file != None:
-            if opt.build_root_flag:
-                generate_dependency_file(opt.dependency_file, xml_filename, BUILD_ROOT, dependency_parser,xml_type)
-        
+    if opt.profile:
+        CodegenProfile.enable()
+
+    if opt.xml_cache != None:
+        XmlCache.load(os.path.abspath(opt.xml_cache))
+
+    if opt.batch:
+        ERROR = not generate_batch(xml_filenames, opt)
+    else:
+        for xml_filename in xml_filenames:
+            xml_filename = os.path.basename(xml_filename)
+            if not process_xml(xml_filename, opt, opt.dependency_file):
+                ERROR = True
+        XmlCache.save()
+
+    CodegenProfile.report()
 
     # Always return to directory where we started.
     os.chdir(starting_directory)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+#===============================================================================
+# NAME: objGraphCheck.py
+#
+# DESCRIPTION: Compares the object graph dumped by Fw::SimpleObjRegistry
+#              (serializeGraph() or dumpGraph(), JSON or CSV) from a running
+#              deployment with the connections of its topology XML.
+#
+#              Autocoded ports are named "<object>_<port>_OutputPort[<num>]"
+#              and "<object>_<port>_InputPort[<num>]", where <object> is the
+#              name the component instance was constructed with.  Use -n to
+#              map topology instance names to object names where they differ,
+#              e.g. -n recvBuffComp=RBC.
+#
+# USAGE: objGraphCheck.py [-n INSTANCE=OBJECT ...] TopologyAppAi.xml graph.json
+#
+# Copyright 2015, California Institute of Technology.
+# ALL RIGHTS RESERVED. U.S. Government Sponsorship acknowledged.
+#===============================================================================
+#
+# Python standard modules
+#
+import sys
+import json
+from optparse import OptionParser
+from xml.etree import ElementTree
+
+
+def read_graph(graph_file):
+    """
+    Return the set of (source, target) connections of a dumped object graph.
+    """
+    text = open(graph_file).read()
+    if text.lstrip().startswith("{"):
+        graph = json.loads(text)
+        return set([(str(source), str(target)) for (source, target) in graph["connections"]])
+    connections = set()
+    for line in text.splitlines():
+        fields = line.strip().split(",")
+        if fields[0] == "connection":
+            connections.add((fields[1], fields[2]))
+    return connections
+
+
+def read_topology(topology_file, names):
+    """
+    Return the set of (source, target) port object names of the connections
+    in a topology XML.
+    @param names: dictionary of instance name to object name
+    """
+    connections = set()
+    root = ElementTree.parse(topology_file).getroot()
+    for connection in root.iter("connection"):
+        source = connection.find("source").attrib
+        target = connection.find("target").attrib
+        connections.add((
+            "%s_%s_OutputPort[%s]" % (names.get(source["component"], source["component"]), source["port"], source["num"]),
+            "%s_%s_InputPort[%s]" % (names.get(target["component"], target["component"]), target["port"], target["num"])))
+    return connections
+
+
+def main():
+    parser = OptionParser(usage="%prog [options] TopologyAppAi.xml graph",
+                          description="Compare a Fw::SimpleObjRegistry object graph with a topology XML")
+    parser.add_option("-n", "--name", dest="names", action="append", default=[],
+                      help="Object name of a topology instance, as INSTANCE=OBJECT (repeatable)")
+    (opts, args) = parser.parse_args(sys.argv[1:])
+    if len(args) != 2:
+        parser.error("A topology XML and an object graph file are required")
+
+    names = dict()
+    for name in opts.names:
+        if "=" not in name:
+            parser.error("Bad name mapping %s, expected INSTANCE=OBJECT" % name)
+        (instance, obj) = name.split("=", 1)
+        names[instance] = obj
+
+    expected = read_topology(args[0], names)
+    actual = read_graph(args[1])
+
+    for (source, target) in sorted(expected - actual):
+        print "Missing:    %s -> %s" % (source, target)
+    for (source, target) in sorted(actual - expected):
+        print "Unexpected: %s -> %s" % (source, target)
+    print "%d connections in topology, %d in graph, %d matching" % (len(expected), len(actual), len(expected & actual))
+
+    if expected != actual:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -24,6 +24,7 @@ import logging
 
 from utils import Logger
 from utils import ConfigManager
+from utils import CodegenProfile
 
 from visitors import ComponentCppVisitor
 from visitors import ComponentHVisitor
@@ -322,6 +323,8 @@ class GenFactory:
             return None
 
         self._addVisitor(code_section_generator, project_visitor_list)
+        if CodegenProfile.ENABLED:
+            self._profileAccept(code_section_generator, the_type)
 
         return code_section_generator
 
@@ -389,6 +392,20 @@ class GenFactory:
         for v in visitor_list:
             type_obj.addVisitor(v)
 
+
+    def _profileAccept(self, type_obj, the_type):
+        """
+        Time each visitor call of a created object with CodegenProfile.
+        @param type_obj: input element object instance.
+        @param the_type: code section name of the object.
+        """
+        accept = type_obj.accept
+        def timed_accept(visitor):
+            start = CodegenProfile.start()
+            accept(visitor)
+            CodegenProfile.add("visitor", "%s.%s" % (visitor.__class__.__name__, the_type), start)
+        type_obj.accept = timed_accept
+
 def main():
 
     # Configures output only to stdout.
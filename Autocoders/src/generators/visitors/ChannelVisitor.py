@@ -28,7 +28,7 @@ from optparse import OptionParser
 #from utils import version
 from utils import ConfigManager
 from models import ModelParser
-#from utils import DiffAndRename
+from utils import DiffAndRename
 from utils import DictTypeConverter
 from generators.visitors import AbstractVisitor
 from generators import formatters
@@ -77,7 +77,7 @@ class ChannelVisitor(AbstractVisitor.AbstractVisitor):
         DEBUG.debug('ChannelVisitor:%s' % visit_str)
         DEBUG.debug('===================================')
         DEBUG.debug(c)
-        fp.writelines(c.__str__())
+        fp.write(c.__str__())
         DEBUG.debug('===================================')     
         
         
@@ -98,7 +98,7 @@ class ChannelVisitor(AbstractVisitor.AbstractVisitor):
         
         if len(obj.get_ids()) == 1:
             pyfile = "%s/%s.py" % (output_dir,obj.get_name())
-            fd = open(pyfile,'w')
+            fd = DiffAndRename.WriteIfChanged(pyfile)
             if fd == None:
                 raise Exception("Could not open %s file." % pyfile)
             self.__fp.append(fd)
@@ -108,7 +108,7 @@ class ChannelVisitor(AbstractVisitor.AbstractVisitor):
                 pyfile = "%s/%s_%d.py" % (output_dir,obj.get_name(),inst)
                 inst+= 1
                 DEBUG.info('Open file: %s' % pyfile)
-                fd = open(pyfile,'w')
+                fd = DiffAndRename.WriteIfChanged(pyfile)
                 if fd == None:
                     raise Exception("Could not open %s file." % pyfile)
                 DEBUG.info('Completed %s open'%pyfile)
@@ -32,7 +32,7 @@ from models import Command
 from models import Parameter
 from utils import DictTypeConverter
 
-#from utils import DiffAndRename
+from utils import DiffAndRename
 from generators.visitors import AbstractVisitor
 from generators import formatters
 #
@@ -80,7 +80,7 @@ class CommandVisitor(AbstractVisitor.AbstractVisitor):
         DEBUG.debug('CommandVisitor:%s' % visit_str)
         DEBUG.debug('===================================')
         DEBUG.debug(c)
-        fp.writelines(c.__str__())
+        fp.write(c.__str__())
         DEBUG.debug('===================================')     
         
         
@@ -106,7 +106,7 @@ class CommandVisitor(AbstractVisitor.AbstractVisitor):
             
             if len(obj.get_opcodes()) == 1:
                 pyfile = "%s/%s.py" % (output_dir,obj.get_mnemonic())
-                fd = open(pyfile,'w')
+                fd = DiffAndRename.WriteIfChanged(pyfile)
                 if fd == None:
                     raise Exception("Could not open %s file." % pyfile)
                 self.__fp1.append(fd)
@@ -116,7 +116,7 @@ class CommandVisitor(AbstractVisitor.AbstractVisitor):
                     pyfile = "%s/%s_%d.py" % (output_dir,obj.get_mnemonic(),inst)
                     inst+= 1
                     DEBUG.info('Open file: %s' % pyfile)
-                    fd = open(pyfile,'w')
+                    fd = DiffAndRename.WriteIfChanged(pyfile)
                     if fd == None:
                         raise Exception("Could not open %s file." % pyfile)
                     DEBUG.info('Completed %s open'%pyfile)
@@ -132,13 +132,13 @@ class CommandVisitor(AbstractVisitor.AbstractVisitor):
                 if len(obj.get_set_opcodes()) != len(obj.get_save_opcodes()):
                     raise Exception("set/save opcode quantities do not match!")
                 pyfile = "%s/%s_PRM_SET.py" %(output_dir,self.__stem)
-                fd = open(pyfile,'w')
+                fd = DiffAndRename.WriteIfChanged(pyfile)
                 if fd == None:
                     raise Exception("Could not open %s file." % pyfile)
                 self.__fp1.append(fd)
 
                 pyfile = "%s/%s_PRM_SAVE.py" %(output_dir,self.__stem)
-                fd = open(pyfile,'w')
+                fd = DiffAndRename.WriteIfChanged(pyfile)
                 if fd == None:
                     raise Exception("Could not open %s file." % pyfile)
                 self.__fp2.append(fd)
@@ -147,7 +147,7 @@ class CommandVisitor(AbstractVisitor.AbstractVisitor):
                 for opcode in obj.get_set_opcodes():
                     pyfile = "%s/%s_%d_PRM_SET.py" %(output_dir,self.__stem,inst)
                     DEBUG.info('Open file: %s' % pyfile)
-                    fd = open(pyfile,'w')
+                    fd = DiffAndRename.WriteIfChanged(pyfile)
                     if fd == None:
                         raise Exception("Could not open %s file." % pyfile)
                     self.__fp1.append(fd)
@@ -155,7 +155,7 @@ class CommandVisitor(AbstractVisitor.AbstractVisitor):
                     
                     pyfile = "%s/%s_%d_PRM_SAVE.py" %(output_dir,self.__stem,inst)
                     DEBUG.info('Open file: %s' % pyfile)
-                    fd = open(pyfile,'w')
+                    fd = DiffAndRename.WriteIfChanged(pyfile)
                     if fd == None:
                         raise Exception("Could not open %s file." % pyfile)
                     self.__fp2.append(fd)
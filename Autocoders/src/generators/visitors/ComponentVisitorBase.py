@@ -26,6 +26,7 @@ from optparse import OptionParser
 # Python extention modules and custom interfaces
 #
 from utils import ConfigManager
+from utils import DiffAndRename
 from models import ModelParser
 from generators.visitors import AbstractVisitor
 from generators import formatters
@@ -59,7 +60,7 @@ class ComponentVisitorBase(AbstractVisitor.AbstractVisitor):
         DEBUG.debug('ComponentVisitorBase:%s' % visit_str)
         DEBUG.debug('===================================')
         DEBUG.debug(c)
-        self.__fp.writelines(c.__str__())
+        self.__fp.write(c.__str__())
         DEBUG.debug('===================================')     
         
     def argsString(self, args):
@@ -863,7 +864,7 @@ class ComponentVisitorBase(AbstractVisitor.AbstractVisitor):
         Open the file for writing
         '''
         DEBUG.info('Open file: %s' % filename)
-        self.__fp = open(filename,'w')
+        self.__fp = DiffAndRename.WriteIfChanged(filename)
         if self.__fp == None:
             raise "Could not open file %s" % filename
         DEBUG.info('Completed')
@@ -29,7 +29,7 @@ from optparse import OptionParser
 from utils import ConfigManager
 from models import ModelParser
 from utils import DictTypeConverter
-#from utils import DiffAndRename
+from utils import DiffAndRename
 from generators.visitors import AbstractVisitor
 from generators import formatters
 #
@@ -76,7 +76,7 @@ class EventVisitor(AbstractVisitor.AbstractVisitor):
         DEBUG.debug('EventVisitor:%s' % visit_str)
         DEBUG.debug('===================================')
         DEBUG.debug(c)
-        fp.writelines(c.__str__())
+        fp.write(c.__str__())
         DEBUG.debug('===================================')     
         
     def DictStartVisit(self, obj):
@@ -95,7 +95,7 @@ class EventVisitor(AbstractVisitor.AbstractVisitor):
         
         if len(obj.get_ids()) == 1:
             pyfile = "%s/%s.py" % (output_dir,obj.get_name())
-            fd = open(pyfile,'w')
+            fd = DiffAndRename.WriteIfChanged(pyfile)
             if fd == None:
                 raise Exception("Could not open %s file." % pyfile)
             self.__fp.append(fd)
@@ -105,7 +105,7 @@ class EventVisitor(AbstractVisitor.AbstractVisitor):
                 pyfile = "%s/%s_%d.py" % (output_dir,obj.get_name(),inst)
                 inst+= 1
                 DEBUG.info('Open file: %s' % pyfile)
-                fd = open(pyfile,'w')
+                fd = DiffAndRename.WriteIfChanged(pyfile)
                 if fd == None:
                     raise Exception("Could not open %s file." % pyfile)
                 DEBUG.info('Completed %s open'%pyfile)
@@ -54,3 +54,5 @@ class HtmlDocVisitor(ComponentVisitorBase.ComponentVisitorBase):
         c = HtmlDocPage.HtmlDocPage()
         self.init(obj, c)
         self._writeTmpl(c, "htmlPage")
+        # The page is complete, so do not wait for exit to flush it
+        self.finishSourceFilesVisit(obj)
@@ -28,7 +28,7 @@ from optparse import OptionParser
 #from utils import version
 from utils import ConfigManager
 from models import ModelParser
-#from utils import DiffAndRename
+from utils import DiffAndRename
 from utils import DictTypeConverter
 from generators.visitors import AbstractVisitor
 from generators import formatters
@@ -77,7 +77,7 @@ class InstanceChannelVisitor(AbstractVisitor.AbstractVisitor):
         DEBUG.debug('ChannelVisitor:%s' % visit_str)
         DEBUG.debug('===================================')
         DEBUG.debug(c)
-        fp.writelines(c.__str__())
+        fp.write(c.__str__())
         DEBUG.debug('===================================')     
         
         
@@ -92,8 +92,8 @@ class InstanceChannelVisitor(AbstractVisitor.AbstractVisitor):
         output_dir = os.environ["DICT_DIR"] + "/channels"
         if not (os.path.isdir(output_dir)):
             os.makedirs(output_dir)
-            init_file = output_dir + os.sep + "__init__.py"
-            open(init_file, "w+")
+        # make empty __init__.py
+        DiffAndRename.WriteIfChanged(output_dir + os.sep + "__init__.py").close()
             
         self.__fp = {}
         
@@ -112,7 +112,7 @@ class InstanceChannelVisitor(AbstractVisitor.AbstractVisitor):
                 fname = "{}_{}".format(instance_obj[0] , obj.get_name())
             pyfile = "{}/{}.py".format(output_dir , fname)
             DEBUG.info('Open file: {}'.format(pyfile))
-            fd = open(pyfile,'w')
+            fd = DiffAndRename.WriteIfChanged(pyfile)
             if fd == None:
                 raise Exception("Could not open {} file.".format(pyfile))
             DEBUG.info('Completed {} open'.format(pyfile))
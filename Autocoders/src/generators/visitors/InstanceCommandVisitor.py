@@ -32,7 +32,7 @@ from models import Command
 from models import Parameter
 from utils import DictTypeConverter
 
-#from utils import DiffAndRename
+from utils import DiffAndRename
 from generators.visitors import AbstractVisitor
 from generators import formatters
 #
@@ -80,7 +80,7 @@ class InstanceCommandVisitor(AbstractVisitor.AbstractVisitor):
         DEBUG.debug('InstanceCommandVisitor:%s' % visit_str)
         DEBUG.debug('===================================')
         DEBUG.debug(c)
-        fp.writelines(c.__str__())
+        fp.write(c.__str__())
         DEBUG.debug('===================================')     
         
         
@@ -95,8 +95,8 @@ class InstanceCommandVisitor(AbstractVisitor.AbstractVisitor):
         output_dir = os.environ["DICT_DIR"] + "/commands"
         if not (os.path.isdir(output_dir)):
             os.makedirs(output_dir)
-            init_file = output_dir + os.sep + "__init__.py"
-            open(init_file, "w+")
+        # make empty __init__.py
+        DiffAndRename.WriteIfChanged(output_dir + os.sep + "__init__.py").close()
         
         try:
             instance_obj_list = topology_model.get_base_id_dict()[obj.get_component_base_name()]
@@ -123,7 +123,7 @@ class InstanceCommandVisitor(AbstractVisitor.AbstractVisitor):
                     fname = "{}_{}".format(instance_obj[0] , obj.get_mnemonic())
                 pyfile = "{}/{}.py".format(output_dir , fname)
                 DEBUG.info('Open file: {}'.format(pyfile))
-                fd = open(pyfile,'w')
+                fd = DiffAndRename.WriteIfChanged(pyfile)
                 if fd == None:
                     raise Exception("Could not open {} file.".format(pyfile))
                 DEBUG.info('Completed {} open'.format(pyfile))
@@ -146,7 +146,7 @@ class InstanceCommandVisitor(AbstractVisitor.AbstractVisitor):
                     fname = "{}_{}".format(instance_obj[0] , self.__stem)
                 pyfile = "{}/{}_PRM_SET.py".format(output_dir,fname)
                 DEBUG.info('Open file: {}'.format(pyfile))
-                fd = open(pyfile,'w')
+                fd = DiffAndRename.WriteIfChanged(pyfile)
                 if fd == None:
                     raise Exception("Could not open {} file.".format(pyfile))
                 self.__fp1[fname] = fd
@@ -154,7 +154,7 @@ class InstanceCommandVisitor(AbstractVisitor.AbstractVisitor):
                 
                 pyfile = "{}/{}_PRM_SAVE.py".format(output_dir,fname)
                 DEBUG.info('Open file: {}'.format(pyfile))
-                fd = open(pyfile,'w')
+                fd = DiffAndRename.WriteIfChanged(pyfile)
                 if fd == None:
                     raise Exception("Could not open {} file.".format(pyfile))
                 self.__fp2[fname] = fd
@@ -29,7 +29,7 @@ from optparse import OptionParser
 from utils import ConfigManager
 from models import ModelParser
 from utils import DictTypeConverter
-#from utils import DiffAndRename
+from utils import DiffAndRename
 from generators.visitors import AbstractVisitor
 from generators import formatters
 #
@@ -76,7 +76,7 @@ class InstanceEventVisitor(AbstractVisitor.AbstractVisitor):
         DEBUG.debug('InstanceEventVisitor:%s' % visit_str)
         DEBUG.debug('===================================')
         DEBUG.debug(c)
-        fp.writelines(c.__str__())
+        fp.write(c.__str__())
         DEBUG.debug('===================================')     
        
     def DictStartVisit(self, obj , topology_model): 
@@ -90,8 +90,8 @@ class InstanceEventVisitor(AbstractVisitor.AbstractVisitor):
         output_dir = os.environ["DICT_DIR"] + "/events"
         if not (os.path.isdir(output_dir)):
             os.makedirs(output_dir)
-            init_file = output_dir + os.sep + "__init__.py"
-            open(init_file, "w+")
+        # make empty __init__.py
+        DiffAndRename.WriteIfChanged(output_dir + os.sep + "__init__.py").close()
         
         self.__fp = {};
         
@@ -111,7 +111,7 @@ class InstanceEventVisitor(AbstractVisitor.AbstractVisitor):
                 
             pyfile = "{}/{}.py".format(output_dir , fname)
             DEBUG.info('Open file: {}'.format(pyfile))
-            fd = open(pyfile,'w')
+            fd = DiffAndRename.WriteIfChanged(pyfile)
             if fd == None:
                 raise Exception("Could not open {} file.".format(pyfile))
             DEBUG.info('Completed {} open'.format(pyfile))
@@ -28,7 +28,7 @@ from optparse import OptionParser
 #from utils import version
 from utils import ConfigManager
 from utils import DictTypeConverter
-#from utils import DiffAndRename
+from utils import DiffAndRename
 from generators.visitors import AbstractVisitor
 from generators import formatters
 #
@@ -154,7 +154,7 @@ class InstanceSerializableVisitor(AbstractVisitor.AbstractVisitor):
         DEBUG.debug('InstanceSerializableVisitor:%s' % visit_str)
         DEBUG.debug('===================================')
         DEBUG.debug(c)
-        self.__fp.writelines(c.__str__())
+        self.__fp.write(c.__str__())
         DEBUG.debug('===================================')
 
 
@@ -182,11 +182,11 @@ class InstanceSerializableVisitor(AbstractVisitor.AbstractVisitor):
         pyfile = output_dir + "/" + obj.get_name() + ".py"
         
         # make empty __init__.py
-        open("%s/%s"%(output_dir,"__init__.py"),'w').close()
+        DiffAndRename.WriteIfChanged("%s/%s"%(output_dir,"__init__.py")).close()
                
         # Open file for writting here...
         DEBUG.info('Open file: %s' % pyfile)
-        self.__fp = open(pyfile,'w')
+        self.__fp = DiffAndRename.WriteIfChanged(pyfile)
         if self.__fp == None:
             raise "Could not open %s file." % pyfile
         DEBUG.info('Completed')
@@ -28,7 +28,7 @@ import exceptions
 #from utils import version
 from utils import ConfigManager
 from models import ModelParser
-#from utils import DiffAndRename
+from utils import DiffAndRename
 from generators.visitors import AbstractVisitor
 from generators.visitors import ComponentVisitorBase
 from generators import formatters
@@ -79,7 +79,7 @@ class InstanceTopologyChannelsHTMLVisitor(AbstractVisitor.AbstractVisitor):
         DEBUG.debug('InstanceTopologyChannelHTMLVisitor:%s' % visit_str)
         DEBUG.debug('===================================')
         DEBUG.debug(c)
-        self.__fp_dict[instance].writelines(c.__str__())
+        self.__fp_dict[instance].write(c.__str__())
         DEBUG.debug('===================================')
         
         
@@ -107,7 +107,7 @@ class InstanceTopologyChannelsHTMLVisitor(AbstractVisitor.AbstractVisitor):
                     # Open file for writing here...
                     DEBUG.info('Open file: %s' % filename)
                     try:
-                        self.__fp_dict[name] = open(filename,'w')
+                        self.__fp_dict[name] = DiffAndRename.WriteIfChanged(filename)
                         DEBUG.info('Completed')
                     except exceptions.IOError:
                         PRINT.info("Could not open %s file." % filename)
@@ -54,3 +54,5 @@ class MdDocVisitor(ComponentVisitorBase.ComponentVisitorBase):
         c = MdDocPage.MdDocPage()
         self.init(obj, c)
         self._writeTmpl(c, "mdPage")
+        # The page is complete, so do not wait for exit to flush it
+        self.finishSourceFilesVisit(obj)
@@ -27,7 +27,7 @@ from optparse import OptionParser
 #from utils import version
 from utils import ConfigManager
 from models import ModelParser
-#from utils import DiffAndRename
+from utils import DiffAndRename
 from generators.visitors import AbstractVisitor
 from generators import formatters
 #
@@ -77,7 +77,7 @@ class TopologyHVisitor(AbstractVisitor.AbstractVisitor):
         DEBUG.debug('TopologyHVisitor:%s' % visit_str)
         DEBUG.debug('===================================')
         DEBUG.debug(c)
-        self.__fp.writelines(c.__str__())
+        self.__fp.write(c.__str__())
         DEBUG.debug('===================================')
         
         
@@ -112,7 +112,7 @@ class TopologyHVisitor(AbstractVisitor.AbstractVisitor):
             #
             # Open file for writting here...
             DEBUG.info('Open file: %s' % filename)
-            self.__fp = open(filename,'w')
+            self.__fp = DiffAndRename.WriteIfChanged(filename)
             if self.__fp == None:
                 raise "Could not open %s file." % filename
             DEBUG.info('Completed')
@@ -18,12 +18,37 @@
 #===============================================================================
 import os
 import sys
+import weakref
 
 from utils import TypesList
+from utils import CodegenProfile
 
 # Global used for environment BUILD_ROOT
 BUILD_ROOT = None
 
+
+def memoize(query):
+    """
+    Decorator of the ModelParser queries.  The result of a query for a
+    model object and arguments is computed once and shared by every
+    visitor, until ModelParser.invalidate() is called for the object.
+    Callers must not modify the results.
+    """
+    name = query.__name__
+    def memoized_query(self, obj, *args, **kwargs):
+        start = CodegenProfile.start()
+        key = (name, args, tuple(sorted(kwargs.items())))
+        cache = self.queryCache(obj)
+        computed = key not in cache
+        if computed:
+            cache[key] = query(self, obj, *args, **kwargs)
+        CodegenProfile.add("query", name, start, computed)
+        return cache[key]
+    memoized_query.__name__ = name
+    memoized_query.__doc__ = query.__doc__
+    return memoized_query
+
+
 class ModelParser(object):
     """
     This class provides a single entry point returning items from
@@ -35,7 +60,8 @@ class ModelParser(object):
         """
 	    Constructor.
 	    """
-        pass
+        # Query results of each model object, dropped with the object
+        self.__cache = weakref.WeakKeyDictionary()
 
 
     def getInstance():
@@ -49,6 +75,25 @@ class ModelParser(object):
     #define static method
     getInstance = staticmethod(getInstance)
 
+    def queryCache(self, obj):
+        """
+        Return the dictionary of the memoized query results of obj.
+        """
+        cache = self.__cache.get(obj)
+        if cache is None:
+            cache = self.__cache[obj] = dict()
+        return cache
+
+    def invalidate(self, obj=None):
+        """
+        Forget the query results of obj, or of all model objects if obj is
+        None.  Call it after changing a model already queried.
+        """
+        if obj is None:
+            self.__cache.clear()
+        elif obj in self.__cache:
+            del self.__cache[obj]
+
     def uniqueList(self, seq):
         """
         Make a list of duplicates all unique.
@@ -58,6 +103,7 @@ class ModelParser(object):
         return [x for x in seq if x not in seen and not seen_add(x)]
 
 
+    @memoize
     def getPortsList(self, obj):
         """
         Return list of ports as (instance_name, type, direction, role) tuples.
@@ -72,6 +118,7 @@ class ModelParser(object):
             port_instance_name_list.append((i,t,d,r))
         return port_instance_name_list
 
+    @memoize
     def getPortsListMaxNum(self, obj):
         """
         Return list of ports as (instance_name, type, direction, max_number, role) tuples.
@@ -87,6 +134,7 @@ class ModelParser(object):
             port_instance_name_list.append((i,t,d,m,r))
         return port_instance_name_list
 
+    @memoize
     def getPortsListSync(self, obj):
         """
         Return list of ports as (instance_name, type, direction, sync, priority, role) tuples.
@@ -103,6 +151,7 @@ class ModelParser(object):
             port_instance_name_list.append((i,t,d,s,p,r))
         return port_instance_name_list
 
+    @memoize
     def getPortsListAll(self, obj):
         """
         Return list of ports as (instance_name, type, direction, sync, priority, full, role, max_number) tuples.
@@ -121,6 +170,7 @@ class ModelParser(object):
             result.append((i,t,d,s,p,f,r,m))
         return result
 
+    @memoize
     def getCommandsListSync(self, obj):
         """
         Return list of commands with mnemonic and sync
@@ -156,6 +206,7 @@ class ModelParser(object):
         else:
             return port_namespace + "::" + arg_type
 
+    @memoize
     def getPortReturnDict(self, obj):
         """
         Return a dict of return type strings, keyed by port name.
@@ -185,6 +236,7 @@ class ModelParser(object):
                 ret_dict[name] = t + " " + m
         return ret_dict
 
+    @memoize
     def getPortArgsDict(self, obj):
         """
         Return a dict of list of args, keyed by port name
@@ -237,6 +289,7 @@ class ModelParser(object):
         return args_dict
 
 
+    @memoize
     def getPortArgsPrototypeStringDict(self, obj):
         """
         Return a dict of prototype string args signature, keyed by port name
@@ -252,6 +305,7 @@ class ModelParser(object):
         return d2
 
 
+    @memoize
     def getPortArgsCallStringDict(self, obj):
         """
         Return a dict of call string args signature, keyed by port name
@@ -283,6 +337,7 @@ class ModelParser(object):
         return msg_type_arg_dict
 
 
+    @memoize
     def getPortNamespaceTypeDict(self, obj):
         """
         Return a dict of port namespace, keyed on port type.
@@ -305,6 +360,7 @@ class ModelParser(object):
         return port_namespace_dict
 
 
+    @memoize
     def hasSerializablePort(self, obj):
         """
         Tests the list of ports in the model and if any one is a Serializable returns true
@@ -313,6 +369,7 @@ class ModelParser(object):
         return 'Serial' in [p.get_type() for p in obj.get_ports()]
 
 
+    @memoize
     def hasSyncPort(self, obj):
         """
         Tests the list of ports in the model and if any one is a sync returns true
@@ -320,6 +377,7 @@ class ModelParser(object):
         """
         return 'sync' in [p.get_sync() for p in obj.get_ports()]
 
+    @memoize
     def getCommandsList(self, obj):
         """
         Return list of command names based on mnemonic, opcode, and sync
@@ -336,6 +394,7 @@ class ModelParser(object):
             command_instance_name_list.append((m,o,s,p,f,c))
         return command_instance_name_list
 
+    @memoize
     def getEventsList(self, obj):
         """
         Return list of event names based on id, name, severity, format_string, and comments
@@ -352,6 +411,7 @@ class ModelParser(object):
             event_instance_name_list.append((i,n,s,f,t,c))
         return event_instance_name_list
 
+    @memoize
     def getTelemEnumList(self, obj):
         enum_list = []
         for channel in obj.get_channels():
@@ -380,6 +440,7 @@ class ModelParser(object):
                     sys.exit(-1)
         return enum_list
 
+    @memoize
     def getChannelsList(self, obj):
         """
         Return list of telemetry channels
@@ -403,6 +464,7 @@ class ModelParser(object):
             channel_instance_name_list.append((i,n,t,s,u,c,ti))
         return channel_instance_name_list
 
+    @memoize
     def getParamEnumList(self, obj):
         enum_list = []
         for parameter in obj.get_parameters():
@@ -430,6 +492,7 @@ class ModelParser(object):
                     print("ERROR: Expected ENUM type in telemetry args list...")
                     sys.exit(-1)
         return enum_list
+    @memoize
     def getParametersList(self, obj):
         """
         Return list of parameters
@@ -453,6 +516,7 @@ class ModelParser(object):
             parameter_instance_name_list.append((i,n,t,set_ops,save_ops,s,d,c,ti))
         return parameter_instance_name_list
 
+    @memoize
     def getEnumList(self, obj):
         enum_list = []
         for command in obj.get_commands():
@@ -484,6 +548,7 @@ class ModelParser(object):
         return enum_list
 
 
+    @memoize
     def getCommandArgsDict(self, obj, from_proto = False):
         """
         Return a dict of list of args, keyed by command mnemonic
@@ -527,6 +592,7 @@ class ModelParser(object):
                 args_dict[mnemonic].append((n,t,c,typeinfo))
         return args_dict
 
+    @memoize
     def getCommandArgsPrototypeStringDict(self, obj):
         """
         Return a dict of prototype string args signature, keyed by command mnemonic
@@ -541,6 +607,7 @@ class ModelParser(object):
                 d2[l] = "void"
         return d2
 
+    @memoize
     def getEventEnumList(self, obj):
         enum_list = []
         for event in obj.get_events():
@@ -571,6 +638,7 @@ class ModelParser(object):
                         sys.exit(-1)
         return enum_list
 
+    @memoize
     def getEventArgsDict(self, obj):
         """
         Return a dict of list of args, keyed by name mnemonic
@@ -615,6 +683,7 @@ class ModelParser(object):
                 args_dict[name].append((n,t,c,s,typeinfo))
         return args_dict
 
+    @memoize
     def getEventArgsPrototypeStringDict(self, obj):
         """
         Return a dict of prototype string args signature, keyed by port name
@@ -629,6 +698,7 @@ class ModelParser(object):
                 d2[l] = "void"
         return d2
 
+    @memoize
     def getInternalInterfacesList(self, obj):
         """
         Return list of interface names
@@ -641,6 +711,7 @@ class ModelParser(object):
             internal_interface_instance_name_list.append((n,p,f))
         return internal_interface_instance_name_list
 
+    @memoize
     def getInternalInterfaceArgsPrototypeStringDict(self, obj):
         """
         Return a dict of prototype string args signature, keyed by interface name
@@ -655,6 +726,7 @@ class ModelParser(object):
                 d2[l] = "void"
         return d2
 
+    @memoize
     def getInternalInterfaceArgsDict(self, obj, from_proto = False):
         """
         Return a dict of list of args, keyed by internal interface name
@@ -697,6 +769,7 @@ class ModelParser(object):
         return args_dict
 
 
+    @memoize
     def getInternalInterfaceEnumList(self, obj):
         enum_list = []
         for internal_interface in obj.get_internal_interfaces():
@@ -18,6 +18,7 @@
 
 import os
 import sys
+import collections
 import time
 import socket
 import logging
@@ -37,6 +38,7 @@ from __builtin__ import True
 #from Canvas import Window
 
 from parsers import XmlComponentParser
+from parsers import XmlCache
 
 # Global logger init. below.
 PRINT = logging.getLogger('output')
@@ -60,6 +62,7 @@ class TopoFactory:
         self.__instance = None
         self.__config       = ConfigManager.ConfigManager.getInstance()
         self.__generate_new_IDS = True #Work around to disable ID generation/table output in the case ACCOnstants.ini is used to build
+        self.__base_id_ranges = {} #Base ID range of each component XML parser object used by the current topology
         
         self.__table_info = [] #["COLUMN NAME" , <INT OF SPACE PADDING AROUND NAME> , "DESCRIPTION"]
         self.__table_info.append(["INSTANCE NAME" , 5 , "Name of the instance object."])
@@ -97,6 +100,7 @@ class TopoFactory:
         """
         # Instance a list of model.Component classes that are all the instanced items from parsed xml.
         x = the_parsed_topology_xml
+        self.__base_id_ranges = {}
        
        
         componentXMLNameToComponent = {} #Dictionary mapss XML names to processes component objects so redundant processing is avoided
@@ -104,14 +108,14 @@ class TopoFactory:
         for comp_xml_path in x.get_comp_type_file_header_dict():
             file_path = os.environ['BUILD_ROOT'] + '/' + comp_xml_path
             print file_path
-            processedXML = XmlComponentParser.XmlComponentParser(file_path)
+            processedXML = XmlCache.parse(XmlComponentParser.XmlComponentParser, file_path)
             comp_name = processedXML.get_component().get_name()
             componentXMLNameToComponent[comp_name] = processedXML
             
             
         
         for instance in x.get_instances():
-            if instance.get_type() not in componentXMLNameToComponent.keys():
+            if instance.get_type() not in componentXMLNameToComponent:
                 PRINT.info("Component XML file type {} was not specified in the topology XML. Please specify the path using <import_component_type> tags.".format(instance.get_type()))
             else:
                 instance.set_component_object(componentXMLNameToComponent[instance.get_type()]) 
@@ -128,30 +132,34 @@ class TopoFactory:
         else:
             instance_name_base_id_list = []
         
+        # Index the connections by source component once, keeping their order
+        connections_by_source = {}
+        for connection in x.get_connections():
+            connections_by_source.setdefault(connection.get_source()[0], []).append(connection)
+
         # Iterate over all the model.Component classes and then...
             # Iterate over all the connection sources and assigne output ports to each Component..
             # For each output port you want to assign the connect comment, target component namem, target port and type...
             #    (Requires adding to the model.Port class ether members or a memeber called of type TargetConnection)
         for component in components:
             port_obj_list = []
-            for connection in x.get_connections():
-                if component.get_name() == connection.get_source()[0]:
-                    port = Port.Port(connection.get_source()[1], connection.get_source()[2], None, None,  comment = connection.get_comment(), xml_filename = x.get_xml_filename)
-                    port.set_source_num(connection.get_source()[3])
-                    port.set_target_comp(connection.get_target()[0])
-                    port.set_target_port(connection.get_target()[1])
-                    port.set_target_type(connection.get_target()[2])
-                    port.set_target_num(connection.get_target()[3])
-                    if connection.get_source()[1].startswith("i"):
-                        port.set_direction("input")
-                    else:
-                        port.set_direction("output")
-                    if connection.get_target()[1].startswith("i"):
-                        port.set_target_direction("input")
-                    else:
-                        port.set_target_direction("output")
-                    
-                    port_obj_list.append(port)
+            for connection in connections_by_source.get(component.get_name(), []):
+                port = Port.Port(connection.get_source()[1], connection.get_source()[2], None, None,  comment = connection.get_comment(), xml_filename = x.get_xml_filename)
+                port.set_source_num(connection.get_source()[3])
+                port.set_target_comp(connection.get_target()[0])
+                port.set_target_port(connection.get_target()[1])
+                port.set_target_type(connection.get_target()[2])
+                port.set_target_num(connection.get_target()[3])
+                if connection.get_source()[1].startswith("i"):
+                    port.set_direction("input")
+                else:
+                    port.set_direction("output")
+                if connection.get_target()[1].startswith("i"):
+                    port.set_target_direction("input")
+                else:
+                    port.set_target_direction("output")
+                
+                port_obj_list.append(port)
             component.set_ports(port_obj_list)
 
         # Instance a Topology class and give it namespace, comment and list of components.        
@@ -179,7 +187,7 @@ class TopoFactory:
             return None
         highest_ID = None
         
-        event_id_list = []
+        event_id_list = set()
         for event in comp_xml.get_events():
             #if len(event.get_ids()) != 1:
             #   print("Component of type {} has multiple IDs for event {}. Please check if the ACConstants.ini file has all the ids set to zero.".format(comp_xml.get_component().get_name() , event.get_name()))
@@ -188,12 +196,12 @@ class TopoFactory:
             if id in event_id_list:
                 print("IDCollisionError: Event ID {} in component {} is used more than once in the same component.".format(id , comp_xml.get_component().get_name()))
                 sys.exit(-1)
-            event_id_list.append(id)
+            event_id_list.add(id)
             
             if id > highest_ID:
                 highest_ID = id
                 
-        channel_id_list = []        
+        channel_id_list = set()        
         for channel in comp_xml.get_channels():
             #if len(event.get_ids()) != 1:
             #   print("Component of type {} has multiple IDs for event {}. Please check if the ACConstants.ini file has all the ids set to zero.".format(comp_xml.get_component().get_name() , event.get_name()))
@@ -202,13 +210,13 @@ class TopoFactory:
             if id in channel_id_list:
                 print("IDCollisionError: Channel ID {} in component {} is used more than once in the same component.".format(id , comp_xml.get_component().get_name()))
                 sys.exit(-1)
-            channel_id_list.append(id)
+            channel_id_list.add(id)
             
             if id > highest_ID:
                 highest_ID = id
                 
                 
-        command_id_list = []
+        command_id_list = set()
         for commands in comp_xml.get_commands():
             #if len(event.get_ids()) != 1:
             #   print("Component of type {} has multiple IDs for event {}. Please check if the ACConstants.ini file has all the ids set to zero.".format(comp_xml.get_component().get_name() , event.get_name()))
@@ -217,13 +225,13 @@ class TopoFactory:
             if id in command_id_list:
                 print("IDCollisionError: Command ID {} in component {} is used more than once in the same component.".format(id , comp_xml.get_component().get_name()))
                 sys.exit(-1)
-            command_id_list.append(id)
+            command_id_list.add(id)
             
             if id > highest_ID:
                 highest_ID = id
                 
-        parameter_id_list = []
-        parameter_opcode_list = []
+        parameter_id_list = set()
+        parameter_opcode_list = set()
         for parameters in comp_xml.get_parameters():
             #if len(event.get_ids()) != 1:
             #   print("Component of type {} has multiple IDs for event {}. Please check if the ACConstants.ini file has all the ids set to zero.".format(comp_xml.get_component().get_name() , event.get_name()))
@@ -233,7 +241,7 @@ class TopoFactory:
             if id in parameter_id_list:
                 print("IDCollisionError: Parameter ID {} in component {} is used more than once in the same component.".format(id , comp_xml.get_component().get_name()))
                 sys.exit(-1)
-            parameter_id_list.append(id)
+            parameter_id_list.add(id)
             
             if id > highest_ID:
                 highest_ID = id
@@ -249,7 +257,7 @@ class TopoFactory:
             if id in command_id_list:
                 print("IDCollisionError: Parameter set opcode {} in component {} is the same as another command id in this component.".format(id , comp_xml.get_component().get_name()))
                 sys.exit(-1)
-            parameter_opcode_list.append(id)
+            parameter_opcode_list.add(id)
             
             if id > highest_ID:
                 highest_ID = id
@@ -264,7 +272,7 @@ class TopoFactory:
             if id in command_id_list:
                 print("IDCollisionError: Parameter save opcode {} in component {} is the same as another command id in this component.".format(id , comp_xml.get_component().get_name()))
                 sys.exit(-1)
-            parameter_opcode_list.append(id)
+            parameter_opcode_list.add(id)
             
             if id > highest_ID:
                 highest_ID = id
@@ -325,6 +333,8 @@ class TopoFactory:
         
         initial_comp_with_ID.sort(key=lambda x: x[1])
         initial_comp_without_ID.sort(key=lambda x: x[2])
+        initial_comp_with_ID = collections.deque(initial_comp_with_ID)
+        initial_comp_without_ID = collections.deque(initial_comp_without_ID)
         
         # Pass 3 - Check with_ID list to ensure no base / window IDS collide
         
@@ -353,10 +363,10 @@ class TopoFactory:
                 break
             
             if len(initial_comp_with_ID) > 0 and with_ID_obj == None:
-                with_ID_obj = initial_comp_with_ID.pop(0)
+                with_ID_obj = initial_comp_with_ID.popleft()
                 
             if len(initial_comp_without_ID) > 0 and without_ID_obj == None:
-                without_ID_obj = initial_comp_without_ID.pop(0)
+                without_ID_obj = initial_comp_without_ID.popleft()
             
             next_poss_id = prev_id + prev_window #The next possible id that can be taken
             
@@ -521,7 +531,10 @@ class TopoFactory:
         #
         # set window size or overrid it on instance basis
         
-        component_calculated_window_range = self.__compute_component_base_id_range(comp)
+        # The range only depends on the component type, so compute it once per type
+        if comp not in self.__base_id_ranges:
+            self.__base_id_ranges[comp] = self.__compute_component_base_id_range(comp)
+        component_calculated_window_range = self.__base_id_ranges[comp]
         
         '''
         Note: The calculated window range is really the largest ID (plus one) found in the component object. 
@@ -0,0 +1,156 @@
+#!/bin/env python
+#===============================================================================
+# NAME: XmlCache.py
+#
+# DESCRIPTION:  Process wide caches shared by the XML parsers:
+#
+#               - compiled RelaxNG schemas, keyed by schema file,
+#               - the content hashes of XML files already validated against
+#                 a schema, optionally loaded from and saved to a file so an
+#                 incremental build only validates the XML that changed,
+#               - parser objects, keyed by parser class and XML file and
+#                 checked against the content hash of the file.
+#
+# USAGE:        XmlCache.validate(element_tree, schema_file, xml_file)
+#               XmlCache.parse(XmlPortsParser.XmlPortsParser, xml_file)
+#
+# Copyright 2015, California Institute of Technology.
+# ALL RIGHTS RESERVED. U.S. Government Sponsorship acknowledged.
+#===============================================================================
+#
+# Python standard modules
+#
+import hashlib
+import logging
+import os
+from lxml import etree
+
+#
+# Universal globals used within module go here.
+# (DO NOT USE MANY!)
+#
+# Global logger init. below.
+PRINT = logging.getLogger('output')
+DEBUG = logging.getLogger('debug')
+
+# Compiled schemas by absolute schema file name
+_schemas = dict()
+# Content hashes of schema files
+_schema_hashes = dict()
+# Hashes of (XML content, schema content) pairs that passed validation
+_validated = set()
+# Validation hashes added since load(); only these are saved
+_new_validated = set()
+# Parser objects by (parser class, absolute XML file name): (hash, object)
+_parsed = dict()
+# File the validation hashes are persisted to, if any
+_cache_file = None
+
+
+def file_hash(filename):
+    """
+    Return the SHA-1 hex digest of the contents of a file.
+    """
+    fd = open(filename, 'rb')
+    try:
+        return hashlib.sha1(fd.read()).hexdigest()
+    finally:
+        fd.close()
+
+
+def get_schema(schema_file):
+    """
+    Return the compiled RelaxNG schema of schema_file, compiling it only
+    once per process.
+    """
+    path = os.path.abspath(schema_file)
+    if path not in _schemas:
+        DEBUG.debug("Compiling schema %s" % path)
+        relax_file_handler = open(path, 'r')
+        relax_parsed = etree.parse(relax_file_handler)
+        relax_file_handler.close()
+        _schemas[path] = etree.RelaxNG(relax_parsed)
+    return _schemas[path]
+
+
+def schema_hash(schema_file):
+    """
+    Return the content hash of schema_file, reading it only once per process.
+    """
+    path = os.path.abspath(schema_file)
+    if path not in _schema_hashes:
+        _schema_hashes[path] = file_hash(path)
+    return _schema_hashes[path]
+
+
+def validate(element_tree, schema_file, xml_file):
+    """
+    Validate the parsed element_tree of xml_file against schema_file.
+    Validation is skipped if the same XML content already passed with the
+    same schema.  On failure the errors are printed and the exception of
+    the schema is raised.
+    """
+    key = hashlib.sha1(file_hash(xml_file) + schema_hash(schema_file)).hexdigest()
+    if key in _validated:
+        return
+    relax_compiled = get_schema(schema_file)
+    try:
+        relax_compiled.assert_(element_tree)
+    except Exception , e:
+        PRINT.info("XML file {} is not valid according to schema {}.".format(xml_file, schema_file))
+        PRINT.info(e)
+        PRINT.info(relax_compiled.error_log)
+        PRINT.info(relax_compiled.error_log.last_error)
+        raise e
+    _validated.add(key)
+    _new_validated.add(key)
+
+
+def parse(parser_class, xml_file):
+    """
+    Return parser_class(xml_file), reusing the object made for the same
+    class and file as long as the file content has not changed.  The
+    object is shared, so callers must not modify it.
+    """
+    key = (parser_class, os.path.abspath(xml_file))
+    content_hash = file_hash(xml_file)
+    if key in _parsed and _parsed[key][0] == content_hash:
+        return _parsed[key][1]
+    parsed = parser_class(xml_file)
+    _parsed[key] = (content_hash, parsed)
+    return parsed
+
+
+def load(cache_file):
+    """
+    Read the validation hashes saved in cache_file, if it exists, and save
+    new hashes to it with save().
+    """
+    global _cache_file
+    _cache_file = cache_file
+    if os.path.isfile(cache_file):
+        fd = open(cache_file, 'r')
+        _validated.update([line.strip() for line in fd if line.strip()])
+        fd.close()
+
+
+def save():
+    """
+    Add the hashes validated by this process to the cache file given to
+    load().  The file is rewritten with a rename, so concurrent builds
+    never see a partial file; at worst one build's new hashes are lost
+    and validated again next time.
+    """
+    if _cache_file is None or not _new_validated:
+        return
+    keys = set(_new_validated)
+    if os.path.isfile(_cache_file):
+        fd = open(_cache_file, 'r')
+        keys.update([line.strip() for line in fd if line.strip()])
+        fd.close()
+    tmp_file = "%s.%d" % (_cache_file, os.getpid())
+    fd = open(tmp_file, 'w')
+    fd.write("\n".join(sorted(keys)) + "\n")
+    fd.close()
+    os.rename(tmp_file, _cache_file)
+    _new_validated.clear()
@@ -21,6 +21,7 @@ import os
 import sys
 import time
 from utils import ConfigManager
+from parsers import XmlCache
 from optparse import OptionParser
 from lxml import etree
 import ConfigParser
@@ -88,20 +89,7 @@ class XmlComponentParser(object):
         element_tree = etree.parse(fd,parser=xml_parser)
         
         #Validate against current schema. if more are imported later in the process, they will be reevaluated
-        relax_file_handler = open(os.environ["BUILD_ROOT"] + self.Config.get('schema' , 'component') , 'r')
-        relax_parsed = etree.parse(relax_file_handler)
-        relax_file_handler.close()
-        relax_compiled = etree.RelaxNG(relax_parsed)
-        
-        try:
-            relax_compiled.assert_(element_tree)
-        except Exception , e:
-            PRINT.info("XML file {} is not valid according to schema {}.".format(xml_file ,os.environ["BUILD_ROOT"] + self.Config.get('schema' , 'component')))
-            PRINT.info(e)
-            PRINT.info(relax_compiled.error_log)
-            PRINT.info(relax_compiled.error_log.last_error)
-            print element_tree
-            raise e
+        XmlCache.validate(element_tree, os.environ["BUILD_ROOT"] + self.Config.get('schema' , 'component'), xml_file)
         
         ## Add Implicit ports if needed
       #  element_tree = __check_ports(element_tree)
@@ -159,19 +147,7 @@ class XmlComponentParser(object):
                 component.append(dict_element_tree.getroot()) 
                 
                 #Validate new imports using their root tag as a key to find what schema to use
-                relax_file_handler = open(os.environ["BUILD_ROOT"] + self.Config.get('schema' , dict_element_tree.getroot().tag.lower()) , 'r')
-                relax_parsed = etree.parse(relax_file_handler)
-                relax_file_handler.close()
-                relax_compiled = etree.RelaxNG(relax_parsed)
-                
-                try:
-                    relax_compiled.assert_(dict_element_tree)
-                except Exception , e:
-                    PRINT.info("XML file {} is not valid according to schema {}.".format(dict_file , os.environ["BUILD_ROOT"] + self.Config.get('schema' , dict_element_tree.getroot().tag.lower())))
-                    PRINT.info(e)
-                    PRINT.info(relax_compiled.error_log)
-                    PRINT.info(relax_compiled.error_log.last_error)
-                    raise e
+                XmlCache.validate(dict_element_tree, os.environ["BUILD_ROOT"] + self.Config.get('schema' , dict_element_tree.getroot().tag.lower()), dict_file)
                 
                 # add to list of imported dictionaries for make dependencies later
                 self.__import_dictionary_files.append(comp_tag.text)               
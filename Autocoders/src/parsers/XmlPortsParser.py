@@ -23,6 +23,7 @@ import time
 from optparse import OptionParser
 from lxml import etree
 from utils import ConfigManager
+from parsers import XmlCache
 
 #
 # Python extention modules and custom interfaces
@@ -73,19 +74,7 @@ class XmlPortsParser(object):
         
         
         #Validate against schema
-        relax_file_handler = open(os.environ["BUILD_ROOT"] +self.__config.get('schema' , 'interface') , 'r')
-        relax_parsed = etree.parse(relax_file_handler)
-        relax_file_handler.close()
-        relax_compiled = etree.RelaxNG(relax_parsed)
-        
-        try:
-            relax_compiled.assert_(element_tree)
-        except Exception , e:
-            PRINT.info("XML file {} is not valid according to schema {}.".format(xml_file ,os.environ["BUILD_ROOT"] + self.__config.get('schema' , 'interface')))
-            PRINT.info(e)
-            PRINT.info(relax_compiled.error_log)
-            PRINT.info(relax_compiled.error_log.last_error)
-            raise e
+        XmlCache.validate(element_tree, os.environ["BUILD_ROOT"] + self.__config.get('schema' , 'interface'), xml_file)
 
         interface = element_tree.getroot()
         if interface.tag != "interface":
@@ -24,6 +24,7 @@ from optparse import OptionParser
 from lxml import etree
 import hashlib
 from utils import ConfigManager
+from parsers import XmlCache
 #
 # Python extention modules and custom interfaces
 #
@@ -92,20 +93,8 @@ class XmlSerializeParser(object):
         xml_parser = etree.XMLParser(remove_comments=True)
         element_tree = etree.parse(fd,parser=xml_parser)
         
-         #Validate new imports using their root tag as a key to find what schema to use
-        file_handler = open(os.environ["BUILD_ROOT"] +self.__config.get('schema' , element_tree.getroot().tag.lower()) , 'r')
-        relax_parsed = etree.parse(file_handler)
-        file_handler.close()
-        relax_compiled = etree.RelaxNG(relax_parsed)
-        
-        try:
-            relax_compiled.assert_(element_tree)
-        except Exception , e:
-            PRINT.info("XML file {} is not valid according to schema {}.".format(xml_file , os.environ["BUILD_ROOT"] +self.__config.get('schema' , element_tree.getroot().tag.lower())))
-            PRINT.info(e)
-            PRINT.info(relax_compiled.error_log)
-            PRINT.info(relax_compiled.error_log.last_error)
-            raise e
+        #Validate new imports using their root tag as a key to find what schema to use
+        XmlCache.validate(element_tree, os.environ["BUILD_ROOT"] + self.__config.get('schema' , element_tree.getroot().tag.lower()), xml_file)
         
         serializable = element_tree.getroot()
         if serializable.tag != "serializable":
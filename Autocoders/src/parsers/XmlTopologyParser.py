@@ -23,6 +23,7 @@ import time
 from optparse import OptionParser
 from lxml import etree
 from parsers import XmlComponentParser
+from parsers import XmlCache
 from utils import ConfigManager
 from __builtin__ import file
 #
@@ -68,19 +69,7 @@ class XmlTopologyParser(object):
         element_tree = etree.parse(fd)
         
         #Validate against schema
-        relax_file_handler = open(os.environ["BUILD_ROOT"] +self.__config.get('schema' , 'assembly') , 'r')
-        relax_parsed = etree.parse(relax_file_handler)
-        relax_file_handler.close()
-        relax_compiled = etree.RelaxNG(relax_parsed)
-        
-        try:
-            relax_compiled.assert_(element_tree)
-        except Exception , e:
-            PRINT.info("XML file {} is not valid according to schema {}.".format(xml_file ,os.environ["BUILD_ROOT"] + self.__config.get('schema' , 'assembly')))
-            PRINT.info(e)
-            PRINT.info(relax_compiled.error_log)
-            PRINT.info(relax_compiled.error_log.last_error)
-            raise e
+        XmlCache.validate(element_tree, os.environ["BUILD_ROOT"] + self.__config.get('schema' , 'assembly'), xml_file)
         
         for e in element_tree.iter():
             c = None
@@ -197,18 +186,20 @@ class XmlTopologyParser(object):
         #
         # For each component xml file specified assign it to a component instance object
         PRINT.info("\nSearching for component XML files")
+        instances_by_type = {}
+        for inst in self.get_instances():
+            instances_by_type.setdefault(inst.get_type(), []).append(inst)
         for xml_file in self.__comp_type_files:
             if ModelParser.BUILD_ROOT != None:
                 xml_file = ModelParser.BUILD_ROOT + os.sep + xml_file
             xml_file = xml_file.strip()
             if os.path.exists(xml_file) == True:
                 PRINT.info("Found component XML file: %s" % xml_file)
-                xml_parsed = XmlComponentParser.XmlComponentParser(xml_file)
-                for inst in self.get_instances():
-                    if inst.get_type() == xml_parsed.get_component().get_name():
-                        PRINT.info("Populating instance %s of type %s with parser tree" % (inst.get_name(), inst.get_type()))
-                        DEBUG.info("Populating instance %s of type %s with parser tree" % (inst.get_name(), inst.get_type()))
-                        inst.set_comp_xml(xml_parsed)
+                xml_parsed = XmlCache.parse(XmlComponentParser.XmlComponentParser, xml_file)
+                for inst in instances_by_type.get(xml_parsed.get_component().get_name(), []):
+                    PRINT.info("Populating instance %s of type %s with parser tree" % (inst.get_name(), inst.get_type()))
+                    DEBUG.info("Populating instance %s of type %s with parser tree" % (inst.get_name(), inst.get_type()))
+                    inst.set_comp_xml(xml_parsed)
             else:
                 PRINT.info("WARNING: Could not find XML file: %s" % xml_file)
         #
@@ -0,0 +1,98 @@
+#!/bin/env python
+#===============================================================================
+# NAME: CodegenProfile.py
+#
+# DESCRIPTION:  Optional timing of the code generation.  When enabled, the
+#               time spent in each visitor and in each ModelParser query is
+#               accumulated by category and name, and report() prints the
+#               totals, most expensive first.  When disabled, timed code
+#               only pays for a test of ENABLED.
+#
+# USAGE:        CodegenProfile.enable()
+#               start = CodegenProfile.start()
+#               ...
+#               CodegenProfile.add("visitor", name, start)
+#               CodegenProfile.report()
+#
+# Copyright 2015, California Institute of Technology.
+# ALL RIGHTS RESERVED. U.S. Government Sponsorship acknowledged.
+#===============================================================================
+#
+# Python standard modules
+#
+import logging
+import time
+
+# Global logger init. below.
+PRINT = logging.getLogger('output')
+DEBUG = logging.getLogger('debug')
+
+# True once enable() is called
+ENABLED = False
+
+# (category, name) : [calls, seconds, computed]
+_totals = dict()
+
+
+def enable():
+    global ENABLED
+    ENABLED = True
+
+
+def start():
+    """
+    Return the start time of a timed section, or None if not profiling.
+    """
+    if ENABLED:
+        return time.time()
+    return None
+
+
+def add(category, name, start_time, computed=True):
+    """
+    Account a call of name, in category, started at start_time.  computed
+    is False for calls answered from a cache.
+    """
+    if start_time is None:
+        return
+    seconds = time.time() - start_time
+    total = _totals.get((category, name))
+    if total is None:
+        total = _totals[(category, name)] = [0, 0.0, 0]
+    total[0] += 1
+    total[1] += seconds
+    if computed:
+        total[2] += 1
+
+
+def report():
+    """
+    Print the accumulated times, most expensive first.
+    """
+    if not ENABLED:
+        return
+    PRINT.info("%-10s %-55s %8s %8s %10s" % ("Category", "Name", "Calls", "Computed", "ms"))
+    entries = sorted(_totals.items(), key=lambda (key, total): total[1], reverse=True)
+    for ((category, name), (calls, seconds, computed)) in entries:
+        PRINT.info("%-10s %-55s %8d %8d %10.2f" % (category, name, calls, computed, seconds * 1000.0))
+
+
+def totals():
+    """
+    Return the accumulated times, to merge() them in another process.
+    """
+    return dict(_totals)
+
+
+def merge(other_totals):
+    for (key, (calls, seconds, computed)) in other_totals.items():
+        total = _totals.get(key)
+        if total is None:
+            total = _totals[key] = [0, 0.0, 0]
+        total[0] += calls
+        total[1] += seconds
+        total[2] += computed
+
+
+def reset():
+    _totals.clear()
@@ -17,6 +17,10 @@ DEBUG = logging.getLogger('debug')
 
 removeJunk = False
 
+# Absolute paths of the files closed by WriteIfChanged in this process,
+# changed or not, see removeUnwritten()
+written_files = set()
+
 
 def compare_except_lines( file1, file2, linesOkToBeDifferent ): 
     """
@@ -129,6 +133,89 @@ def compareAndRename( filename, dated_files_enable=False, except_lines_list=[]):
             print "...new %s did not differ from old file - removing new file." % filename
 
 
+class WriteIfChanged(object):
+    """
+    File-like object for generated files.  Everything written is kept in
+    memory and only written to filename on close() if it differs from the
+    current contents of the file.  An unchanged file keeps its modification
+    time, so make does not rebuild what depends on it.  A relative
+    filename is relative to the directory current when it is opened.
+    """
+    def __init__(self, filename):
+        self.name = filename
+        self.__path = os.path.abspath(filename)
+        self.closed = False
+        self.changed = None
+        self.__chunks = []
+
+    def write(self, text):
+        self.__chunks.append(text)
+
+    def writelines(self, lines):
+        if isinstance(lines, basestring):
+            self.__chunks.append(lines)
+        else:
+            self.__chunks.extend(lines)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        written_files.add(self.__path)
+        text = "".join(self.__chunks)
+        self.__chunks = []
+        self.changed = not sameContents(self.__path, text)
+        if self.changed:
+            fd = open(self.__path, 'w')
+            fd.write(text)
+            fd.close()
+        else:
+            DEBUG.debug("%s unchanged" % self.__path)
+
+    def __del__(self):
+        # Like a file object, write on collection if never closed
+        self.close()
+
+
+def removeUnwritten(directory):
+    """
+    Remove the files under directory that no WriteIfChanged wrote in this
+    process, and the directories left empty.  Compiled Python files of
+    written sources are kept.  Used instead of removing a whole output
+    directory before generating it, so unchanged files keep their
+    modification times.
+    """
+    for (dirpath, dirnames, filenames) in os.walk(directory, topdown=False):
+        for f in filenames:
+            path = os.path.abspath(os.path.join(dirpath, f))
+            if path in written_files or (path.endswith(".pyc") and path[:-1] in written_files):
+                continue
+            DEBUG.debug("Removing stale %s" % path)
+            os.remove(path)
+        if not os.listdir(dirpath):
+            os.rmdir(dirpath)
+
+
+def sameContents(filename, text):
+    """
+    Return True if filename exists and contains exactly text.  The file is
+    only read if its size matches.
+    """
+    try:
+        if os.path.getsize(filename) != len(text):
+            return False
+        fd = open(filename, 'r')
+    except (OSError, IOError):
+        return False
+    try:
+        return fd.read() == text
+    finally:
+        fd.close()
+
+
 def DiffAndRename( filename, dated_files_enable = True ):
     '''
     Compare two files that are named 'file' and 'file.new'
@@ -0,0 +1,120 @@
+#!/bin/env python
+#===============================================================================
+# NAME: large_topology_nose_test.py
+#
+# DESCRIPTION: Benchmark of the topology model creation for large synthetic
+#              topologies: hundreds of SignalGen and PingReceiver instances
+#              with thousands of connections.  Checks that TopoFactory
+#              assigns every connection to its source component and that
+#              the time grows about linearly with the topology size.
+#
+#              Needs BUILD_ROOT set and Autocoders/src on the PYTHONPATH.
+#              Run it as a script to print the benchmark table.
+#
+# Copyright 2015, California Institute of Technology.
+# ALL RIGHTS RESERVED. U.S. Government Sponsorship acknowledged.
+#===============================================================================
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from models import ModelParser
+from models import TopoFactory
+from parsers import XmlTopologyParser
+
+COMPONENT_TYPES = [("SignalGen", "Ref/SignalGen/SignalGenComponentAi.xml",
+                    ["timeCaller", "cmdRegOut", "logTextOut", "logOut", "cmdResponseOut", "tlmOut"]),
+                   ("PingReceiver", "Ref/PingReceiver/PingReceiverComponentAi.xml",
+                    ["PingOut"])]
+
+# Connections from each instance
+FANOUT = 10
+
+
+def instance_name(n):
+    return "%s%d" % (COMPONENT_TYPES[n % len(COMPONENT_TYPES)][0].lower(), n)
+
+
+def write_topology(filename, instances):
+    """
+    Write a topology of instances components, each with FANOUT output
+    connections to other instances.
+    """
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<assembly name="Large" base_id="256" base_id_window="20">']
+    for (comp_type, xml_file, ports) in COMPONENT_TYPES:
+        lines.append('    <import_component_type>%s</import_component_type>' % xml_file)
+    for n in range(instances):
+        comp_type = COMPONENT_TYPES[n % len(COMPONENT_TYPES)][0]
+        lines.append('    <instance namespace="Ref" name="%s" type="%s"/>' % (instance_name(n), comp_type))
+    for n in range(instances):
+        ports = COMPONENT_TYPES[n % len(COMPONENT_TYPES)][2]
+        for k in range(FANOUT):
+            target = (n * 7 + k * 13 + 1) % instances
+            lines.append('    <connection name="c%d_%d">' % (n, k))
+            lines.append('        <source component="%s" port="%s" type="Any" num="%d"/>' % (instance_name(n), ports[k % len(ports)], k))
+            lines.append('        <target component="%s" port="in" type="Any" num="%d"/>' % (instance_name(target), n % 4))
+            lines.append('    </connection>')
+    lines.append('</assembly>')
+    fd = open(filename, 'w')
+    fd.write("\n".join(lines) + "\n")
+    fd.close()
+
+
+def create_topology(directory, instances):
+    """
+    Parse a synthetic topology and create its model.
+    Returns (topology model, seconds spent).
+    """
+    filename = os.path.join(directory, "Large%dTopologyAppAi.xml" % instances)
+    write_topology(filename, instances)
+    ModelParser.BUILD_ROOT = os.environ['BUILD_ROOT']
+    start = time.time()
+    parsed = XmlTopologyParser.XmlTopologyParser(filename)
+    topology = TopoFactory.TopoFactory.getInstance().create(parsed)
+    return (topology, time.time() - start)
+
+
+def connections_test():
+    directory = tempfile.mkdtemp()
+    try:
+        (topology, seconds) = create_topology(directory, 60)
+    finally:
+        shutil.rmtree(directory)
+    components = topology.get_comp_list()
+    assert len(components) == 60
+    for n, component in enumerate(components):
+        assert component.get_name() == instance_name(n)
+        ports = component.get_ports()
+        assert len(ports) == FANOUT
+        # Ports keep the order of the connections in the topology
+        assert [port.get_source_num() for port in ports] == range(FANOUT)
+        assert ports[1].get_target_comp() == instance_name((n * 7 + 13 + 1) % 60)
+    assert len(topology.get_base_id_list()) == 60
+
+
+def scaling_test():
+    directory = tempfile.mkdtemp()
+    try:
+        # Warm up the component XML parsing shared by both sizes
+        create_topology(directory, 10)
+        (small, small_seconds) = create_topology(directory, 75)
+        (large, large_seconds) = create_topology(directory, 300)
+    finally:
+        shutil.rmtree(directory)
+    print "75 instances: %.3f s, 300 instances: %.3f s" % (small_seconds, large_seconds)
+    # Four times the instances and connections; quadratic growth would be 16 times
+    assert large_seconds < 8 * small_seconds + 0.5
+
+
+if __name__ == '__main__':
+    directory = tempfile.mkdtemp()
+    try:
+        for instances in (75, 150, 300, 600):
+            (topology, seconds) = create_topology(directory, instances)
+            print "%4d instances, %5d connections: %.3f s" % (instances, instances * FANOUT, seconds)
+    finally:
+        shutil.rmtree(directory)
+    sys.exit(0)
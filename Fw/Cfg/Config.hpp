@@ -189,6 +189,10 @@
  #ifndef FW_OBJ_SIMPLE_REG_BUFF_SIZE
  #define FW_OBJ_SIMPLE_REG_BUFF_SIZE         255  //!< Size of ojbect registry dump string
  #endif
+// The simple object registry can keep an index of its entries sorted by name for O(log n) lookup by name. Requires object names.
+ #ifndef FW_OBJ_SIMPLE_REG_INDEX
+ #define FW_OBJ_SIMPLE_REG_INDEX             1   //!< Keep a sorted by name index in the simple object registry (more memory, faster lookup)
+ #endif
 #endif
 
 #if FW_QUEUE_REGISTRATION
@@ -57,6 +57,10 @@ namespace Fw {
     void ObjBase::setObjRegistry(ObjRegistry* reg) {
         ObjBase::s_objRegistry = reg;
     }
+
+    ObjBase* ObjBase::getConnectedObj(void) {
+        return 0;
+    }
     
     ObjRegistry::~ObjRegistry() {
     }
@@ -82,6 +82,15 @@ namespace Fw {
             //!
             //!  \param reg Instance of registry to be stored.
             static void setObjRegistry(ObjRegistry* reg); //!< sets the object registry, if desired
+
+            //!  \brief Returns the object this object is connected to
+            //!
+            //!  Used by object registries to report the connection graph.
+            //!  Output ports override it to return the input port they
+            //!  invoke. The default implementation returns 0.
+            //!
+            //!  \return connected object, or 0 if not connected
+            virtual ObjBase* getConnectedObj(void); //!< returns connected object, if any
 #endif            
             
         protected:
@@ -8,9 +8,54 @@
 
 namespace Fw {
 
+#if FW_OBJECT_NAMES == 1
+    // Destination of the object graph text: a buffer, or stdout if the buffer is 0
+    struct GraphWriter {
+        char* buffer;
+        NATIVE_INT_TYPE size;
+        NATIVE_INT_TYPE pos;
+        bool overflow;
+    };
+
+    static void writeChars(GraphWriter& writer, const char* str, NATIVE_INT_TYPE len) {
+        if (0 == writer.buffer) {
+            (void)printf("%.*s",len,str);
+        } else if (writer.pos + len < writer.size) {
+            memcpy(&writer.buffer[writer.pos],str,len);
+            writer.buffer[writer.pos + len] = 0;
+        } else {
+            writer.overflow = true;
+        }
+        writer.pos += len;
+    }
+
+    static void writeText(GraphWriter& writer, const char* str) {
+        writeChars(writer,str,strlen(str));
+    }
+
+    // Object names are written as JSON strings, escaping quotes and backslashes
+    static void writeName(GraphWriter& writer, const char* name, SimpleObjRegistry::GraphFormat format) {
+        if (SimpleObjRegistry::GRAPH_CSV == format) {
+            writeText(writer,name);
+            return;
+        }
+        writeChars(writer,"\"",1);
+        for (const char* c = name; *c; c++) {
+            if (('"' == *c) || ('\\' == *c)) {
+                writeChars(writer,"\\",1);
+            }
+            writeChars(writer,c,1);
+        }
+        writeChars(writer,"\"",1);
+    }
+#endif
+
     SimpleObjRegistry::SimpleObjRegistry(void) {
         ObjBase::setObjRegistry(this);
         this->m_numEntries = 0;
+#if FW_OBJECT_NAMES == 1 && FW_OBJ_SIMPLE_REG_INDEX == 1
+        this->m_indexValid = false;
+#endif
         // Initialize pointer array
         for (NATIVE_INT_TYPE entry = 0; entry < FW_OBJ_SIMPLE_REG_ENTRIES; entry++) {
             this->m_objPtrArray[entry] = 0;
@@ -39,30 +84,156 @@ namespace Fw {
 
 #if FW_OBJECT_NAMES == 1
     void SimpleObjRegistry::dump(const char* objName) {
+#if FW_OBJ_SIMPLE_REG_INDEX == 1
+        // Objects with the same name are adjacent in the index, in registration order
+        for (NATIVE_INT_TYPE idx = this->lowerBound(objName); idx < this->m_numEntries; idx++) {
+            NATIVE_INT_TYPE obj = this->m_sortedIndex[idx];
+            if (strncmp(objName,this->m_objPtrArray[obj]->getObjName(),FW_OBJ_NAME_MAX_SIZE) != 0) {
+                break;
+            }
+#else
         for (NATIVE_INT_TYPE obj = 0; obj < this->m_numEntries; obj++) {
-            char objDump[FW_OBJ_SIMPLE_REG_BUFF_SIZE];
-            if (strncmp(objName,this->m_objPtrArray[obj]->getObjName(),sizeof(objDump)) == 0) {
+            if (strncmp(objName,this->m_objPtrArray[obj]->getObjName(),FW_OBJ_NAME_MAX_SIZE) != 0) {
+                continue;
+            }
+#endif
 #if FW_OBJECT_TO_STRING == 1            
-                this->m_objPtrArray[obj]->toString(objDump,sizeof(objDump));
-                (void)printf("Entry: %d Ptr: %p Str: %s\n",obj,this->m_objPtrArray[obj],objDump);
+            char objDump[FW_OBJ_SIMPLE_REG_BUFF_SIZE];
+            this->m_objPtrArray[obj]->toString(objDump,sizeof(objDump));
+            (void)printf("Entry: %d Ptr: %p Str: %s\n",obj,this->m_objPtrArray[obj],objDump);
 #else
-                (void)printf("Entry: %d Ptr: %p Name: %s\n",obj,this->m_objPtrArray[obj],this->m_objPtrArray[obj]->getObjName());
+            (void)printf("Entry: %d Ptr: %p Name: %s\n",obj,this->m_objPtrArray[obj],this->m_objPtrArray[obj]->getObjName());
+#endif
+        }
+    }
+
+    ObjBase* SimpleObjRegistry::findObject(const char* objName) {
+        FW_ASSERT(objName);
+#if FW_OBJ_SIMPLE_REG_INDEX == 1
+        NATIVE_INT_TYPE idx = this->lowerBound(objName);
+        if (idx < this->m_numEntries) {
+            ObjBase* obj = this->m_objPtrArray[this->m_sortedIndex[idx]];
+            if (strncmp(objName,obj->getObjName(),FW_OBJ_NAME_MAX_SIZE) == 0) {
+                return obj;
+            }
+        }
+#else
+        for (NATIVE_INT_TYPE obj = 0; obj < this->m_numEntries; obj++) {
+            if (strncmp(objName,this->m_objPtrArray[obj]->getObjName(),FW_OBJ_NAME_MAX_SIZE) == 0) {
+                return this->m_objPtrArray[obj];
+            }
+        }
 #endif
+        return 0;
+    }
+
+#if FW_OBJ_SIMPLE_REG_INDEX == 1
+    // Names are usually set after objects register (ports are named after init()),
+    // so the index is built on the first lookup rather than as objects register.
+    // Call buildIndex() again if objects are renamed after a lookup.
+    void SimpleObjRegistry::buildIndex(void) {
+        // Binary insertion sort; equal names stay in registration order
+        for (NATIVE_INT_TYPE obj = 0; obj < this->m_numEntries; obj++) {
+            const char* name = this->m_objPtrArray[obj]->getObjName();
+            NATIVE_INT_TYPE low = 0;
+            NATIVE_INT_TYPE high = obj;
+            while (low < high) {
+                NATIVE_INT_TYPE mid = (low + high) / 2;
+                if (strncmp(this->m_objPtrArray[this->m_sortedIndex[mid]]->getObjName(),name,FW_OBJ_NAME_MAX_SIZE) <= 0) {
+                    low = mid + 1;
+                } else {
+                    high = mid;
+                }
+            }
+            memmove(&this->m_sortedIndex[low+1],&this->m_sortedIndex[low],(obj-low)*sizeof(this->m_sortedIndex[0]));
+            this->m_sortedIndex[low] = obj;
+        }
+        this->m_indexValid = true;
+    }
+
+    NATIVE_INT_TYPE SimpleObjRegistry::lowerBound(const char* objName) {
+        if (!this->m_indexValid) {
+            this->buildIndex();
+        }
+        NATIVE_INT_TYPE low = 0;
+        NATIVE_INT_TYPE high = this->m_numEntries;
+        while (low < high) {
+            NATIVE_INT_TYPE mid = (low + high) / 2;
+            if (strncmp(this->m_objPtrArray[this->m_sortedIndex[mid]]->getObjName(),objName,FW_OBJ_NAME_MAX_SIZE) < 0) {
+                low = mid + 1;
+            } else {
+                high = mid;
             }
         }
+        return low;
+    }
+#endif // FW_OBJ_SIMPLE_REG_INDEX
+
+    NATIVE_INT_TYPE SimpleObjRegistry::serializeGraph(char* buffer, NATIVE_INT_TYPE size, GraphFormat format) {
+        FW_ASSERT(buffer);
+        FW_ASSERT(size > 0,size);
+        buffer[0] = 0;
+        return this->writeGraph(buffer,size,format);
     }
-#endif	
+
+    void SimpleObjRegistry::dumpGraph(GraphFormat format) {
+        (void)this->writeGraph(0,0,format);
+        (void)printf("\n");
+    }
+
+    NATIVE_INT_TYPE SimpleObjRegistry::writeGraph(char* buffer, NATIVE_INT_TYPE size, GraphFormat format) {
+        GraphWriter writer = {buffer,size,0,false};
+
+        writeText(writer, (GRAPH_JSON == format) ? "{\"objects\":[" : "");
+        for (NATIVE_INT_TYPE obj = 0; obj < this->m_numEntries; obj++) {
+            if (GRAPH_JSON == format) {
+                writeText(writer, obj ? "," : "");
+            } else {
+                writeText(writer, "object,");
+            }
+            writeName(writer,this->m_objPtrArray[obj]->getObjName(),format);
+            writeText(writer, (GRAPH_JSON == format) ? "" : "\n");
+        }
+
+        writeText(writer, (GRAPH_JSON == format) ? "],\"connections\":[" : "");
+        bool first = true;
+        for (NATIVE_INT_TYPE obj = 0; obj < this->m_numEntries; obj++) {
+            ObjBase* target = this->m_objPtrArray[obj]->getConnectedObj();
+            if (0 == target) {
+                continue;
+            }
+            if (GRAPH_JSON == format) {
+                writeText(writer, first ? "[" : ",[");
+            } else {
+                writeText(writer, "connection,");
+            }
+            writeName(writer,this->m_objPtrArray[obj]->getObjName(),format);
+            writeText(writer, ",");
+            writeName(writer,target->getObjName(),format);
+            writeText(writer, (GRAPH_JSON == format) ? "]" : "\n");
+            first = false;
+        }
+        writeText(writer, (GRAPH_JSON == format) ? "]}" : "");
+
+        return writer.overflow ? -1 : writer.pos;
+    }
+#endif // FW_OBJECT_NAMES
+
     void SimpleObjRegistry::regObject(ObjBase* obj) {
         FW_ASSERT(this->m_numEntries < FW_OBJ_SIMPLE_REG_ENTRIES);
         this->m_objPtrArray[this->m_numEntries++] = obj;
-
+#if FW_OBJECT_NAMES == 1 && FW_OBJ_SIMPLE_REG_INDEX == 1
+        this->m_indexValid = false;
+#endif
     }
 
     void SimpleObjRegistry::clear(void) {
         this->m_numEntries = 0;
+#if FW_OBJECT_NAMES == 1 && FW_OBJ_SIMPLE_REG_INDEX == 1
+        this->m_indexValid = false;
+#endif
     }
 
 }
 
 #endif
-
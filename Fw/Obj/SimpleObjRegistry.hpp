@@ -34,15 +34,45 @@ namespace Fw {
 
     class SimpleObjRegistry : public ObjRegistry {
         public:
+            //! Output formats of the object graph
+            typedef enum {
+                GRAPH_JSON, //!< {"objects":[names],"connections":[[source,target]]}
+                GRAPH_CSV //!< "object,name" and "connection,source,target" lines
+            } GraphFormat;
+
             SimpleObjRegistry(void); //!< constructor for registry
             ~SimpleObjRegistry(); //!< destructor for registry
             void dump(void); //!< dump contents of registry
             void clear(void); //!< clear registry entries
 #if FW_OBJECT_NAMES == 1             
             void dump(const char* objName); //!< dump a particular object
+            ObjBase* findObject(const char* objName); //!< returns first object registered with a name, 0 if none
+#if FW_OBJ_SIMPLE_REG_INDEX == 1
+            void buildIndex(void); //!< (re)build the sorted name index; done on demand by lookups
+#endif
+            //!  \brief Write the object graph to a buffer
+            //!
+            //!  Writes every registered object and, for each connected output
+            //!  port, the object it is connected to. The text is null
+            //!  terminated.
+            //!
+            //!  \param buffer destination buffer
+            //!  \param size size of destination buffer
+            //!  \param format JSON or CSV
+            //!  \return number of characters written, or -1 if the buffer is too small
+            NATIVE_INT_TYPE serializeGraph(char* buffer, NATIVE_INT_TYPE size, GraphFormat format);
+            void dumpGraph(GraphFormat format); //!< print the object graph
 #endif            
         private:
             void regObject(ObjBase* obj); //!< register an object with the registry
+#if FW_OBJECT_NAMES == 1
+            NATIVE_INT_TYPE writeGraph(char* buffer, NATIVE_INT_TYPE size, GraphFormat format); //!< write graph to buffer, or print it if buffer is 0
+#if FW_OBJ_SIMPLE_REG_INDEX == 1
+            NATIVE_INT_TYPE lowerBound(const char* objName); //!< first index entry not sorted before a name
+            NATIVE_INT_TYPE m_sortedIndex[FW_OBJ_SIMPLE_REG_ENTRIES]; //!< entry numbers sorted by object name
+            bool m_indexValid; //!< index matches the registered objects
+#endif
+#endif
             ObjBase* m_objPtrArray[FW_OBJ_SIMPLE_REG_ENTRIES]; //!< array of objects
             NATIVE_INT_TYPE m_numEntries; //!< number of entries in the registry
     };
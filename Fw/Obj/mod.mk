@@ -26,5 +26,5 @@ SRC = \
 HDR = ObjBase.hpp \
 	SimpleObjRegistry.hpp
 	
-SUBDIRS = 
+SUBDIRS = test
 
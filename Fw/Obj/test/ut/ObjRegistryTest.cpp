@@ -0,0 +1,172 @@
+#include <Fw/Obj/SimpleObjRegistry.hpp>
+#include <Fw/Port/InputPortBase.hpp>
+#include <Fw/Port/OutputPortBase.hpp>
+
+#include <stdio.h>
+#include <string.h>
+
+#include <gtest/gtest.h>
+
+// A small test topology, named like the autocoded components name their ports:
+//
+//   SRC_DataOut_OutputPort[0] -> SNKA_DataIn_InputPort[0]
+//   SRC_DataOut_OutputPort[1] -> SNKB_DataIn_InputPort[0]
+//   SRC_Log_OutputPort[0] unconnected
+//
+// ObjRegistryTestTopologyAppAi.xml describes the same topology, so the
+// graph this test prints can be checked with Autocoders/bin/objGraphCheck.py.
+
+class TestComp : public Fw::ObjBase {
+    public:
+        TestComp(const char* name) : Fw::ObjBase(name) {
+        }
+        void init(void) {
+            Fw::ObjBase::init();
+        }
+};
+
+class TestInputPort : public Fw::InputPortBase {
+    public:
+        void init(void) {
+            Fw::InputPortBase::init();
+        }
+#if FW_PORT_SERIALIZATION
+        void invokeSerial(Fw::SerializeBufferBase &buffer) {
+        }
+#endif
+};
+
+class TestOutputPort : public Fw::OutputPortBase {
+    public:
+        void init(void) {
+            Fw::OutputPortBase::init();
+        }
+        // Connect like the autocoded addCallPort()
+        void addCallPort(Fw::InputPortBase* callPort) {
+            this->m_connObj = callPort;
+        }
+};
+
+class ObjRegistryTest : public ::testing::Test {
+    protected:
+        ObjRegistryTest() :
+            src("SRC"),
+            snkA("SNKA"),
+            snkB("SNKB") {
+        }
+
+        void SetUp(void) {
+            // Register like a topology: components, then their ports, named after init()
+            this->src.init();
+            this->snkA.init();
+            this->snkB.init();
+            for (NATIVE_INT_TYPE port = 0; port < 2; port++) {
+                this->dataOut[port].init();
+            }
+            this->logOut.init();
+            this->dataInA.init();
+            this->dataInB.init();
+            this->dataOut[0].setObjName("SRC_DataOut_OutputPort[0]");
+            this->dataOut[1].setObjName("SRC_DataOut_OutputPort[1]");
+            this->logOut.setObjName("SRC_Log_OutputPort[0]");
+            this->dataInA.setObjName("SNKA_DataIn_InputPort[0]");
+            this->dataInB.setObjName("SNKB_DataIn_InputPort[0]");
+            this->dataOut[0].addCallPort(&this->dataInA);
+            this->dataOut[1].addCallPort(&this->dataInB);
+        }
+
+        Fw::SimpleObjRegistry registry;
+        TestComp src;
+        TestComp snkA;
+        TestComp snkB;
+        TestOutputPort dataOut[2];
+        TestOutputPort logOut;
+        TestInputPort dataInA;
+        TestInputPort dataInB;
+};
+
+TEST_F(ObjRegistryTest,GraphJson) {
+    char graph[1024];
+    NATIVE_INT_TYPE len = this->registry.serializeGraph(graph,sizeof(graph),Fw::SimpleObjRegistry::GRAPH_JSON);
+    const char* expected =
+        "{\"objects\":[\"SRC\",\"SNKA\",\"SNKB\","
+        "\"SRC_DataOut_OutputPort[0]\",\"SRC_DataOut_OutputPort[1]\",\"SRC_Log_OutputPort[0]\","
+        "\"SNKA_DataIn_InputPort[0]\",\"SNKB_DataIn_InputPort[0]\"],"
+        "\"connections\":["
+        "[\"SRC_DataOut_OutputPort[0]\",\"SNKA_DataIn_InputPort[0]\"],"
+        "[\"SRC_DataOut_OutputPort[1]\",\"SNKB_DataIn_InputPort[0]\"]]}";
+    ASSERT_STREQ(expected,graph);
+    ASSERT_EQ((NATIVE_INT_TYPE)strlen(expected),len);
+    this->registry.dumpGraph(Fw::SimpleObjRegistry::GRAPH_JSON);
+}
+
+TEST_F(ObjRegistryTest,GraphCsv) {
+    char graph[1024];
+    NATIVE_INT_TYPE len = this->registry.serializeGraph(graph,sizeof(graph),Fw::SimpleObjRegistry::GRAPH_CSV);
+    const char* expected =
+        "object,SRC\n"
+        "object,SNKA\n"
+        "object,SNKB\n"
+        "object,SRC_DataOut_OutputPort[0]\n"
+        "object,SRC_DataOut_OutputPort[1]\n"
+        "object,SRC_Log_OutputPort[0]\n"
+        "object,SNKA_DataIn_InputPort[0]\n"
+        "object,SNKB_DataIn_InputPort[0]\n"
+        "connection,SRC_DataOut_OutputPort[0],SNKA_DataIn_InputPort[0]\n"
+        "connection,SRC_DataOut_OutputPort[1],SNKB_DataIn_InputPort[0]\n";
+    ASSERT_STREQ(expected,graph);
+    ASSERT_EQ((NATIVE_INT_TYPE)strlen(expected),len);
+}
+
+TEST_F(ObjRegistryTest,GraphOverflow) {
+    char graph[32];
+    ASSERT_EQ(-1,this->registry.serializeGraph(graph,sizeof(graph),Fw::SimpleObjRegistry::GRAPH_JSON));
+    // What fit is still terminated
+    ASSERT_LT(strlen(graph),sizeof(graph));
+}
+
+TEST_F(ObjRegistryTest,FindObject) {
+    ASSERT_EQ(&this->src,this->registry.findObject("SRC"));
+    ASSERT_EQ(&this->snkB,this->registry.findObject("SNKB"));
+    ASSERT_EQ(&this->dataOut[1],this->registry.findObject("SRC_DataOut_OutputPort[1]"));
+    ASSERT_EQ(&this->dataInA,this->registry.findObject("SNKA_DataIn_InputPort[0]"));
+    ASSERT_EQ(0,this->registry.findObject("SNK"));
+    ASSERT_EQ(0,this->registry.findObject("ZZZ"));
+    ASSERT_EQ(0,this->registry.findObject(""));
+    this->registry.dump("SRC_Log_OutputPort[0]");
+}
+
+TEST_F(ObjRegistryTest,IndexRebuild) {
+    // Registering an object invalidates the index
+    ASSERT_EQ(0,this->registry.findObject("LATE"));
+    TestComp late("LATE");
+    late.init();
+    ASSERT_EQ(&late,this->registry.findObject("LATE"));
+    this->registry.clear();
+    ASSERT_EQ(0,this->registry.findObject("SRC"));
+}
+
+TEST(ObjRegistryIndexTest,ManyObjects) {
+    Fw::SimpleObjRegistry registry;
+    static const NATIVE_INT_TYPE NUM_OBJS = 100;
+    TestComp* objs[NUM_OBJS];
+    char name[FW_OBJ_NAME_MAX_SIZE];
+    // Register in an order that is not sorted by name
+    for (NATIVE_INT_TYPE obj = 0; obj < NUM_OBJS; obj++) {
+        (void)snprintf(name,sizeof(name),"OBJ_%03d",(obj*37)%NUM_OBJS);
+        objs[obj] = new TestComp(name);
+        objs[obj]->init();
+    }
+    for (NATIVE_INT_TYPE obj = 0; obj < NUM_OBJS; obj++) {
+        (void)snprintf(name,sizeof(name),"OBJ_%03d",(obj*37)%NUM_OBJS);
+        ASSERT_EQ(objs[obj],registry.findObject(name));
+    }
+    for (NATIVE_INT_TYPE obj = 0; obj < NUM_OBJS; obj++) {
+        delete objs[obj];
+    }
+}
+
+int main(int argc, char **argv) {
+  ::testing::InitGoogleTest(&argc, argv);
+  return RUN_ALL_TESTS();
+}
@@ -36,6 +36,12 @@ namespace Fw {
     }
 #endif
     
+#if FW_OBJECT_REGISTRATION == 1
+    Fw::ObjBase* OutputPortBase::getConnectedObj(void) {
+        return this->m_connObj;
+    }
+#endif
+
 #if FW_OBJECT_TO_STRING == 1
     void OutputPortBase::toString(char* buffer, NATIVE_INT_TYPE size) {
 #if FW_OBJECT_NAMES == 1        
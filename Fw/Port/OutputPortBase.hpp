@@ -16,6 +16,9 @@ namespace Fw {
             void registerSerialPort(InputPortBase* port); // !< register a port for serialized calls
             void invokeSerial(SerializeBufferBase &buffer); // !< invoke the port with a serialized version of the call
 #endif            
+#if FW_OBJECT_REGISTRATION == 1
+            Fw::ObjBase* getConnectedObj(void); // !< port this port is connected to
+#endif
 
         protected:
             
@@ -12,11 +12,13 @@ import struct
 import select
 import multiprocessing
 import errno
+import collections
 #import GSEAdapter
 import time
 import logging
 
 from utils import Logger
+from utils.frame_reader import FrameReader
 from models.serialize.type_base import *
 from optparse import OptionParser
 
@@ -71,6 +73,7 @@ class ThreadedTCPRequestHandler(SocketServer.BaseRequestHandler):
         """
 
         self.partial = ''
+        self.reader = FrameReader(self.request)
         self.cmdQueue = []
         self.registered = False
         self.name = ''
@@ -204,23 +207,33 @@ class ThreadedTCPRequestHandler(SocketServer.BaseRequestHandler):
         """
         Read l bytes from socket.
         """
-        chunk =''
-        msg = ""
-        n = 0
-        while l > n:
-            try:
-                chunk = self.request.recv(l-n)
-                if chunk == '':
-                    print "read data from socket is empty!"
-                    return ''
-                msg = msg + chunk
-                n = len(msg)
-            except socket.error, err:
-                if err.errno == errno.ECONNRESET:
-                    print "Socket error " + str(err.errno) + " (Connection reset by peer) occurred on recv()."
-                else:
-                    print "Socket error " + str(err.errno) + " occurred on recv()."
-        return msg
+        try:
+            msg = self.reader.read(l)
+        except socket.error, err:
+            if err.errno == errno.ECONNRESET:
+                print "Socket error " + str(err.errno) + " (Connection reset by peer) occurred on recv()."
+            else:
+                print "Socket error " + str(err.errno) + " occurred on recv()."
+            return ''
+        if msg is None:
+            print "read data from socket is empty!"
+            return ''
+        return msg.tobytes()
+
+    def recvFrame(self, size_offset):
+        """
+        Read a size prefixed packet from socket, the size word
+        starting size_offset bytes into it.
+        """
+        try:
+            msg = self.reader.read_frame(size_offset)
+        except socket.error, err:
+            print "Socket error " + str(err.errno) + " occurred on recv()."
+            return ''
+        if msg is None:
+            print "read data from socket is empty!"
+            return ''
+        return msg.tobytes()
 
 
     def readHeader(self):
@@ -257,16 +270,11 @@ class ThreadedTCPRequestHandler(SocketServer.BaseRequestHandler):
             return ""
         dst = header.split(" ")[1].strip(" ")
         if dst == "FSW":
-            # Read variable length command data here...
-            desc = self.recv(4)
-            sizeb = self.recv(4)
-            size = struct.unpack(">I", sizeb)[0]
-            data = desc + sizeb + self.recv(size)
+            # Read variable length command data (descriptor, size, data) here...
+            data = self.recvFrame(4)
         elif dst == "GUI":
-            # Read telemetry data here...
-            tlm_packet_size = self.recv(4)
-            size = struct.unpack(">I", tlm_packet_size)[0]
-            data = tlm_packet_size + self.recv(size)
+            # Read telemetry data (size, data) here...
+            data = self.recvFrame(0)
 
         else:
             raise RuntimeError("unrecognized client")
@@ -356,6 +364,370 @@ class DestObj:
         """
         return self.socket
 
+#################################################
+# Event driven (single threaded) server mode
+#################################################
+
+# Outbound queue policies of the event driven server
+QUEUE_DROP  = "drop"
+QUEUE_BLOCK = "block"
+
+class _Poller:
+    """
+    Thin wrapper giving epoll and poll the same interface.
+    Timeouts are always given in seconds.
+    """
+    def __init__(self):
+        if hasattr(select, "epoll"):
+            self.__poll  = select.epoll()
+            self.__scale = 1.0
+            self.READ  = select.EPOLLIN
+            self.WRITE = select.EPOLLOUT
+            self.ERROR = select.EPOLLERR | select.EPOLLHUP
+        else:
+            self.__poll  = select.poll()
+            self.__scale = 1000.0
+            self.READ  = select.POLLIN
+            self.WRITE = select.POLLOUT
+            self.ERROR = select.POLLERR | select.POLLHUP | select.POLLNVAL
+
+    def register(self, fd, mask):
+        self.__poll.register(fd, mask)
+
+    def modify(self, fd, mask):
+        self.__poll.modify(fd, mask)
+
+    def unregister(self, fd):
+        self.__poll.unregister(fd)
+
+    def poll(self, timeout):
+        return self.__poll.poll(timeout * self.__scale)
+
+
+class DestQueue:
+    """
+    Bounded outbound queue of a client registered with the event
+    driven server.
+
+    Packets are queued whole and coalesced into a single send() when
+    the socket becomes writable.  When more than limit bytes are waiting
+    the QUEUE_DROP policy discards the oldest unsent packets, while the
+    QUEUE_BLOCK policy keeps them and lets the server stop reading from
+    the producers until the queue drains (back-pressure).
+    """
+    SEND_SIZE = 65536
+
+    def __init__(self, limit, policy):
+        self.limit   = limit
+        self.policy  = policy
+        self.chunks  = collections.deque()
+        self.size    = 0
+        # Bytes of chunks[0] already written to the socket
+        self.offset  = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return self.size
+
+    def full(self):
+        return self.size >= self.limit
+
+    def put(self, msg):
+        """
+        Queue a packet, applying the drop policy.
+        """
+        if self.policy == QUEUE_DROP:
+            # Never drop a partially sent packet, it would corrupt the stream
+            head = 1 if self.offset else 0
+            while len(self.chunks) > head and self.size + len(msg) > self.limit:
+                old = self.chunks[head]
+                del self.chunks[head]
+                self.size -= len(old)
+                self.dropped += 1
+        self.chunks.append(msg)
+        self.size += len(msg)
+
+    def send(self, sock):
+        """
+        Write as much queued data as the socket accepts.
+        Socket errors other than EAGAIN are raised to the caller.
+        """
+        while self.chunks:
+            if self.offset == 0 and len(self.chunks) > 1 and len(self.chunks[0]) < self.SEND_SIZE:
+                batch = []
+                n = 0
+                while self.chunks and n < self.SEND_SIZE:
+                    c = self.chunks.popleft()
+                    batch.append(c)
+                    n += len(c)
+                self.chunks.appendleft(''.join(batch))
+            head = self.chunks[0]
+            try:
+                sent = sock.send(memoryview(head)[self.offset:])
+            except socket.error, err:
+                if err.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    return
+                raise
+            self.size -= sent
+            self.offset += sent
+            if self.offset < len(head):
+                return
+            self.chunks.popleft()
+            self.offset = 0
+
+
+class EventClient:
+    """
+    Connection state of one client of the event driven server.
+    """
+    def __init__(self, sock, addr, limit, policy):
+        self.sock       = sock
+        self.fd         = sock.fileno()
+        self.addr       = addr
+        self.reader     = FrameReader(sock, EventTCPServer.RECV_SIZE)
+        self.out        = DestQueue(limit, policy)
+        self.registered = False
+        self.name       = ''
+        self.id         = 0
+        self.mask       = 0
+        # Destination group this client is waiting on under QUEUE_BLOCK
+        self.paused_on  = None
+
+    def fileno(self):
+        return self.fd
+
+
+class EventTCPServer:
+    """
+    Single threaded, non-blocking TCP socket server.
+
+    Speaks the same protocol as ThreadedTCPRequestHandler ("Register <name>",
+    "A5A5 GUI ", "A5A5 FSW ", "List" and "Quit") but multiplexes every
+    connection with epoll/poll instead of running a thread per client.
+    Each registered client gets a bounded DestQueue so that a slow reader
+    only affects itself (QUEUE_DROP) or throttles the producers
+    (QUEUE_BLOCK) instead of stalling every send.
+    """
+    RECV_SIZE = 65536
+
+    def __init__(self, server_address, queue_limit=4*1024*1024, queue_policy=QUEUE_DROP):
+        self.queue_limit  = queue_limit
+        self.queue_policy = queue_policy
+        self.clients = dict()
+        self.groups  = {'FSW' : [], 'GUI' : []}
+        self.dest_obj = dict()
+        self.__quit  = False
+
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind(server_address)
+        self.socket.listen(128)
+        self.socket.setblocking(0)
+        self.server_address = self.socket.getsockname()
+
+        self.poller = _Poller()
+        self.poller.register(self.socket.fileno(), self.poller.READ)
+
+    def serve_forever(self, poll_interval=0.5):
+        """
+        Run the event loop until a "Quit" is received or the global
+        shutdown event is set.
+        """
+        while not (self.__quit or shutdown_event.is_set()):
+            try:
+                events = self.poller.poll(poll_interval)
+            except (select.error, IOError, OSError), err:
+                if err.args[0] == errno.EINTR:
+                    continue
+                raise
+
+            for fd, ev in events:
+                if fd == self.socket.fileno():
+                    self.__accept()
+                    continue
+                client = self.clients.get(fd)
+                if client is None:
+                    continue
+                if ev & self.poller.READ:
+                    self.__read(client)
+                if ev & self.poller.WRITE and fd in self.clients:
+                    self.__write(client)
+                if ev & self.poller.ERROR and not ev & self.poller.READ and fd in self.clients:
+                    self.__close(client)
+
+            self.__update()
+
+    def server_close(self):
+        for client in self.clients.values():
+            self.__close(client)
+        self.poller.unregister(self.socket.fileno())
+        self.socket.close()
+
+    def __accept(self):
+        while True:
+            try:
+                sock, addr = self.socket.accept()
+            except socket.error, err:
+                if err.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    return
+                print "Socket error " + str(err.errno) + " occurred on accept()."
+                return
+            sock.setblocking(0)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            client = EventClient(sock, addr, self.queue_limit, self.queue_policy)
+            client.mask = self.poller.READ
+            self.clients[client.fileno()] = client
+            self.poller.register(client.fileno(), client.mask)
+
+    def __close(self, client):
+        fd = client.fileno()
+        self.poller.unregister(fd)
+        del self.clients[fd]
+        if client.registered:
+            del self.dest_obj[client.name]
+            for group in self.groups.values():
+                if client in group:
+                    group.remove(client)
+            print "Closed %s connection (%d packets dropped)." % (client.name, client.out.dropped)
+        client.registered = False
+        try:
+            client.sock.close()
+        except socket.error:
+            pass
+
+    def __read(self, client):
+        try:
+            n = client.reader.fill()
+        except socket.error, err:
+            if err.errno in (errno.EAGAIN, errno.EWOULDBLOCK, errno.EINTR):
+                return
+            print "Socket error " + str(err.errno) + " occurred on recv()."
+            n = 0
+        if not n:
+            if not client.registered:
+                print "Client exited."
+            self.__close(client)
+            return
+        self.__parse(client)
+
+    def __write(self, client):
+        try:
+            client.out.send(client.sock)
+        except socket.error, err:
+            print "Socket error " + str(err.errno) + " occurred on send()."
+            self.__close(client)
+
+    def __update(self):
+        """
+        Resume paused producers and refresh the poll mask of every client.
+        """
+        for client in self.clients.values():
+            if client.paused_on is not None:
+                if not [d for d in self.groups[client.paused_on] if d.out.full()]:
+                    client.paused_on = None
+                    self.__parse(client)
+                    if client.fileno() not in self.clients:
+                        continue
+            mask = 0
+            if client.paused_on is None:
+                mask |= self.poller.READ
+            if len(client.out):
+                mask |= self.poller.WRITE
+            if mask != client.mask:
+                client.mask = mask
+                self.poller.modify(client.fileno(), mask)
+
+    def __parse(self, client):
+        """
+        Consume every complete command or packet in the client's input buffer.
+        """
+        reader = client.reader
+        while client.paused_on is None and not self.__quit:
+            avail = reader.available()
+            if not client.registered:
+                pending = reader.peek(avail).tobytes()
+                nl = pending.find('\n')
+                if nl < 0:
+                    break
+                reader.consume(nl + 1)
+                self.__register(client, pending[:nl])
+                continue
+
+            if avail < 5:
+                break
+            header = reader.peek(5).tobytes()
+            if header == "List\n":
+                reader.consume(5)
+                self.__list(client)
+                continue
+            elif header == "Quit\n":
+                print "Quit received!"
+                self.__quit = True
+                break
+            elif header != "A5A5 ":
+                print "Command missing A5A5 header, closing %s." % client.name
+                self.__close(client)
+                return
+
+            if avail < 9:
+                break
+            dst = reader.peek(4, 5).tobytes().strip(" ")
+            if dst == "FSW":
+                # Descriptor and size words precede variable length commands
+                hdr_len = 8
+            elif dst == "GUI":
+                hdr_len = 4
+            else:
+                print "Unrecognized destination %s, closing %s." % (dst, client.name)
+                self.__close(client)
+                return
+            if avail < 9 + hdr_len:
+                break
+            size = struct.unpack_from(">I", reader.peek(4, 5 + hdr_len))[0]
+            data = reader.peek(hdr_len + size, 9)
+            if data is None:
+                break
+            reader.consume(9 + hdr_len + size)
+            self.__route(client, dst, data.tobytes())
+
+    def __register(self, client, cmd):
+        params = cmd.split()
+        if len(params) < 2 or params[0] != 'Register' or client.registered:
+            return
+        name = params[1]
+        id = 0
+        for group in self.groups:
+            if group in name:
+                members = self.groups[group]
+                if members:
+                    id = max([c.id for c in members]) + 1
+                name = params[1] + '_' + str(id)
+                members.append(client)
+                break
+        client.registered = True
+        client.name = name
+        client.id = id
+        self.dest_obj[name] = client
+        print "Registered client " + name
+
+    def __list(self, client):
+        print "List of registered clients: "
+        for name in self.dest_obj.keys():
+            print "\t" + name
+            reg_client_str = "List " + name
+            l = len(reg_client_str)
+            client.out.put(struct.pack("i%ds" % l, l, reg_client_str))
+
+    def __route(self, client, dst, data):
+        """
+        Fan a packet out to every client registered under dst.
+        """
+        for dest in self.groups[dst]:
+            dest.out.put(data)
+            if dest.out.full() and dest.out.policy == QUEUE_BLOCK:
+                client.paused_on = dst
+
+
 def main(argv=None):
         global SERVER, LOCK
 
@@ -376,12 +748,30 @@ def main(argv=None):
                              default=50007)
             parser.add_option("-i", "--host", dest="host", action="store", type="string", help="Set threaded tcp socket server ip [default: %default]", \
                              default="127.0.0.1")
+            parser.add_option("-m", "--mode", dest="mode", action="store", type="choice", choices=["threaded", "event"], \
+                             help="Server mode, a thread per client or a single event driven loop [default: %default]", default="threaded")
+            parser.add_option("-q", "--queue-limit", dest="queue_limit", action="store", type="int", \
+                             help="Event mode: outbound queue limit per client in bytes [default: %default]", default=4*1024*1024)
+            parser.add_option("-b", "--queue-policy", dest="queue_policy", action="store", type="choice", choices=[QUEUE_DROP, QUEUE_BLOCK], \
+                             help="Event mode: drop oldest packets or block producers when a queue is full [default: %default]", default=QUEUE_DROP)
 
             # process options
             (opts, args) = parser.parse_args(argv)
 
             HOST = opts.host
             PORT = opts.port
+
+            if opts.mode == "event":
+                server = EventTCPServer((HOST, PORT), opts.queue_limit, opts.queue_policy)
+                SERVER = server
+                print "Event TCP Socket Server listening on host addr %s, port %s" % (HOST, PORT)
+                signal.signal(signal.SIGINT, signal_handler)
+                try:
+                    server.serve_forever()
+                finally:
+                    server.server_close()
+                return 0
+
             server = ThreadedTCPServer((HOST, PORT), ThreadedTCPRequestHandler)
             # Hopefully this will allow address reuse and server to restart immediately
             server.allow_reuse_address = True
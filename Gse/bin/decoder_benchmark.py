@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+#===============================================================================
+# NAME: decoder_benchmark
+#
+# DESCRIPTION: Compares the per-field type object decoding of channel and
+# event packets with the precompiled controllers.packet_decoder decoders.
+# Both decoders are run over the same synthetic packets, their results are
+# checked to be identical and the packets/second of each are printed.
+#
+# Copyright 2015, California Institute of Technology.
+# ALL RIGHTS RESERVED. U.S. Government Sponsorship acknowledged.
+#===============================================================================
+
+import sys
+import time
+import random
+import struct
+from optparse import OptionParser
+
+from controllers import packet_decoder
+from models.common.channel_telemetry import Channel
+from models.common.event import Event, Severity
+from models.serialize.u8_type import U8Type
+from models.serialize.u16_type import U16Type
+from models.serialize.u32_type import U32Type
+from models.serialize.i32_type import I32Type
+from models.serialize.f32_type import F32Type
+from models.serialize.f64_type import F64Type
+from models.serialize.string_type import StringType
+
+
+def legacy_decode(msg, obj_dict, is_event):
+  '''
+  Decode a packet one type object per field, like the listeners used to.
+  '''
+  ptr = 0
+  for t in (U32Type, U32Type, U32Type):
+    o = t()
+    o.deserialize(msg, ptr)
+    ptr += o.getSize()
+  i = o.val
+  tm = []
+  for t in (U16Type, U8Type, U32Type, U32Type):
+    o = t()
+    o.deserialize(msg, ptr)
+    ptr += o.getSize()
+    tm.append(o.val)
+  obj = obj_dict[i]
+  if is_event:
+    return (i, tuple(tm), obj.deserialize(msg[ptr:]))
+  obj.setTime(*tm)
+  return (i, tuple(tm), obj.deserialize(msg, ptr))
+
+
+def make_channels(n):
+  types = [(U32Type, '>I', lambda: random.randint(0, 2**32-1)),
+           (I32Type, '>i', lambda: random.randint(-2**31, 2**31-1)),
+           (F32Type, '>f', lambda: 1.5),
+           (F64Type, '>d', lambda: random.random())]
+  chans = dict()
+  packets = []
+  for i in range(n):
+    (t, fmt, gen) = types[i % len(types)]
+    chans[i] = Channel("CH_%d" % i, i, "Comp", "desc", t(), None, None, None, None, None, None, None)
+    body = struct.pack(">IHBII", i, 2, 0, 1000 + i, 500) + struct.pack(fmt, gen())
+    packets.append(struct.pack(">II", len(body) + 4, 1) + body)
+  return chans, packets
+
+
+def make_events(n):
+  events = dict()
+  packets = []
+  for i in range(n):
+    args = [("a", "", U32Type()), ("b", "", F64Type())]
+    body = struct.pack(">IHBII", i, 2, 0, 1000 + i, 500) + struct.pack(">Id", i, 0.25)
+    if i % 2:
+      s = "string %d" % i
+      args.append(("c", "", StringType()))
+      body += struct.pack(">H", len(s)) + s
+    events[i] = Event("EV_%d" % i, i, Severity.ACTIVITY_HI, "%d %f %s"[:3 * len(args) - 1], "desc", args)
+    packets.append(struct.pack(">II", len(body) + 4, 2) + body)
+  return events, packets
+
+
+def bench(name, decode, packets, rounds):
+  start = time.time()
+  for r in range(rounds):
+    for msg in packets:
+      decode(msg)
+  rate = rounds * len(packets) / (time.time() - start)
+  print "%-24s %12.0f packets/second" % (name, rate)
+  return rate
+
+
+def main():
+  parser = OptionParser(description="Benchmark channel and event packet decoding")
+  parser.add_option("-n", "--ids", dest="ids", type="int", default=200, help="Number of channel and event IDs [default: %default]")
+  parser.add_option("-r", "--rounds", dest="rounds", type="int", default=50, help="Passes over the packets [default: %default]")
+  (opts, args) = parser.parse_args(sys.argv[1:])
+
+  chans, ch_packets = make_channels(opts.ids)
+  events, ev_packets = make_events(opts.ids)
+  ch_decoder = packet_decoder.ChannelDecoder(chans)
+  ev_decoder = packet_decoder.EventDecoder(events)
+
+  for msg in ch_packets:
+    if ch_decoder.decode(msg) != legacy_decode(msg, chans, False):
+      print "Channel decode mismatch: %r" % msg
+      return 1
+  for msg in ev_packets:
+    if ev_decoder.decode(msg) != legacy_decode(msg, events, True):
+      print "Event decode mismatch: %r" % msg
+      return 1
+
+  before = bench("channels (type objects)", lambda m: legacy_decode(m, chans, False), ch_packets, opts.rounds)
+  after = bench("channels (compiled)", ch_decoder.decode, ch_packets, opts.rounds)
+  print "%-24s %12.1fx" % ("speedup", after / before)
+  before = bench("events (type objects)", lambda m: legacy_decode(m, events, True), ev_packets, opts.rounds)
+  after = bench("events (compiled)", ev_decoder.decode, ev_packets, opts.rounds)
+  print "%-24s %12.1fx" % ("speedup", after / before)
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
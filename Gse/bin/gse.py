@@ -25,8 +25,10 @@ import random
 from utils import Logger
 from utils import PortFinder
 from utils import ConfigManager
+from utils import async_log
 
 import controllers.exceptions
+from controllers import module_loader
 import traceback
 
 from views import main_panel_factory
@@ -186,6 +188,10 @@ def main(argv=None):
                           default=None)
         parser.add_option("-l", "--log-time", dest="log_time", action="store", type="string", help="Time used for logging. (local, GMT)", \
                           default="local")
+        parser.add_option("-f", "--log-format", dest="log_format", action="store", type="choice", choices=async_log.LOG_FORMATS, help="Format of the channel and event logs: text, or binary raw packets readable with utils/binary_log.py [default: %default]", \
+                          default="text")
+        parser.add_option("-k", "--dict-cache", dest="dict_cache_flag", action="store", type="int", help="Flag to cache the loaded dictionaries next to the generated files (1=ON, 0=OFF) [default: %default]", \
+                          default=module_loader.CACHE_FLAG)
         parser.add_option("-n", "--no-about", dest="no_about", action="store_true", help="Do not show about text screen on start", \
                           default=True)
 
@@ -219,6 +225,9 @@ def main(argv=None):
         # set the binary logger flag
         Logger.setBinLoggerFlag(opts.bin_logger_flag)
 
+        # set the dictionary cache flag
+        module_loader.setCacheFlag(opts.dict_cache_flag)
+
         # make the
 
         #
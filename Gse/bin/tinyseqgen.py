@@ -17,6 +17,10 @@ import sys
 import re
 import os
 import copy
+import glob
+import multiprocessing
+import struct
+from optparse import OptionParser
 from datetime import datetime, timedelta
 
 __author__ = "Kevin Dinkel"
@@ -37,6 +41,8 @@ from models.common.command import Descriptor
 from views.seq_panel import SeqBinaryWriter
 from controllers import command_loader
 from controllers import exceptions as gseExceptions
+from controllers import module_loader
+from models.serialize.type_exceptions import ArgLengthMismatchException, TypeException
 
 # except:
 #  __error("The Gse source code was not found in your $PYTHONPATH variable. Please set PYTHONPATH to something like: $BUILD_ROOT/Gse/src:$BUILD_ROOT/Gse/generated/$DEPLOYMENT_NAME")
@@ -226,44 +232,88 @@ def __parse(seqfile):
               __errorLine(i, "Encountered sytax error parsing arguments")
         yield i, descriptor, seconds, useconds, mnemonic, args
 
-def generateSequence(inputFile, outputFile=None):
+class CommandSerializer(object):
   '''
-  Write a binary sequence file from a text sequence file
-  @param inputFile: A text input sequence file name (usually a .seq extension)
-  @param outputFile: An output binary sequence file name (usually a .bin extension)
+  Serializes one dictionary command into binary sequence records. The argument
+  types are copied once, when the serializer is made, instead of copying the whole
+  command object for every line of a sequence.
   '''
+  # Record header: descriptor, seconds, useconds, command length,
+  # and command header: combuffer type enum (FW_PACKET_COMMAND = 0), opcode
+  __header = struct.Struct(">BIIIII")
+
+  def __init__(self, command_obj):
+    '''
+    @param command_obj: the command object from the command dictionary
+    '''
+    self.__opcode = command_obj.getOpCode()
+    self.__arg_types = [copy.deepcopy(arg_type) for (arg_name, arg_desc, arg_type) in command_obj.getArgs()]
+
+  def record(self, descriptor, seconds, useconds, args):
+    '''
+    Return the binary record of the command, the same as the one
+    SeqBinaryWriter makes for a command object with these arguments.
+    @param args: raw python values of the arguments
+    @raise ArgLengthMismatchException, TypeException: on bad arguments
+    '''
+    if len(args) != len(self.__arg_types):
+      raise ArgLengthMismatchException(len(self.__arg_types), len(args))
+    arg_data = []
+    for value, arg_type in zip(args, self.__arg_types):
+      # Setting the value checks it against the type
+      arg_type.val = value
+      arg_data.append(arg_type.serialize())
+    arg_data = "".join(arg_data)
+    # subtract 1 from the value because enum34 enums start at 1
+    return self.__header.pack(descriptor.value - 1, seconds, useconds, len(arg_data) + 8, 0, self.__opcode) + arg_data
+
+# Serializers by mnemonic, made once per process by loadSerializers()
+__serializers = None
+
+def loadSerializers():
+  '''
+  Load the command dictionary from $GSE_GENERATED_PATH and return a dictionary of
+  CommandSerializer by command mnemonic. The dictionary is only loaded once per process.
+  '''
+  global __serializers
+  if __serializers is not None:
+    return __serializers
   # Check the user environment:
   try:
     generated_path = os.environ['GSE_GENERATED_PATH']
     generated_command_path = generated_path + "/commands"
   except:
     __error("Environment variable 'GSE_GENERATED_PATH' not set. It should be set to something like '$BUILD_ROOT/Gse/generated/$DEPLOYMENT' and also added to $PYTHONPATH.")
-  command_loader = command_loader.CommandLoader.getInstance()
+  cmd_loader = command_loader.CommandLoader.getInstance()
   try:
-    command_loader.create(generated_command_path)
+    cmd_loader.create(generated_command_path)
   except gseExceptions.GseControllerUndefinedDirectoryException:
     __error("Environment variable 'GSE_GENERATED_PATH' is set to '" + generated_path + "'. This is not a valid directory. Make sure this variable is set correctly, and the GSE python deployment autocode as been installed in this location.")
+  __serializers = dict()
+  for mnemonic, command_obj in cmd_loader.getCommandDict().items():
+    __serializers[mnemonic] = CommandSerializer(command_obj)
+  return __serializers
+
+def generateSequence(inputFile, outputFile=None):
+  '''
+  Write a binary sequence file from a text sequence file
+  @param inputFile: A text input sequence file name (usually a .seq extension)
+  @param outputFile: An output binary sequence file name (usually a .bin extension)
+  '''
+  serializers = loadSerializers()
 
   # Parse the input file:
-  command_list = []
-  command_obj_dict = command_loader.getCommandDict()
+  records = []
   for i, descriptor, seconds, useconds, mnemonic, args in __parse(inputFile):
     # Make sure that command is in the command dictionary:
-    if mnemonic in command_obj_dict:
-      command_obj = copy.deepcopy(command_obj_dict[mnemonic])
-      # Set the command arguments:
+    if mnemonic in serializers:
+      # Serialize the command with its arguments and time:
       try:
-        command_obj.setArgs(args)
+        records.append(serializers[mnemonic].record(descriptor, seconds, useconds, args))
       except ArgLengthMismatchException as e:
         __errorLine(i, "'" + mnemonic + "' argument length mismatch. " + e.getMsg())
       except TypeException as e:
         __errorLine(i, "'" + mnemonic + "' argument type mismatch. " + e.getMsg())
-      # Set the command time and descriptor:
-      command_obj.setDescriptor(descriptor)
-      command_obj.setSeconds(seconds)
-      command_obj.setUseconds(useconds)
-      # Append this command to the command list:
-      command_list.append(command_obj)
     else:
       __errorLine(i, "'" + mnemonic + "' does not match any command in the command dictionary.")
 
@@ -275,18 +325,88 @@ def generateSequence(inputFile, outputFile=None):
     writer.open(outputFile)
   except:
     __error("Encountered problem opening output file '" + outputFile + "'.")
-  writer.write(command_list)
+  writer.writeRecords(records)
   writer.close()
 
+def __compileFile(files):
+  '''
+  Batch worker: compile one sequence file, reporting errors instead of exiting.
+  @param files: a tuple (inputFile, outputFile)
+  @return a tuple (inputFile, True if the file compiled)
+  '''
+  inputFile, outputFile = files
+  try:
+    generateSequence(inputFile, outputFile)
+  except SystemExit:
+    # The error was printed by __error
+    return inputFile, False
+  except Exception as e:
+    print "Error compiling '%s': %s" % (inputFile, e)
+    return inputFile, False
+  return inputFile, True
+
+def generateSequences(inputs, outputDir=None, jobs=None):
+  '''
+  Compile many text sequence files in parallel. The command dictionary is loaded
+  once, before the worker processes are forked, so all of them share it.
+  @param inputs: .seq file names, or directories whose .seq files are compiled
+  @param outputDir: directory of the .bin files, next to each .seq file if None
+  @param jobs: number of worker processes, the number of CPUs if None
+  @return the list of the input files that failed to compile
+  '''
+  inputFiles = []
+  for name in inputs:
+    if os.path.isdir(name):
+      inputFiles.extend(sorted(glob.glob(os.path.join(name, "*.seq"))))
+    else:
+      inputFiles.append(name)
+  files = []
+  for inputFile in inputFiles:
+    if outputDir:
+      outputFile = os.path.join(outputDir, os.path.splitext(os.path.basename(inputFile))[0] + ".bin")
+    else:
+      outputFile = None
+    files.append((inputFile, outputFile))
+
+  loadSerializers()
+  if jobs == 1 or len(files) < 2:
+    results = map(__compileFile, files)
+  else:
+    pool = multiprocessing.Pool(jobs)
+    try:
+      results = pool.map(__compileFile, files, 1)
+    finally:
+      pool.close()
+      pool.join()
+  failed = [inputFile for inputFile, ok in results if not ok]
+  print "Compiled %d of %d sequence files" % (len(files) - len(failed), len(files))
+  return failed
+
 if __name__ == "__main__":
   '''
   The main program if run from the commandline. Note that this file can also be used
   as a module by calling the generateSequence() function
   '''
-  if len(sys.argv) == 2 or len(sys.argv) == 3:
-    generateSequence(*sys.argv[1:])
+  parser = OptionParser(usage="%prog sequence_file_in.seq [binary_sequence_file_out.bin]\n"
+                             "       %prog -B [options] (sequence_file.seq | directory)...")
+  parser.add_option("-B", "--batch", dest="batch", action="store_true", default=False,
+                    help="Compile all the given .seq files, and the .seq files of the given directories, in parallel")
+  parser.add_option("-j", "--jobs", dest="jobs", action="store", type="int", default=None,
+                    help="Number of batch worker processes [default: number of CPUs]")
+  parser.add_option("-o", "--output-dir", dest="output_dir", action="store", type="string", default=None,
+                    help="Batch output directory of the .bin files [default: next to each .seq file]")
+  parser.add_option("-k", "--dict-cache", dest="dict_cache_flag", action="store", type="int", default=0,
+                    help="Flag to cache the loaded command dictionary next to the generated files (1=ON, 0=OFF) [default: %default]")
+  (opts, args) = parser.parse_args()
+  module_loader.setCacheFlag(opts.dict_cache_flag)
+
+  if opts.batch and args:
+    if generateSequences(args, opts.output_dir, opts.jobs):
+      sys.exit(1)
+  elif len(args) == 1 or len(args) == 2:
+    generateSequence(*args)
   else:
-    print "Usage: tinyseqgen sequence_file_in.seq [binary_sequence_file_out.bin]"
+    parser.print_usage()
     print
     print "Welcome to tinyseqgen - the Tiny F Prime Command Sequence Generator."
     print
@@ -35,12 +35,14 @@ import time
 from controllers import stripchart_listener
 from controllers import observer
 from controllers import channel_loader
+from controllers import packet_decoder
 from models.serialize import type_base
 from models.serialize import u32_type
 from models.serialize import u16_type
 from models.serialize import u8_type
 #from views import main_panel
 from utils import Logger
+from utils import async_log
 
 
 
@@ -64,11 +66,21 @@ class ChannelListener(observer.Observed):
         #
         self.__channel_loader = channel_loader.ChannelLoader.getInstance()
         self.__ch_obj_dict = self.__channel_loader.getChDict()
+        self.__decoder = packet_decoder.ChannelDecoder(self.__ch_obj_dict)
         #
         self.__stripchart_listener = stripchart_listener.StripChartListener.getInstance()
 
         self.__current_ch_msg = None
         self.__opt = None
+        self.__log = None
+        self.__log_binary = False
+        self.__stamp = None
+        #
+        # Latest item of each channel staged since the last flush(),
+        # and the items of the last update for the observers
+        #
+        self.__staged = collections.OrderedDict()
+        self.__current_ch_msgs = []
 
 
     def getInstance():
@@ -92,17 +104,20 @@ class ChannelListener(observer.Observed):
             p = os.environ['HOME'] + os.sep + 'fprime_logs' + os.sep + "channel"
         else:
             p = opt.log_file_path + os.sep + opt.log_file_prefix + os.sep + "channel"
-        #
-        logfile = 'Channel.log'
-
         self.__opt = opt
+        self.__log_binary = opt is not None and getattr(opt, "log_format", "text") == "binary"
+        self.__stamp = async_log.TimeStamp(gmt=opt is not None and opt.log_time == "GMT")
         #
         if not os.path.exists(p):
             os.makedirs(p)
-        f = p + os.sep + logfile
-        self.__logger = Logger.connectOutputLogger(f, 'channel')
-        self.__logger.info("Created log: %s" % f)
-        self.__logger.info("User: %s" % os.environ['USER'])
+        if self.__log_binary:
+            f = p + os.sep + 'Channel.bin'
+            self.__log = async_log.open_log(f, async_log.format_packets, binary=True)
+        else:
+            f = p + os.sep + 'Channel.log'
+            self.__log = async_log.open_log(f, self.__format_log)
+            self.__log.write_now("Created log: %s\n" % f)
+            self.__log.write_now("User: %s\n" % os.environ['USER'])
 
 
     def decode_ch(self, msg):
@@ -111,66 +126,13 @@ class ChannelListener(observer.Observed):
         """
         #type_base.showBytes(msg)
         #
-        ptr = 0
-        # Decode size here...
-        u32_obj = u32_type.U32Type()
-        u32_obj.deserialize(msg, ptr)
-        size = u32_obj.val
-        ptr += u32_obj.getSize()
-        #print "Size = 0x%x" % size
-
-        # Decode descriptor part of message
-        u32_obj = u32_type.U32Type()
-        u32_obj.deserialize(msg, ptr)
-        desc = u32_obj.val
-        ptr += u32_obj.getSize()
-        #print "Desc = 0x%x" % desc
-
-        # Decode channel ID here...
-        u32_obj = u32_type.U32Type()
-        u32_obj.deserialize(msg, ptr)
-        ptr += u32_obj.getSize()
-        i = u32_obj.val
-        #print "ID: 0x%04X" % i
-
-        # Decode time...
-        # Base
-        u32_obj = u16_type.U16Type()
-        u32_obj.deserialize(msg, ptr)
-        ptr += u32_obj.getSize()
-        time_base = u32_obj.val
-        #print "Time Base: %d" % time_base
-
-        # Decode context
-        u8_obj = u8_type.U8Type()
-        u8_obj.deserialize(msg,ptr)
-        ptr += u8_obj.getSize()
-        time_context = u8_obj.val
-        #print "Time Context: %d" % time_context
-
-        # Seconds
-        u32_obj = u32_type.U32Type()
-        u32_obj.deserialize(msg, ptr)
-        ptr += u32_obj.getSize()
-        time_secs = u32_obj.val
-        #print "Time Seconds: %d" % time_secs
-        # Micro-seconds
-        u32_obj = u32_type.U32Type()
-        u32_obj.deserialize(msg, ptr)
-        ptr += u32_obj.getSize()
-        time_usecs = u32_obj.val
-        #print "Time MicroSeconds: %d" % time_usecs
+        # Decode channel ID, time and value with the precompiled decoder...
+        (i, (time_base, time_context, time_secs, time_usecs), ch_value) = self.__decoder.decode(msg)
 
         # Decode value here...
         # Look up correct Channel channel telemetry instance object for decoding
         if i in self.__ch_obj_dict:
             ch_obj = self.__ch_obj_dict[i]
-            #
-            # Set time here...
-            ch_obj.setTime(time_base,time_context,time_secs,time_usecs)
-            #
-            # Deserialize to a tuple to stringify
-            ch_value = ch_obj.deserialize(msg, ptr)
             #print "Value: %s" % ch_value
             #
             # Package NAME, ID, CH. Desc., time, and Value into tuple for views update.
@@ -178,7 +140,7 @@ class ChannelListener(observer.Observed):
             name = ch_obj.getName()
             i    = ch_obj.getId()
             ch   = ch_obj.getChDesc()
-            t    = ch_obj.getTime()
+            t    = (time_base, time_context, time_secs, time_usecs)
             f    = ch_obj.getFormatString()
             lr   = ch_obj.getLowRed()
             lo   = ch_obj.getLowOrange()
@@ -199,66 +161,14 @@ class ChannelListener(observer.Observed):
         """
         #type_base.showBytes(msg)
         #
-        ptr = 0
-        # Decode size here...
-        u32_obj = u32_type.U32Type()
-        u32_obj.deserialize(msg, 0)
-        size = u32_obj.val
-        ptr += u32_obj.getSize()
-        #print "Size = 0x%x" % size
-
-        # Decode descriptor part of message
-        u32_obj = u32_type.U32Type()
-        u32_obj.deserialize(msg, ptr)
-        desc = u32_obj.val
-        ptr += u32_obj.getSize()
-        #print "Desc = 0x%x" % desc
-
-        # Decode log channel ID here...
-        u32_obj = u32_type.U32Type()
-        u32_obj.deserialize(msg, ptr)
-        ptr += u32_obj.getSize()
-        i = u32_obj.val
-        #print "ID: %d" % i
-
-        # Decode time...
-        # Time base
-        u32_obj = u16_type.U16Type()
-        u32_obj.deserialize(msg, ptr)
-        ptr += u32_obj.getSize()
-        time_base = u32_obj.val
-        #print "Time Base: %d" % time_base
-
-        # Time context
-        u8_obj = u8_type.U8Type()
-        u8_obj.deserialize(msg,ptr)
-        ptr += u8_obj.getSize()
-        time_context = u8_obj.val
-
-        # Seconds
-        u32_obj = u32_type.U32Type()
-        u32_obj.deserialize(msg, ptr)
-        ptr += u32_obj.getSize()
-        time_secs = u32_obj.val
-        #print "Time Seconds: %d" % time_secs
-        # Micro-seconds
-        u32_obj = u32_type.U32Type()
-        u32_obj.deserialize(msg, ptr)
-        ptr += u32_obj.getSize()
-        time_usecs = u32_obj.val
-        #print "Time MicroSeconds: %d" % time_usecs
+        # Decode channel ID, time and value with the precompiled decoder...
+        (i, (time_base, time_context, time_secs, time_usecs), ch_value) = self.__decoder.decode(msg)
 
         val = []
         # Decode value here...
         # Look up correct Channel channel telemetry instance object for decoding
         if i in self.__ch_obj_dict:
             ch_obj = self.__ch_obj_dict[i]
-            #
-            # Set time here...
-            ch_obj.setTime(time_base,time_context, time_secs,time_usecs)
-            #
-            # Deserialize to a tuple to stringify
-            ch_value = ch_obj.deserialize(msg, ptr)
             #print "Value: %s" % ch_value
             #
             # Package NAME, ID, CH. Desc., time, and Value into tuple for views update.
@@ -266,7 +176,7 @@ class ChannelListener(observer.Observed):
             name = ch_obj.getName()
             i    = ch_obj.getId()
             ch   = ch_obj.getChDesc()
-            t    = ch_obj.getTime()
+            t    = (time_base, time_context, time_secs, time_usecs)
             f    = ch_obj.getFormatString()
             lr   = ch_obj.getLowRed()
             lo   = ch_obj.getLowOrange()
@@ -287,29 +197,45 @@ class ChannelListener(observer.Observed):
         Used by channel telemetry panel update() to get the channel telemetry to update.
         """
         return self.__current_ch_msg
+
+    def getCurrentChannelTelemetryItems(self):
+        """
+        Used by channel telemetry panel update() to get the latest item of
+        every channel updated since the last update.
+        """
+        return self.__current_ch_msgs
     def getCurrentChannelTelemetryType(self):
         return self.__current_ch_type
 
-    def __log_info(self, s):
+    def __log_info(self, s, msg):
         """
-        Update log message with time tag.
+        Queue a channel value for the log writer thread.  The time tag is
+        taken now; formatting is left to __format_log().
         """
-        if self.__opt.log_time == "local":
-            t = time.strftime("%Y-%m-%d %H:%M:%S:", time.localtime())
+        if self.__log is None:
+            return
+        if self.__log_binary:
+            self.__log.log((None, msg))
         else:
-            t = time.strftime("%Y-%m-%d %H:%M:%S:", time.gmtime())
+            self.__log.log((time.time(), s))
 
-        (channel_name, channel_id, desc, (time_base, time_context, time_seconds, time_usec), value, format_string, low_red, low_orange, low_yellow, high_yellow, high_orange, high_red) = s
-        valString = ""
-        if format_string == None:
-            valString = str(value)
-        else:
-#            valString = format_string%value
-            try:
-                valString = format_string%value
-            except:
-                sys.stderr.write ("%s (%d) Channel decode error\n"%(channel_name,channel_id))
-        self.__logger.info("%s %s %s (%s(%s)-%s:%s) %s" % (t,channel_name, channel_id, time_base, time_context, time_seconds, time_usec, valString))
+    def __format_log(self, records):
+        """
+        Format a batch of (time, channel item) log records, one line each.
+        """
+        lines = []
+        for (t, s) in records:
+            (channel_name, channel_id, desc, (time_base, time_context, time_seconds, time_usec), value, format_string, low_red, low_orange, low_yellow, high_yellow, high_orange, high_red) = s
+            valString = ""
+            if format_string == None:
+                valString = str(value)
+            else:
+                try:
+                    valString = format_string%value
+                except:
+                    sys.stderr.write ("%s (%d) Channel decode error\n"%(channel_name,channel_id))
+            lines.append("%s %s %s (%s(%s)-%s:%s) %s\n" % (self.__stamp(t),channel_name, channel_id, time_base, time_context, time_seconds, time_usec, valString))
+        return "".join(lines)
 
 
     def update(self, serial_ch_telm):
@@ -324,11 +250,38 @@ class ChannelListener(observer.Observed):
         #
         if len(serial_ch_telm) > 0:
             self.decode_ch(serial_ch_telm)
+            self.__current_ch_msgs = [self.__current_ch_msg]
             self.observers_notify()
             #print self.getCurrentChannelTelemetryItem()
-            self.__log_info(self.getCurrentChannelTelemetryItem())
+            self.__log_info(self.getCurrentChannelTelemetryItem(), serial_ch_telm)
         return
 
+    def stage(self, serial_ch_telm):
+        """
+        Decode and log a channel telemetry packet without updating the
+        observers.  Only the latest value of each channel is kept until
+        flush() hands them to the observers in one update.  Every value
+        still goes to the log and the strip chart listener.
+        """
+        if len(serial_ch_telm) > 0:
+            self.decode_ch(serial_ch_telm)
+            msg = self.__current_ch_msg
+            self.__log_info(msg, serial_ch_telm)
+            self.__stripchart_listener.update_telem(msg)
+            # Move an updated channel to the end so flush() keeps arrival order
+            self.__staged.pop(msg[1], None)
+            self.__staged[msg[1]] = msg
+
+    def flush(self):
+        """
+        Update the observers once with the channels staged since the last flush.
+        """
+        if self.__staged:
+            self.__current_ch_msgs = self.__staged.values()
+            self.__staged = collections.OrderedDict()
+            self.observers_notify()
+            self.__current_ch_msgs = []
+
 
 if __name__ == "__main__":
     pass
@@ -64,36 +64,39 @@ class ChannelLoader(object):
         """
         Generate all the dictionaries and instances of Channel here...
         """
-        name_list          = self.loadModules(generated_ch_path, "ID", "NAME")
-        component_list     = self.loadModules(generated_ch_path, "ID", "COMPONENT")
-        ch_desc_list       = self.loadModules(generated_ch_path, "ID", "CHANNEL_DESCRIPTION")
-        type_list          = self.loadModules(generated_ch_path, "ID", "TYPE")
-        format_string_list = self.loadModules(generated_ch_path, "ID", "FORMAT_STRING")
-        low_red_list       = self.loadModules(generated_ch_path, "ID", "LOW_RED")
-        low_orange_list    = self.loadModules(generated_ch_path, "ID", "LOW_ORANGE")
-        low_yellow_list    = self.loadModules(generated_ch_path, "ID", "LOW_YELLOW")
-        high_yellow_list   = self.loadModules(generated_ch_path, "ID", "HIGH_YELLOW")
-        high_orange_list    = self.loadModules(generated_ch_path, "ID", "HIGH_ORANGE")
-        high_red_list      = self.loadModules(generated_ch_path, "ID", "HIGH_RED")
-
-        # Remove duplicates from component list
-        component_list = list(OrderedDict.fromkeys(component_list))
+        attr_list = self.loadModuleAttributes(generated_ch_path,
+                        ["ID", "NAME", "COMPONENT", "CHANNEL_DESCRIPTION", "TYPE", "FORMAT_STRING",
+                         "LOW_RED", "LOW_ORANGE", "LOW_YELLOW", "HIGH_YELLOW", "HIGH_ORANGE", "HIGH_RED"])
 
         #
         # Generate required dictionaries here
         #
-        self.__dict_name = dict(name_list)
-        self.__dict_component = dict(component_list)
-        self.__dict_ch_desc = dict(ch_desc_list)
-        self.__dict_types = dict(type_list)
-        self.__dict_format_string = dict(format_string_list)
-        self.__dict_low_red = dict(low_red_list)
-        self.__dict_low_orange = dict(low_orange_list)
-        self.__dict_low_yellow = dict(low_yellow_list)
-        self.__dict_high_yellow = dict(high_yellow_list)
-        self.__dict_high_orange = dict(high_orange_list)
-        self.__dict_high_red = dict(high_red_list)
+        self.__dict_name = dict()
+        self.__dict_component = dict()
+        self.__dict_ch_desc = dict()
+        self.__dict_types = dict()
+        self.__dict_format_string = dict()
+        self.__dict_low_red = dict()
+        self.__dict_low_orange = dict()
+        self.__dict_low_yellow = dict()
+        self.__dict_high_yellow = dict()
+        self.__dict_high_orange = dict()
+        self.__dict_high_red = dict()
         #
+        for (id, name, comp, ch_desc, ch_type, format_string, low_red, low_orange,
+             low_yellow, high_yellow, high_orange, high_red) in attr_list:
+            self.__dict_name[id] = name
+            self.__dict_component[id] = comp
+            self.__dict_ch_desc[id] = ch_desc
+            self.__dict_types[id] = ch_type
+            self.__dict_format_string[id] = format_string
+            self.__dict_low_red[id] = low_red
+            self.__dict_low_orange[id] = low_orange
+            self.__dict_low_yellow[id] = low_yellow
+            self.__dict_high_yellow[id] = high_yellow
+            self.__dict_high_orange[id] = high_orange
+            self.__dict_high_red[id] = high_red
+
         for id in self.__dict_name:
             # print self.__dict_name[id], id, self.__dict_ch_desc[id], self.__dict_types[id]
             self.__dict_channels[id] = channel_telemetry.Channel(
@@ -110,22 +113,8 @@ class ChannelLoader(object):
                                         self.__dict_high_orange[id],
                                         self.__dict_high_red[id]
                                         )
-
-        for id, name in self.__dict_name.iteritems():
-            self.__dict_channels_by_name[name] = channel_telemetry.Channel(
-                                        self.__dict_name[id],
-                                        id,
-                                        self.__dict_component[id],
-                                        self.__dict_ch_desc[id],
-                                        self.__dict_types[id],
-                                        self.__dict_format_string[id],
-                                        self.__dict_low_red[id],
-                                        self.__dict_low_orange[id],
-                                        self.__dict_low_yellow[id],
-                                        self.__dict_high_yellow[id],
-                                        self.__dict_high_orange[id],
-                                        self.__dict_high_red[id]
-                                        )
+            # Both dictionaries share the same Channel instance
+            self.__dict_channels_by_name[self.__dict_name[id]] = self.__dict_channels[id]
 
     def getNameDict(self):
         return self.__dict_name
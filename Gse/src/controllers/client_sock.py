@@ -13,6 +13,8 @@ import struct
 import time
 import select
 
+from utils.frame_reader import FrameReader
+
 class ClientSocket:
     """
     Class to perform client side socket connection
@@ -33,6 +35,8 @@ class ClientSocket:
             #socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, len(msg))
             # Connect to server
             self.sock.connect((host_addr, port))
+            # Buffered reader used by recv() and recv_frame()
+            self.reader = FrameReader(self.sock, stop=lambda: self.exit_flag)
 
         except IOError as e:
             print "EXCEPTION: Could not connect to socket at host addr %s, port %s" % (host_addr, port)
@@ -77,23 +81,18 @@ class ClientSocket:
         """
         Read l bytes from socket.
         """
-        chunk =""
-        msg = ""
-        n = 0
-        while l > n:
-            if self.exit_flag:
-                raise Exception("Exiting receive loop") 
-
-            # Check if the socket is ready to read
-            fd = select.select([self.sock], [], [], .25)
-            if fd[0]:
-                chunk = self.sock.recv(l-n)
-                if chunk == '':
-                    return ''
-                    #raise RuntimeError("socket connection broken")
-                msg = msg + chunk
-                n = len(msg)
-        return msg
+        msg = self.reader.read(l)
+        if msg is None:
+            return ''
+        return msg.tobytes()
+
+    def recv_frame(self):
+        """
+        Read one size prefixed packet (size, descriptor and data) from socket.
+        The returned memoryview is only valid until the next receive.
+        Returns None when the connection is closed.
+        """
+        return self.reader.read_frame()
 
     def send(self, msg):
         try:
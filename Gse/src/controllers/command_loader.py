@@ -22,7 +22,10 @@ import sys
 from controllers import exceptions
 from models.common import command
 from models.serialize import enum_type
+from controllers import module_loader
 
+# Add the loadModuleAttributes method using this decorator
+@module_loader.ModuleLoader
 class CommandLoader(object):
     '''
     Singleton loader class used to capture commands descriptor
@@ -55,42 +58,23 @@ class CommandLoader(object):
     #define static method
     getInstance = staticmethod(getInstance)
 
-    #@todo: refactor using the module_loader decorator here...
     def create(self, generated_command_path):
         """
         Generate all the dictionaries and instances of Command here...
         """
-        # First add generated/commands to the python path
-        if not os.path.isdir(generated_command_path):
-            raise exceptions.GseControllerUndefinedDirectoryException(generated_command_path)
-        sys.path.append(generated_command_path)
-
-        # Get the modules
-        cmd_modules = glob.glob(generated_command_path + os.sep + '*.py')
-        # Iterate over them and import them
-        #
-        file_list = []
-        for cmd_imp in cmd_modules:
-            fi = os.path.split(cmd_imp)[-1]
-            if fi != "__init__.py":
-                file_list.append(fi)
-        # Import the modules here
-        #
-        module_list = []
-        for m in file_list:
-            m = m[:-3]
-            exec("import %s" % m)
-            module_list.append(m)
+        attr_list = self.loadModuleAttributes(generated_command_path,
+                        ["__name__", "MNEMONIC", "COMPONENT", "OP_CODE", "CMD_DESCRIPTION", "ARGUMENTS"],
+                        qualified=False)
         # Generate required dictionaries here
         #
-        for m in module_list:
-            m2 = eval("%s.MNEMONIC" % m)
+        for (module_name, m2, comp, opcode, desc, args) in attr_list:
+            m = module_name
             if m != m2:
                 raise exceptions.GseControllerMnemonicMismatchException(m, m2)
-            self.__dict_component[m] = eval("%s.COMPONENT" % m)
-            self.__dict_opcode[m]    = eval("%s.OP_CODE" % m)
-            self.__dict_desc[m]      = eval("%s.CMD_DESCRIPTION" % m)
-            self.__dict_args[m]      = eval("%s.ARGUMENTS" % m)
+            self.__dict_component[m] = comp
+            self.__dict_opcode[m]    = opcode
+            self.__dict_desc[m]      = desc
+            self.__dict_args[m]      = args
             #
             # Instance Command objects here...
             #
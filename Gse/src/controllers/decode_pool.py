@@ -0,0 +1,193 @@
+#!/bin/env python
+#===============================================================================
+# NAME: decode_pool.py
+#
+# DESCRIPTION: Parallel decode stage for channel telemetry and log event
+#              packets.  A stream of packets is cut into chunks, each chunk
+#              is sharded by channel/event ID and the shards are decoded by
+#              a pool of worker processes (or threads) with the stateless
+#              packet_decoder decoders.  Records come back in stream order.
+#              Used to replay large binary logs and to keep up with high
+#              rate links.
+#
+# Copyright 2015, California Institute of Technology.
+# ALL RIGHTS RESERVED. U.S. Government Sponsorship acknowledged.
+#===============================================================================
+#
+# Python standard modules
+#
+import multiprocessing
+import multiprocessing.pool
+import os
+import struct
+import sys
+import time
+from optparse import OptionParser
+
+from controllers import packet_decoder
+
+# Packet descriptors
+DESC_CHANNEL = 1
+DESC_EVENT   = 2
+
+# Descriptor and ID of a packet: size, descriptor, ID
+PACKET_KEY = struct.Struct(">II")
+KEY_OFFSET = 4
+SIZE_WORD  = struct.Struct(">I")
+
+# Decoders of a worker, set up by _init_worker
+_decoders = None
+
+
+def _init_worker(ch_obj_dict, event_obj_dict):
+    global _decoders
+    _decoders = {DESC_CHANNEL : packet_decoder.ChannelDecoder(ch_obj_dict),
+                 DESC_EVENT   : packet_decoder.EventDecoder(event_obj_dict)}
+
+
+def _decode_shard(packets):
+    """
+    Decode a list of packets into ChannelRecord/EventRecord tuples, None
+    for packets that are neither channels nor events.
+    """
+    records = []
+    for msg in packets:
+        decoder = _decoders.get(PACKET_KEY.unpack_from(msg, KEY_OFFSET)[0])
+        if decoder is None:
+            records.append(None)
+        else:
+            records.append(decoder.decode_record(msg))
+    return records
+
+
+def read_packets(filename):
+    """
+    Iterate over the size prefixed packets of a raw binary log (RAW.bin,
+    Channel.bin or Event.bin).  A trailing incomplete packet is ignored.
+    """
+    with open(filename, "rb") as f:
+        while True:
+            word = f.read(SIZE_WORD.size)
+            if len(word) < SIZE_WORD.size:
+                return
+            size = SIZE_WORD.unpack(word)[0]
+            body = f.read(size)
+            if len(body) < size:
+                return
+            yield word + body
+
+
+class DecodePool:
+    """
+    Decode packets on several cores.
+
+    Every chunk of packets is split into one shard per worker by ID, so
+    each worker only compiles and caches the decoders of its own IDs.
+    With processes=False a thread pool is used instead, which avoids
+    sending packets between processes but shares one interpreter.
+    """
+    def __init__(self, ch_obj_dict, event_obj_dict, workers=None, processes=True, chunk_size=8192):
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        self.__workers = workers
+        self.__chunk_size = chunk_size
+        if processes:
+            pool_class = multiprocessing.Pool
+        else:
+            pool_class = multiprocessing.pool.ThreadPool
+        self.__pool = pool_class(workers, _init_worker, (ch_obj_dict, event_obj_dict))
+
+    def __submit(self, chunk):
+        """
+        Shard a chunk by ID and start decoding the shards.
+        """
+        shards = [[] for w in range(self.__workers)]
+        slots = [[] for w in range(self.__workers)]
+        for n, msg in enumerate(chunk):
+            w = PACKET_KEY.unpack_from(msg, KEY_OFFSET)[1] % self.__workers
+            shards[w].append(msg)
+            slots[w].append(n)
+        results = [self.__pool.apply_async(_decode_shard, (shard,)) for shard in shards]
+        return (len(chunk), slots, results)
+
+    def __collect(self, pending):
+        (count, slots, results) = pending
+        records = [None] * count
+        for slot, result in zip(slots, results):
+            for n, record in zip(slot, result.get()):
+                records[n] = record
+        return records
+
+    def imap(self, packets):
+        """
+        Decode an iterable of packets, yielding the records in the same
+        order.  The next chunk is decoding while a chunk is being yielded.
+        """
+        pending = None
+        chunk = []
+        for msg in packets:
+            chunk.append(msg)
+            if len(chunk) == self.__chunk_size:
+                submitted = self.__submit(chunk)
+                chunk = []
+                if pending is not None:
+                    for record in self.__collect(pending):
+                        yield record
+                pending = submitted
+        if chunk:
+            submitted = self.__submit(chunk)
+        else:
+            submitted = None
+        for p in (pending, submitted):
+            if p is not None:
+                for record in self.__collect(p):
+                    yield record
+
+    def decode(self, packets):
+        """
+        Decode a list of packets, returning the list of records.
+        """
+        return list(self.imap(packets))
+
+    def close(self):
+        self.__pool.close()
+        self.__pool.join()
+
+
+def main():
+    parser = OptionParser(usage="%prog [options] RAW.bin",
+                          description="Decode the channels and events of a raw binary log on several cores")
+    parser.add_option("-d", "--dictionary", dest="generated_path", action="store", type="string",
+                      help="Generated dictionary path containing the channels and events packages", default=None)
+    parser.add_option("-j", "--jobs", dest="jobs", action="store", type="int",
+                      help="Number of decode workers [default: number of CPUs]", default=None)
+    parser.add_option("-t", "--threads", dest="threads", action="store_true",
+                      help="Decode with threads instead of processes", default=False)
+    parser.add_option("-p", "--print", dest="print_records", action="store_true",
+                      help="Print every decoded record", default=False)
+    (opts, args) = parser.parse_args(sys.argv[1:])
+    if len(args) != 1 or opts.generated_path is None:
+        parser.error("A dictionary path and a binary log file are required")
+
+    from controllers import channel_loader
+    from controllers import event_loader
+    ch_loader = channel_loader.ChannelLoader.getInstance()
+    ch_loader.create(opts.generated_path + os.sep + "channels")
+    ev_loader = event_loader.EventLoader.getInstance()
+    ev_loader.create(opts.generated_path + os.sep + "events")
+
+    pool = DecodePool(ch_loader.getChDict(), ev_loader.getEventsDict(), opts.jobs, not opts.threads)
+    start = time.time()
+    count = 0
+    for record in pool.imap(read_packets(args[0])):
+        count += 1
+        if opts.print_records and record is not None:
+            print record
+    elapsed = time.time() - start
+    pool.close()
+    print "%d packets in %.3f seconds, %.0f packets/second" % (count, elapsed, count / max(elapsed, 1e-9))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
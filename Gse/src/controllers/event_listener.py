@@ -27,7 +27,6 @@ import collections
 import sys
 import os
 import threading
-import Queue
 import struct
 import logging
 import time
@@ -37,6 +36,7 @@ import time
 from controllers import observer
 from controllers import event_loader
 from controllers import channel_listener
+from controllers import packet_decoder
 from controllers import status_bar_updater
 from controllers import stripchart_listener
 
@@ -47,7 +47,16 @@ from models.serialize import u8_type
 
 #from views import main_panel
 from utils import Logger
+from utils import async_log
+from utils import ConfigManager
 
+# Size and descriptor, optionally followed by the ID, starting every packet
+DESC_HEADER    = struct.Struct(">II")
+DESC_ID_HEADER = struct.Struct(">III")
+
+# Longest uninterrupted wait in get_message(), so signal handlers such as
+# Ctrl-C run while the main thread waits for packets
+WAKE_PERIOD = 1.0
 
 class EventListener(observer.Observed):
     """
@@ -78,14 +87,17 @@ class EventListener(observer.Observed):
         #
         self.__lock = threading.Lock()
         #
-        # Create Queue for events here
+        # Received packets, appended by the listener thread.  Waiters are
+        # notified through the condition.
         #
-        self.__queue = Queue.Queue()
+        self.__packets = collections.deque()
+        self.__ready = threading.Condition()
         #
         # Instance the event loader here
         #
         self.__event_loader = event_loader.EventLoader.getInstance()
         self.__event_obj_dict = self.__event_loader.getEventsDict()
+        self.__decoder = packet_decoder.EventDecoder(self.__event_obj_dict)
         #print self.__event_obj_dict
         #
         # Instance the channel telemetry listener here
@@ -97,6 +109,10 @@ class EventListener(observer.Observed):
         # Current event log message string
         #
         self.__current_event_log_msg = None
+        #
+        # Event log messages decoded during the current GUI frame
+        #
+        self.__current_event_log_msgs = []
 
         # Status bar observer
         self.__status_bar_updater  = status_bar_updater.StatusBarUpdater.getInstance()
@@ -113,6 +129,11 @@ class EventListener(observer.Observed):
 
         # store options
         self.__opt = None
+        #
+        # Event log writer, set up by setupLogging
+        self.__log = None
+        self.__log_binary = False
+        self.__stamp = None
 
 
     def getInstance():
@@ -136,17 +157,20 @@ class EventListener(observer.Observed):
             p = os.environ['HOME'] + os.sep + 'fprime_logs' + os.sep + "event"
         else:
             p = opt.log_file_path + os.sep + opt.log_file_prefix + os.sep + "event"
-        #
-        logfile = 'Event.log'
-        #
         self.__opt = opt
+        self.__log_binary = opt is not None and getattr(opt, "log_format", "text") == "binary"
+        self.__stamp = async_log.TimeStamp(gmt=opt is not None and opt.log_time == "GMT")
 
         if not os.path.exists(p):
             os.makedirs(p)
-        f = p + os.sep + logfile
-        self.__logger = Logger.connectOutputLogger(f, 'event_out')
-        self.__logger.info("Created log: %s" % f)
-        self.__logger.info("User: %s" % os.environ['USER'])
+        if self.__log_binary:
+            f = p + os.sep + 'Event.bin'
+            self.__log = async_log.open_log(f, async_log.format_packets, binary=True)
+        else:
+            f = p + os.sep + 'Event.log'
+            self.__log = async_log.open_log(f, self.__format_log)
+            self.__log.write_now("Created log: %s\n" % f)
+            self.__log.write_now("User: %s\n" % os.environ['USER'])
 
     def setupBinaryLogging(self, opt=None):
         """
@@ -202,36 +226,23 @@ class EventListener(observer.Observed):
 
     def receive_telemetry(self, sock):
         """
-        Receive telemetry by first reading 4 byte size,
-        then 4 byte desc. Then recieve the rest of message.
+        Receive telemetry by reading one whole packet: 4 byte size,
+        4 byte desc and the rest of message.
         Send size, desc, id, and optional args for decoding.
         """
-        pkt_len = sock.recv(4)
-        if self.__binfile != None:
-            self.__binfile.write(pkt_len)
+        frame = sock.recv_frame()
+        if frame is None:
+            raise IOError("socket connection broken")
 
-        pkt_desc    = sock.recv(4)
         if self.__binfile != None:
-            self.__binfile.write(pkt_desc)
-
-        desc = int(struct.unpack(">I",pkt_desc)[0])
-        size = int(struct.unpack(">I",pkt_len)[0])
-
-        #
-        #print "size = %d" % size
-        #print  "desc = %d" % desc
-        data = sock.recv(size - u32_type.U32Type().getSize())
-
-        if self.__binfile != None:
-            self.__binfile.write(data)
-
+            self.__binfile.write(frame)
 
         #print "data: "
         #type_base.showBytes(data)
-        return pkt_len + pkt_desc + data
+        return frame.tobytes()
 
 
-    def enqueue_output(self, sock, queue):
+    def enqueue_output(self, sock):
         """
         Queue up socket telemetry for TK processing
         """
@@ -239,7 +250,9 @@ class EventListener(observer.Observed):
             try:
                 x = self.receive_telemetry(sock)
                 if x:
-                    queue.put(x)
+                    with self.__ready:
+                        self.__packets.append(x)
+                        self.__ready.notify_all()
             except:
                 print "Socket connection terminated"
                 break
@@ -258,7 +271,7 @@ class EventListener(observer.Observed):
             return
 
         # create background listener thread
-        self.__thread = threading.Thread(target=self.enqueue_output, args=(self.__sock, self.__queue))
+        self.__thread = threading.Thread(target=self.enqueue_output, args=(self.__sock,))
         # thread dies with the program
         self.__thread.daemon = True
         # state listener thread here
@@ -269,19 +282,8 @@ class EventListener(observer.Observed):
         """
         Decode the size and descriptor and return them.
         """
-        ptr = 0
-        # Decode size here...
-        u32_obj = u32_type.U32Type()
-        u32_obj.deserialize(msg, 0)
-        size = u32_obj.val
-        ptr += u32_obj.getSize()
+        (size, desc) = DESC_HEADER.unpack_from(msg, 0)
         #print "Size = 0x%x" % size
-
-        # Decode descriptor part of message
-        u32_obj = u32_type.U32Type()
-        u32_obj.deserialize(msg, ptr)
-        desc = u32_obj.val
-        ptr += u32_obj.getSize()
         #print "Desc = 0x%x" % desc
         return (desc, size)
 
@@ -289,26 +291,9 @@ class EventListener(observer.Observed):
         """
         Decode the size and descriptor and return them.
         """
-        ptr = 0
-        # Decode size here...
-        u32_obj = u32_type.U32Type()
-        u32_obj.deserialize(msg, 0)
-        size = u32_obj.val
-        ptr += u32_obj.getSize()
+        (size, desc, i) = DESC_ID_HEADER.unpack_from(msg, 0)
         #print "Size = 0x%x" % size
-
-        # Decode descriptor part of message
-        u32_obj = u32_type.U32Type()
-        u32_obj.deserialize(msg, ptr)
-        desc = u32_obj.val
-        ptr += u32_obj.getSize()
         #print "Desc = 0x%x" % desc
-
-        # Decode log event ID here...
-        u32_obj = u32_type.U32Type()
-        u32_obj.deserialize(msg, ptr)
-        ptr += u32_obj.getSize()
-        i = u32_obj.val
         #print "ID: %d" % i
         return (desc, size, i)
 
@@ -318,62 +303,14 @@ class EventListener(observer.Observed):
         """
         #type_base.showBytes(msg)
         #
-        ptr = 0
-        # Decode size here...
-        u32_obj = u32_type.U32Type()
-        u32_obj.deserialize(msg, 0)
-        size = u32_obj.val
-        ptr += u32_obj.getSize()
-        #print "Size = 0x%x" % size
-
-        # Decode descriptor part of message
-        u32_obj = u32_type.U32Type()
-        u32_obj.deserialize(msg, ptr)
-        desc = u32_obj.val
-        ptr += u32_obj.getSize()
-        #print "Desc = 0x%x" % desc
-
-        # Decode log event ID here...
-        u32_obj = u32_type.U32Type()
-        u32_obj.deserialize(msg, ptr)
-        ptr += u32_obj.getSize()
-        i = u32_obj.val
-        #print "ID: %d" % i
-
-        # Decode time...
-        # Base
-        u32_obj = u16_type.U16Type()
-        u32_obj.deserialize(msg, ptr)
-        ptr += u32_obj.getSize()
-        time_base = u32_obj.val
-        #print "Time Base: %d" % time_base
-
-        # Time context
-        u8_obj = u8_type.U8Type()
-        u8_obj.deserialize(msg,ptr)
-        ptr += u8_obj.getSize()
-        time_context = u8_obj.val
-
-        # Seconds
-        u32_obj = u32_type.U32Type()
-        u32_obj.deserialize(msg, ptr)
-        ptr += u32_obj.getSize()
-        time_secs = u32_obj.val
-        #print "Time Seconds: %d" % time_secs
-        # Micro-seconds
-        u32_obj = u32_type.U32Type()
-        u32_obj.deserialize(msg, ptr)
-        ptr += u32_obj.getSize()
-        time_usecs = u32_obj.val
-        #print "Time MicroSeconds: %d" % time_usecs
+        # Decode log event ID, time and arguments with the precompiled decoder...
+        (i, (time_base, time_context, time_secs, time_usecs), event_args) = self.__decoder.decode(msg)
 
         # Decode arguments here...
         # Look up correct Event event log message instance object for decoding
         if i in self.__event_obj_dict:
             event_obj = self.__event_obj_dict[i]
             #
-            # Deserialize to a tuple to stringify
-            event_args = event_obj.deserialize(msg[ptr:])
             # Stringify to formatted message string for GUI updates
             fmt = event_obj.stringify(event_args)
             #
@@ -408,59 +345,9 @@ class EventListener(observer.Observed):
         """
         #type_base.showBytes(msg)
         #
-        ptr = 0
-        # Decode size here...
-        u32_obj = u32_type.U32Type()
-        u32_obj.deserialize(msg, 0)
-        size = u32_obj.val
-        ptr += u32_obj.getSize()
-        #print "Size = 0x%x" % size
-
-        # Decode descriptor part of message
-        u32_obj = u32_type.U32Type()
-        u32_obj.deserialize(msg, ptr)
-        desc = u32_obj.val
-        ptr += u32_obj.getSize()
-        #print "Desc = 0x%x" % desc
-
-        # Decode log event ID here...
-        u32_obj = u32_type.U32Type()
-        u32_obj.deserialize(msg, ptr)
-        ptr += u32_obj.getSize()
-        i = u32_obj.val
-        #print "ID: %d" % i
-
-        # Decode time...
-        # Base
-        u32_obj = u16_type.U16Type()
-        u32_obj.deserialize(msg, ptr)
-        ptr += u32_obj.getSize()
-        time_base = u32_obj.val
-        #print "Time Base: %d" % time_base
-
-        # Time context
-        u8_obj = u8_type.U8Type()
-        u8_obj.deserialize(msg,ptr)
-        ptr += u8_obj.getSize()
-        time_context = u8_obj.val
-
-        # Seconds
-        u32_obj = u32_type.U32Type()
-        u32_obj.deserialize(msg, ptr)
-        ptr += u32_obj.getSize()
-        time_secs = u32_obj.val
-        #print "Time Seconds: %d" % time_secs
-        # Micro-seconds
-        u32_obj = u32_type.U32Type()
-        u32_obj.deserialize(msg, ptr)
-        ptr += u32_obj.getSize()
-        time_usecs = u32_obj.val
-        #print "Time MicroSeconds: %d" % time_usecs
-
-        event_args = None
-        if i in self.__event_obj_dict:
-            event_obj = self.__event_obj_dict[i]
-            event_args = event_obj.deserialize(msg[ptr:])[1:]
+        (i, t, event_args) = self.__decoder.decode(msg)
+        if event_args is not None:
+            event_args = event_args[1:]
         return event_args
 
     def getCurrentEventLogMsg(self):
@@ -469,17 +356,37 @@ class EventListener(observer.Observed):
         """
         return self.__current_event_log_msg
 
+    def getCurrentEventLogMsgs(self):
+        """
+        Used by logger panel update() to get all the event log messages
+        received since the last update, oldest first.
+        """
+        return self.__current_event_log_msgs
+
 
-    def __log_info(self, s):
+    def __log_info(self, s, msg):
         """
-        Update log message with time tag.
+        Queue a log event for the log writer thread.  The time tag is
+        taken now; formatting is left to __format_log().
         """
-        if self.__opt.log_time == "local":
-            t = time.strftime("%Y-%m-%d %H:%M:%S:", time.localtime())
+        if self.__log is None:
+            return
+        if self.__log_binary:
+            self.__log.log((None, msg))
         else:
-            t = time.strftime("%Y-%m-%d %H:%M:%S:", time.gmtime())
+            self.__log.log((time.time(), s))
 
-        self.__logger.info("%s %s" % (t,s[0]))
+    def __format_log(self, records):
+        """
+        Format a batch of (time, event log message) log records, one line each.
+        """
+        lines = []
+        for (t, s) in records:
+            # Events that could not be decoded are logged as a plain string
+            if isinstance(s, tuple):
+                s = s[0]
+            lines.append("%s %s\n" % (self.__stamp(t), s))
+        return "".join(lines)
 
 
     def update_task_start(self):
@@ -500,88 +407,125 @@ class EventListener(observer.Observed):
     def update_task(self):
         """
         Update event log message here...
-        1. Receive message from thread.
-        2. Decode message into object.
-        3. Generate updates for all log event panel instances.
-        """
-        time_period = 2
-        max_msgs = 100
+        1. Drain the messages received by the thread, within a time budget.
+        2. Decode them. Channel values are staged by the channel listener,
+           which keeps only the latest sample of each channel.
+        3. Generate one batched update for all log event panel instances
+           and one for all channel telemetry panel instances.
+        """
+        time_period = ConfigManager.ConfigManager.getInstance().getint('performance', 'gui_update_rate')
+        # Spend at most half a frame decoding so Tk stays responsive
+        deadline = time.time() + time_period / 2000.0
+        num_recv = 0
+        events = []
+
+        while True:
+            # If window is exiting we need to stop updating
+            # Set in main_panel.__handle_exit()
+            if self.update_break:
+                self.update_break = False
+                return
 
-        # read line without blocking
-        while max_msgs > 0:
-            msg = None
+            # read line without blocking
             try:
-                msg = self.__queue.get_nowait()
-                #print msg
-                #type_base.showBytes(msg)
-                if len(msg) > 0:
-                    pass
-            except Queue.Empty:
-                #print('no output yet')
-                self.__status_bar_updater.update_data(0,0, data_incoming=False)
-                self.__after_id = self.__root.after(time_period, self.update_task)
-                return
-                # ... do something with line
-            #
-            # Observer update will be generated here...
-            #
-            if len(msg) > 0:
-                # If window is exiting we need to stop updating
-                # Set in main_panel.__handle_exit()
-                if self.update_break:
-                    self.update_break = False
-                    return
-
-                (desc, size) = self.decode_desc(msg)
-                if desc == 2:
-                    # Update event messages here...
-                    self.decode_event(msg)
-                    self.observers_notify()
-                    self.__log_info(self.getCurrentEventLogMsg())
-                elif desc == 1:
-                    # Update channel telemetry here...
-                    self.__channel_listener.update(msg)
-                    tlm = self.__channel_listener.getCurrentChannelTelemetryItem()
-                    # Send to stripchart
-                    self.__stripchart_listener.update_telem(tlm)
-                else:
-                    print ("Unknown descriptor %d"%desc)
+                msg = self.__packets.popleft()
+            except IndexError:
+                break
+            if len(msg) == 0:
+                continue
 
-                # Update status bar
-                self.__status_bar_updater.update_data(num_recv=size, num_sent=0, data_incoming=True)
+            (desc, size) = self.decode_desc(msg)
+            if desc == 2:
+                # Update event messages here...
+                self.decode_event(msg)
+                events.append(self.getCurrentEventLogMsg())
+                self.__log_info(self.getCurrentEventLogMsg(), msg)
+            elif desc == 1:
+                # Stage channel telemetry here...
+                self.__channel_listener.stage(msg)
+            else:
+                print ("Unknown descriptor %d"%desc)
+            num_recv += size
 
-            max_msgs = max_msgs - 1
+            if time.time() > deadline:
+                # Backlog; come back as soon as Tk has handled its events
+                time_period = 1
+                break
+
+        #
+        # Observer updates are generated here, once per frame...
+        #
+        if events:
+            self.__current_event_log_msgs = events
+            self.observers_notify()
+            self.__current_event_log_msgs = []
+        self.__channel_listener.flush()
+
+        # Update status bar
+        if num_recv:
+            self.__status_bar_updater.update_data(num_recv=num_recv, num_sent=0, data_incoming=True)
+        else:
+            self.__status_bar_updater.update_data(0,0, data_incoming=False)
 
         self.__after_id = self.__root.after(time_period, self.update_task)
-        return msg
 
-    def update_task_api(self):
+    def get_message(self, timeout=0):
+        """
+        Return the next received packet, or None if there is none.
+        @param timeout: 0 returns at once, None blocks until a packet is
+        received, otherwise block for up to timeout seconds (float).
+        A blocking wait wakes as soon as the listener thread appends a packet.
+        """
+        with self.__ready:
+            deadline = None
+            if timeout is not None:
+                deadline = time.time() + timeout
+            while not self.__packets:
+                if deadline is None:
+                    period = WAKE_PERIOD
+                else:
+                    period = min(deadline - time.time(), WAKE_PERIOD)
+                    if period <= 0:
+                        return None
+                self.__wait(period)
+            return self.__packets.popleft()
+
+    def __wait(self, period):
+        """
+        Wait on the condition for a packet, or for period seconds.  A timer
+        ends the wait because Python 2 Condition timeouts are polled, which
+        would delay waking on a packet.  Called with the condition held.
+        """
+        timer = threading.Timer(period, self.__wake)
+        timer.daemon = True
+        timer.start()
+        try:
+            self.__ready.wait()
+        finally:
+            timer.cancel()
+
+    def __wake(self):
+        with self.__ready:
+            self.__ready.notify_all()
+
+    def update_task_api(self, timeout=0):
         """
         Update event log message here...
         1. Receive message from thread.
         2. Decode message into object.
+        @param timeout: Wait for a message as get_message() does.
         """
-        if self.__sending_file:
-            self.__monitor_uplink()
-
-        time_period = 200
-        # read line without blocking
-        msg = ""
-        try:
-            msg = self.__queue.get_nowait()
-            #print msg
-            #type_base.showBytes(msg)
-            if len(msg) > 0:
-                pass
-        except Queue.Empty:
+        msg = self.get_message(timeout)
+        if msg is None:
             #print('no output yet')
             self.__current_event_log_msg = None
             return (None, None, None)
-            # ... do something with line
         #
         # Observer update will be generated here...
         #
         args = None
+        desc = None
+        evr_id = None
         if len(msg) > 0:
             (desc, size, evr_id) = self.decode_desc_api(msg)
             if desc == 2:
@@ -66,24 +66,24 @@ class EventLoader(object):
         """
         Generate all the dictionaries and instances of Command here...
         """
-        name_list          = self.loadModules(generated_events_path, "ID", "NAME")
-        severity_list      = self.loadModules(generated_events_path, "ID", "SEVERITY")
-        format_string_list = self.loadModules(generated_events_path, "ID", "FORMAT_STRING")
-        event_desc_list    = self.loadModules(generated_events_path, "ID", "EVENT_DESCRIPTION")
-        args_list          = self.loadModules(generated_events_path, "ID", "ARGUMENTS")
-        #
-        # Change Severity to enum
-        #
-        severity_list = [(key, event.Severity.__members__[value]) for (key, value) in severity_list]
-
+        attr_list = self.loadModuleAttributes(generated_events_path,
+                        ["ID", "NAME", "SEVERITY", "FORMAT_STRING", "EVENT_DESCRIPTION", "ARGUMENTS"])
         #
         # Generate required dictionaries here
         #
-        self.__dict_name = dict(name_list)
-        self.__dict_severity = dict(severity_list)
-        self.__dict_format_string = dict(format_string_list)
-        self.__dict_event_description = dict(event_desc_list)
-        self.__dict_arguments = dict(args_list)
+        self.__dict_name = dict()
+        self.__dict_severity = dict()
+        self.__dict_format_string = dict()
+        self.__dict_event_description = dict()
+        self.__dict_arguments = dict()
+        #
+        for (id, name, severity, format_string, event_desc, args) in attr_list:
+            self.__dict_name[id] = name
+            # Change Severity to enum
+            self.__dict_severity[id] = event.Severity.__members__[severity]
+            self.__dict_format_string[id] = format_string
+            self.__dict_event_description[id] = event_desc
+            self.__dict_arguments[id] = args
         #
         for id in self.__dict_name:
             self.__dict_events[id] = event.Event( \
@@ -93,15 +93,8 @@ class EventLoader(object):
                                         self.__dict_format_string[id], \
                                         self.__dict_event_description[id], \
                                         self.__dict_arguments[id])
-
-        for id, name in self.__dict_name.iteritems():
-            self.__dict_events_by_name[name] = event.Event( \
-                                        self.__dict_name[id], \
-                                        id, \
-                                        self.__dict_severity[id], \
-                                        self.__dict_format_string[id], \
-                                        self.__dict_event_description[id], \
-                                        self.__dict_arguments[id])
+            # Both dictionaries share the same Event instance
+            self.__dict_events_by_name[self.__dict_name[id]] = self.__dict_events[id]
 
 
     def getNameDict(self):
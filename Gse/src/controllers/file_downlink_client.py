@@ -9,6 +9,7 @@ from subprocess import PIPE
 from optparse import OptionParser
 
 from controllers import client_sock
+from controllers import file_reassembly
 from models.serialize.u32_type import *
 from models.serialize.u8_type import *
 from utils.checksum import *
@@ -29,6 +30,7 @@ LOGGER.addHandler(logging.NullHandler)
 
 
 class DownlinkStatus(Enum):
+	INCOMPLETE            = -4
 	CANNOT_OPEN_FILE      = -3
 	CANNOT_WRITE_TO_FILE  = -2
 	X_SUM_DIFFERENCE      = -1
@@ -56,43 +58,41 @@ def startListen(sock, subprocess=False):
 	"""
 	Start listening for incoming file packets.
 	Ignore anything that is not a file packet.
+	DATA packets are written at their byte offset, so they may arrive in
+	any order.  Transfers that end with missing data keep a gap map and
+	are resumed by a later START of the same destination.
 	"""
 	LOGGER.info("STARTING LISTEN\n")
-	check_sum = Checksum()
-
-	# Subprocess variables
-	filesize  = 0
-	data_recv = 0
+	reassembler = file_reassembly.Reassembler()
 
 	while(1):
 		try:
-			# Get pkt_len, and message type (event, tlm, or file)
-			msg = sock.recv(8)
-
-			# 4 Bytes before start packet
-			desc_size = 4
+			# Get one whole packet: pkt_len, message type (event, tlm, or file) and data
+			frame = sock.recv_frame()
+			if frame is None:
+			  LOGGER.info("Socket connection terminated\n")
+			  reassembler.close()
+			  return
 
 			desc = 0
 			size = 0
 
 			try:
-			  size, desc = __processHeader(msg)
+			  size, desc = __processHeader(frame)
 			except IOError:
 			  LOGGER.info("Header data incorrect\n")
 			  continue
 
 			if desc != 3:
 			  #LOGGER.info("Not a file, ignoring\n")
-			  # read rest of packet but don't process it
-			  sock.recv(size - desc_size)
 			  continue
-			LOGGER.info("File Packet Received")
-			LOGGER.info("Size: {}".format(size))
+			LOGGER.debug("File Packet Received")
+			LOGGER.debug("Size: {}".format(size))
 
 
 			#print "Processing."
 			ptr = 0
-			file_msg = sock.recv(size-4)
+			file_msg = frame[8:].tobytes()
 
 
 			pkt_type = U8Type()
@@ -106,7 +106,7 @@ def startListen(sock, subprocess=False):
 			#LOGGER.info("seq_idx = 0x%x" % seq_idx.val)
 
 
-			LOGGER.info("PKT TYPE: {}".format(pkt_type.val))
+			LOGGER.debug("PKT TYPE: {}".format(pkt_type.val))
 
 
 
@@ -133,34 +133,35 @@ def startListen(sock, subprocess=False):
 
 			  # Open file for writing
 			  try:
-			     dest_file = open(dest_path, 'a')
+			     transfer = reassembler.start(dest_path, filesize, start_packet.getSrcPath())
 			  except Exception, exc:
 			     LOGGER.info("Unable to open file: {}. Exception: {}\n".format(dest_path, exc))
 			     return DownlinkStatus.CANNOT_OPEN_FILE.value
 
+			  if transfer.resumed:
+			     LOGGER.info("Resuming {}: {} of {} bytes already received\n".format(dest_path, transfer.received(), filesize))
+
 			elif PacketType(pkt_type.val) == PacketType.DATA:
-			  LOGGER.info("DATA PACKET\n")
+			  LOGGER.debug("DATA PACKET\n")
 
 			  data_packet = filepacket.DataPacket()
 			  data_packet.deserialize(file_msg)
-			  data        = data_packet.getData()
-			  data_len    = data_packet.getDataSize()
-
-			  data_recv += data_len.val
-			  progress = data_recv/float(filesize)*100
-			  if subprocess:
-			  	print "<d|{}|{}>\n".format(progress, data_recv),
-			  	sys.stdout.flush()
 
-			  # Write data to file
+			  # Write data to file at its offset
 			  try:
-			     dest_file.write(data)
+			     transfer = reassembler.data(data_packet.getByteOffset().val, data_packet.getData())
 			  except Exception, exc:
 			     LOGGER.info("Unable to write data packet to file. Exception: {}\n".format(exc))
 			     return DownlinkStatus.CANNOT_WRITE_TO_FILE.value
 
-			  # Update checksum
-			  check_sum.update(data, 0, data_len)
+			  if transfer is None:
+			     LOGGER.info("DATA packet {} without a START packet, ignoring\n".format(seq_idx.val))
+			     continue
+
+			  if subprocess:
+			  	progress = transfer.received()/float(max(transfer.size, 1))*100
+			  	print "<d|{}|{}>\n".format(progress, transfer.received()),
+			  	sys.stdout.flush()
 
 			elif PacketType(pkt_type.val) == PacketType.END:
 			  LOGGER.info("END PACKET\n")
@@ -173,39 +174,48 @@ def startListen(sock, subprocess=False):
 			  	print "<e|x_prep>\n",
 			  	sys.stdout.flush()
 
-			  msg_xSum   = end_packet.getChecksum()
-			  local_xSum = check_sum.xSum
-			  LOGGER.info("msg   xSUM: {}".format(msg_xSum.val))
-			  LOGGER.info("local xSUM: {}".format(local_xSum))
-
 			  # Close file
 			  try:
-			     dest_file.close()
+			     transfer = reassembler.end()
 			  except Exception, exc:
 			     LOGGER.info("Unable to close file. Exception: {}\n".format(exc))
+			     continue
+
+			  if transfer is None:
+			     LOGGER.info("END packet without a START packet, ignoring\n")
+			     continue
+
+			  msg_xSum   = end_packet.getChecksum()
+			  local_xSum = transfer.checksum.xSum
+			  LOGGER.info("msg   xSUM: {}".format(msg_xSum.val))
+			  LOGGER.info("local xSUM: {}".format(local_xSum))
+			  LOGGER.info("Received {} of {} bytes at {:.1f} bytes/s\n".format(transfer.received(), transfer.size, transfer.throughput()))
+
+			  missing = transfer.missing()
+			  if missing:
+			     LOGGER.info("Missing byte ranges of {}: {}\n".format(transfer.dest_path, missing))
 
-			  # Reset Checksum
-			  #check_sum.xSum(0)
 			  LOGGER.info("Filedownlink Finished\n")
 
 			  if subprocess:
-			  	print "<e|{}>\n".format(data_recv),
+			  	print "<e|{}>\n".format(transfer.received()),
 			  	sys.stdout.flush()
 
 			  # Subprocess will continue to listen
 			  if not subprocess:
-				  if msg_xSum.val - local_xSum != 0:
+				  if missing:
+				  	return DownlinkStatus.INCOMPLETE.value
+				  elif msg_xSum.val - local_xSum != 0:
 				  	return DownlinkStatus.X_SUM_DIFFERENCE.value
 				  else:
 				  	return DownlinkStatus.SUCCESS.value
-			  else:
-			      # Reset subprocess variables
-			      filesize  = 0
-			      data_recv = 0
 
 
 			elif PacketType(pkt_type.val) == PacketType.CANCEL:
 			  LOGGER.info("^ CANCEL PACKET\n")
+			  transfer = reassembler.cancel()
+			  if transfer is not None:
+			     LOGGER.info("Cancelled {}, missing byte ranges: {}\n".format(transfer.dest_path, transfer.missing()))
 
 			# bad file packet type
 			else:
@@ -0,0 +1,280 @@
+#!/bin/env python
+#===============================================================================
+# NAME: file_reassembly.py
+#
+# DESCRIPTION: Reassembly of downlinked files.  DATA packets are written at
+#              their byte offset, so they may arrive in any order, and the
+#              received byte ranges of every transfer are kept in a sparse
+#              gap map.  Transfers that end incomplete, are cancelled or are
+#              interrupted by another START keep their partial file and gap
+#              map in a "<dest>.part" file so a later START of the same
+#              destination resumes them instead of starting over.
+#
+# Copyright 2015, California Institute of Technology.
+# ALL RIGHTS RESERVED. U.S. Government Sponsorship acknowledged.
+#===============================================================================
+#
+# Python standard modules
+#
+import bisect
+import json
+import os
+import time
+
+from utils.checksum import Checksum
+
+# Suffix of the file holding the gap map of an unfinished transfer
+PART_SUFFIX = ".part"
+
+
+class GapMap:
+    """
+    Sorted, merged list of the received [start, end) byte ranges of a file.
+    """
+    def __init__(self, ranges=None):
+        self.__starts = []
+        self.__ends   = []
+        for (start, end) in (ranges or []):
+            self.add(start, end)
+
+    def add(self, start, end):
+        """
+        Record [start, end) as received.  Returns the sub-ranges of it that
+        had not been received before.
+        """
+        if end <= start:
+            return []
+        # First range that ends at or after start and may touch [start, end)
+        i = bisect.bisect_left(self.__ends, start)
+        new = []
+        pos = start
+        j = i
+        while j < len(self.__starts) and self.__starts[j] <= end:
+            if self.__starts[j] > pos:
+                new.append((pos, self.__starts[j]))
+            pos = max(pos, self.__ends[j])
+            j += 1
+        if pos < end:
+            new.append((pos, end))
+        # Replace the touched ranges [i, j) with their union
+        if j > i:
+            start = min(start, self.__starts[i])
+            end = max(end, self.__ends[j - 1])
+        self.__starts[i:j] = [start]
+        self.__ends[i:j] = [end]
+        return new
+
+    def received(self):
+        """
+        Number of bytes received.
+        """
+        return sum(self.__ends) - sum(self.__starts)
+
+    def ranges(self):
+        return zip(self.__starts, self.__ends)
+
+    def missing(self, size):
+        """
+        Return the [start, end) ranges of a file of size bytes not yet received.
+        """
+        gaps = []
+        pos = 0
+        for (start, end) in zip(self.__starts, self.__ends):
+            if start >= size:
+                break
+            if start > pos:
+                gaps.append((pos, start))
+            pos = max(pos, end)
+        if pos < size:
+            gaps.append((pos, size))
+        return gaps
+
+    def complete(self, size):
+        return not self.missing(size)
+
+
+class Transfer:
+    """
+    One file being downlinked: its destination file, gap map and checksum.
+    Data is written with lseek/write on a descriptor opened without
+    truncation, the Python 2 equivalent of pwrite.  Only bytes not received
+    before are added to the checksum, so duplicated packets do not corrupt it.
+    """
+    def __init__(self, dest_path, size, src_path=""):
+        self.dest_path = dest_path
+        self.src_path  = src_path
+        self.size      = size
+        self.gaps      = GapMap()
+        self.checksum  = Checksum()
+        self.started   = time.time()
+        # Bytes received by this session, for the throughput
+        self.bytes_recv = 0
+        self.resumed   = self.__load_part()
+        flags = os.O_RDWR | os.O_CREAT
+        if not self.resumed:
+            flags |= os.O_TRUNC
+        self.__fd = os.open(dest_path, flags, 0644)
+
+    def __part_path(self):
+        return self.dest_path + PART_SUFFIX
+
+    def __load_part(self):
+        """
+        Pick up the gap map and checksum of an unfinished transfer of the
+        same destination and size.
+        """
+        try:
+            with open(self.__part_path()) as f:
+                part = json.load(f)
+        except (IOError, ValueError):
+            return False
+        if part.get("size") != self.size or not os.path.exists(self.dest_path):
+            return False
+        self.gaps = GapMap(part["ranges"])
+        self.checksum.xSum = part["xsum"]
+        return True
+
+    def save_part(self):
+        """
+        Write the gap map and checksum next to the partial file.
+        """
+        part = {"src"    : self.src_path,
+                "size"   : self.size,
+                "ranges" : self.gaps.ranges(),
+                "xsum"   : self.checksum.xSum}
+        tmp = self.__part_path() + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(part, f)
+        os.rename(tmp, self.__part_path())
+
+    def remove_part(self):
+        try:
+            os.remove(self.__part_path())
+        except OSError:
+            pass
+
+    def write(self, offset, data):
+        """
+        Write data at offset.  Returns the number of bytes new to the file.
+        """
+        new = self.gaps.add(offset, offset + len(data))
+        if not new:
+            return 0
+        os.lseek(self.__fd, offset, os.SEEK_SET)
+        written = 0
+        while written < len(data):
+            written += os.write(self.__fd, buffer(data, written))
+        count = 0
+        for (start, end) in new:
+            self.checksum.update(data[start - offset:end - offset], start, end - start)
+            count += end - start
+        self.bytes_recv += count
+        return count
+
+    def received(self):
+        return self.gaps.received()
+
+    def missing(self):
+        return self.gaps.missing(self.size)
+
+    def complete(self):
+        return self.gaps.complete(self.size)
+
+    def throughput(self):
+        """
+        Bytes per second received by this session.
+        """
+        elapsed = time.time() - self.started
+        if elapsed <= 0:
+            return 0.0
+        return self.bytes_recv / elapsed
+
+    def close(self):
+        if self.__fd is not None:
+            os.close(self.__fd)
+            self.__fd = None
+
+
+class Reassembler:
+    """
+    Reassembles the file transfers of one downlink.
+
+    Transfers are keyed by destination path.  File DATA and END packets do
+    not name their transfer, so they go to the transfer most recently
+    started.  A START for another destination suspends the current transfer
+    (its gap map is saved) rather than discarding it, and a START for a
+    suspended or unfinished destination resumes it.
+    """
+    def __init__(self):
+        self.__transfers = dict()
+        self.__current   = None
+
+    def current(self):
+        return self.__current
+
+    def transfers(self):
+        return self.__transfers.values()
+
+    def start(self, dest_path, size, src_path=""):
+        """
+        Begin or resume the transfer of dest_path and make it current.
+        """
+        if self.__current is not None and self.__current.dest_path != dest_path:
+            self.__current.save_part()
+        transfer = self.__transfers.get(dest_path)
+        if transfer is None or transfer.size != size:
+            if transfer is not None:
+                transfer.close()
+            transfer = Transfer(dest_path, size, src_path)
+            self.__transfers[dest_path] = transfer
+        self.__current = transfer
+        return transfer
+
+    def data(self, offset, data):
+        """
+        Write the data of a DATA packet to the current transfer.
+        Returns the current transfer, or None if no transfer was started.
+        """
+        if self.__current is None:
+            return None
+        self.__current.write(offset, data)
+        return self.__current
+
+    def end(self):
+        """
+        Finish the current transfer.  A complete transfer is closed and
+        forgotten; an incomplete one keeps its gap map on disk so it can be
+        resumed.  Returns the transfer, or None if no transfer was started.
+        """
+        transfer = self.__current
+        if transfer is None:
+            return None
+        self.__current = None
+        del self.__transfers[transfer.dest_path]
+        transfer.close()
+        if transfer.complete():
+            transfer.remove_part()
+        else:
+            transfer.save_part()
+        return transfer
+
+    def cancel(self):
+        """
+        Stop the current transfer, keeping its gap map for a later resume.
+        """
+        transfer = self.__current
+        if transfer is None:
+            return None
+        self.__current = None
+        transfer.save_part()
+        return transfer
+
+    def close(self):
+        """
+        Save the gap maps of all unfinished transfers and close their files.
+        """
+        for transfer in self.__transfers.values():
+            transfer.save_part()
+            transfer.close()
+        self.__transfers = dict()
+        self.__current = None
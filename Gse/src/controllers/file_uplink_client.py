@@ -5,6 +5,7 @@ import exceptions
 import subprocess
 import Queue
 import time
+import struct
 from enum import Enum
 from subprocess import PIPE
 
@@ -73,13 +74,41 @@ def get_uplink_server_socket(host, port):
     return sock
 
 
-def send_file(src_path, dest_path, sock, offset=0, data_size=64, subprocess=False):
+# Socket server routing prefix, packet descriptor and file packet
+# descriptor type preceding every file packet sent to the FSW
+CMD_PREFIX = "A5A5 FSW "
+CMD_DESC   = 0x5A5A5A5A
+FILE_DESC_TYPE = 3
+# Routing prefix, descriptor, packet length, descriptor type, then the
+# DATA packet header: packet type, sequence index, byte offset, data size
+DATA_PKT_HEADER = struct.Struct(">9sIIIBIIH")
+# Packet length of a DATA packet without its data: the descriptor type
+# and the DATA packet header
+DATA_PKT_LEN = DATA_PKT_HEADER.size - len(CMD_PREFIX) - 4 - 4
+
+
+def _frame_packet(pkt):
+    """
+    Prefix a serialized file packet for routing to the FSW by the server.
+    """
+    desc = U32Type( CMD_DESC )
+    desc_type = U32Type( FILE_DESC_TYPE )
+    pkt_len = U32Type( len(pkt) + desc_type.getSize() )
+    return (CMD_PREFIX + desc.serialize() + pkt_len.serialize() + desc_type.serialize() + pkt, pkt_len.val)
+
+
+def send_file(src_path, dest_path, sock, offset=0, data_size=64, subprocess=False, window=64, block_size=1024*1024):
     """
     Send a file to the FSW target application.
+    The file is streamed in blocks of block_size bytes while the checksum
+    is updated incrementally, and window DATA packets are sent with each
+    socket send.
     @param src_path: Source path of file to be sent.
     @param dest_path: Destination path of file to be received by FSW application.
-    @param offset: Byte offset into the source file (0 by default).
+    @param offset: Byte offset into the source file to resume sending from (0 by default).
     @param data_size: Size of data packets (in bytes) being sent to FSW application.
+    @param window: Number of DATA packets coalesced into one socket send.
+    @param block_size: Size of the blocks read from the source file.
     """
     global LOGGER
 
@@ -103,78 +132,83 @@ def send_file(src_path, dest_path, sock, offset=0, data_size=64, subprocess=Fals
     LOGGER.info("Sending Ground File: {}".format(src_path))
     LOGGER.info("Target Destination:  {}".format(dest_path))
 
-    # Package and send immediate command here...
-    desc = U32Type( 0x5A5A5A5A )
-
-    # Added desc. type for FSW to know it is a file (3).
-    desc_type = U32Type(3)
+    file_size = os.fstat(src_file.fileno()).st_size
+    # Read whole DATA packets from each block
+    block_size = max(data_size, block_size - block_size % data_size)
+    checksum = Checksum()
 
-    file_data = src_file.read()
+    # The END packet checksum covers the whole file, so data before
+    # the resume offset is read for the checksum only.
+    file_idx = 0
+    while file_idx < offset:
+        block = src_file.read(min(block_size, offset - file_idx))
+        if not block:
+            break
+        checksum.update(block, file_idx, len(block))
+        file_idx += len(block)
 
     # Add null character to paths
     src_path = src_path + "\0"
     dest_path = dest_path + "\0"
 
     # Prep START packet
-    start_pkt = StartPacket(seq_idx, len(file_data), src_path, dest_path)
+    start_pkt = StartPacket(seq_idx, file_size, src_path, dest_path)
     seq_idx += 1
 
     if subprocess:
-        print "<s|{}|{}>\n".format(len(file_data), src_path),
+        print "<s|{}|{}>\n".format(file_size, src_path),
         sys.stdout.flush()
 
-    pkt_len = U32Type( start_pkt.getBufSize() + desc_type.getSize() )
-    cmd = "A5A5 " + "FSW " + desc.serialize() + pkt_len.serialize() + desc_type.serialize() + start_pkt.serialize()
-    total_sent += pkt_len.val
-
-    #print "Bytes to be sent to socket:"
-    #type_base.showBytes(cmd)
-
+    (cmd, pkt_len) = _frame_packet(start_pkt.serialize())
+    total_sent += pkt_len
 
     # Send START packet
     sock.send(cmd)
 
-    # Prep DATA packets
-    for file_idx in range(0, len(file_data), data_size):
-        file_chunk = file_data[file_idx:(file_idx + data_size)]
-        data_pkt = DataPacket(seq_idx, file_idx, len(file_chunk), file_chunk)
-
-        pkt_len = U32Type( data_pkt.getBufSize() + desc_type.getSize() )
-        cmd = "A5A5 " + "FSW " + desc.serialize() + pkt_len.serialize() + desc_type.serialize() + data_pkt.serialize()
-
-        #print "Bytes to be sent to socket:"
-        #type_base.showBytes(cmd)
-
-        # send DATA packets
-        sock.send(cmd)
-        seq_idx += 1
-
-        data_sent += pkt_len.val
-        total_sent += pkt_len.val
-
-        cur_sent = float(file_idx)/len(file_data)*100
+    # Prep and send DATA packets, window packets per send
+    batch = []
+    while True:
+        block = src_file.read(block_size)
+        if not block:
+            break
+        checksum.update(block, file_idx, len(block))
+
+        for block_idx in range(0, len(block), data_size):
+            file_chunk = block[block_idx:(block_idx + data_size)]
+            pkt_len = DATA_PKT_LEN + len(file_chunk)
+            batch.append(DATA_PKT_HEADER.pack(CMD_PREFIX, CMD_DESC, pkt_len, FILE_DESC_TYPE,
+                                              PacketType.DATA.value, seq_idx, file_idx + block_idx, len(file_chunk)))
+            batch.append(file_chunk)
+            seq_idx += 1
+
+            data_sent += pkt_len
+            total_sent += pkt_len
+
+            if len(batch) >= 2 * window:
+                # send DATA packets
+                sock.send(''.join(batch))
+                batch = []
+
+                cur_sent = float(file_idx + block_idx)/file_size*100
+                if subprocess:
+                    print "<d|{}|{}>\n".format(cur_sent, data_sent),
+                    sys.stdout.flush()
+
+        file_idx += len(block)
+
+    if batch:
+        sock.send(''.join(batch))
         if subprocess:
-            print "<d|{}|{}>\n".format(cur_sent, data_sent),
+            print "<d|{}|{}>\n".format(100.0, data_sent),
             sys.stdout.flush()
 
-
-
     if subprocess:
         print "<e|x_prep>\n",
 
     # Prep END packet
-    checksum = Checksum()
-
-    #TODO: assuming file offset of 0 for now
-    checksum.update(file_data, 0, len(file_data))
-
     end_pkt = EndPacket(seq_idx, checksum.xSum)
-    pkt_len = U32Type( end_pkt.getBufSize() + desc_type.getSize() )
-    cmd = "A5A5 " + "FSW " + desc.serialize() + pkt_len.serialize() + desc_type.serialize() + end_pkt.serialize()
-    total_sent += pkt_len.val
-
-    #print "Bytes to be sent to socket:"
-    #type_base.showBytes(cmd)
+    (cmd, pkt_len) = _frame_packet(end_pkt.serialize())
+    total_sent += pkt_len
 
     # Send END packet
     sock.send(cmd)
@@ -313,6 +347,8 @@ if __name__ == '__main__':
                       default=0)
     parser.add_option("-s", "--data_size", dest="data_size", action="store", type="int", \
                       help="Size of data packets (in bytes) being sent to FSW application (default = 512).", default=512)
+    parser.add_option("-w", "--window", dest="window", action="store", type="int", \
+                      help="Number of data packets sent to the socket at once (default = 64).", default=64)
     parser.add_option("-l", "--logfolder", dest="logfolder", action="store", type="string", help="Log folder path", default=None)
 
     # process options
@@ -323,9 +359,9 @@ if __name__ == '__main__':
 
     set_logger(opts.logfolder)
     sock = get_uplink_server_socket(opts.host, opts.port)
-    status, bytes_sent = send_file(opts.filepath, opts.destpath, sock, opts.offset, opts.data_size, subprocess=True)
+    status, bytes_sent = send_file(opts.filepath, opts.destpath, sock, opts.offset, opts.data_size, subprocess=True, window=opts.window)
 
-    if status == UplinkStatus.UPLINK_OKAY:
+    if status == UplinkStatus.SUCCESS.value:
         LOGGER.info("----- UPLOAD COMPLETE -----\n\n")
         sys.exit(0)
     else:
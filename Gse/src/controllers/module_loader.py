@@ -19,25 +19,68 @@ import glob
 import os
 import sys
 import exceptions
+import cPickle
 #
-# adding the loadModules call.
+# Optional on-disk cache of module attributes.  When enabled the attributes
+# read from a module path are pickled into CACHE_FILE within that path and
+# reused as long as no module file changed its name, size or mtime.
+CACHE_FLAG = 0
+CACHE_FILE = "__gse_dict_cache__.pkl"
+
+def setCacheFlag(flag_val):
+    global CACHE_FLAG
+    CACHE_FLAG = flag_val
+
+def _read_cache(cache_file, key):
+    """
+    Return the cached attribute list if the cache matches key, else None.
+    """
+    try:
+        f = open(cache_file, 'rb')
+        try:
+            (cached_key, attr_list) = cPickle.load(f)
+        finally:
+            f.close()
+    except Exception:
+        return None
+    if cached_key != key:
+        return None
+    return attr_list
+
+def _write_cache(cache_file, key, attr_list):
+    """
+    Atomically replace the cache file, ignoring unwritable paths.
+    """
+    tmp = "%s.%d" % (cache_file, os.getpid())
+    try:
+        f = open(tmp, 'wb')
+        try:
+            cPickle.dump((key, attr_list), f, cPickle.HIGHEST_PROTOCOL)
+        finally:
+            f.close()
+        os.rename(tmp, cache_file)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+#
+# adding the loadModules and loadModuleAttributes calls.
 def ModuleLoader(Class):
     setattr(Class, "module_path", None)
-    def loadModules(self, module_path, attr1, attr2):
+    def loadModuleAttributes(self, module_path, attrs, qualified=True):
         """
         Decorator method to load all modules found
-        within a specified path.
+        within a specified path, importing each module once.
         @param module_path: directory path to modules
-        @param attr1: module attribute used as key to list
-        @param attr2: module attribute used as value to list
-        @return: a list of (key, value) tuples from the modules   
+        @param attrs: list of module attribute names to read
+        @param qualified: import modules by package qualified name
+        @return: a list with one tuple of attribute values (in attrs order) per module
         """
         #
         # First add modules target directory to python path
         if not os.path.isdir(module_path):
             raise exceptions.GseControllerUndefinedDirectoryException(module_path)
         sys.path.append(module_path)
-        
+
         #
         # Get package name from path here
         pkg = os.path.split(module_path)[-1]
@@ -45,33 +88,44 @@ def ModuleLoader(Class):
         #
         # Get the modules
         #
-        modules = glob.glob(module_path + os.sep + '*.py')
-        #
-        # Iterate over them and import them
-        #
-        file_list = []
-        for imp in modules:
-            fi = os.path.split(imp)[-1]
-            if fi != "__init__.py":
-                file_list.append(fi)
+        modules = sorted(glob.glob(module_path + os.sep + '*.py'))
+        modules = [imp for imp in modules if os.path.split(imp)[-1] != "__init__.py"]
+
+        if CACHE_FLAG:
+            key = (list(attrs), qualified, [(os.path.split(imp)[-1], os.path.getmtime(imp), os.path.getsize(imp)) for imp in modules])
+            cache_file = module_path + os.sep + CACHE_FILE
+            attr_list = _read_cache(cache_file, key)
+            if attr_list is not None:
+                return attr_list
+
         #
         # Import the modules here
         #
-        loaded_modules = sys.modules.keys()
-        module_list = []
-        for m in file_list:
-            m = m[:-3]
-            # Use package name qualifier so that modules of same name get reloaded by unique path
-            exec "from %s import %s" % (pkg, m) in globals()
-            module_list.append(m)
-
         attr_list = []
-        for m in module_list:
-            attr_list.append((eval("%s.%s" % (m,attr1)),eval("%s.%s" % (m,attr2))))
-
+        for imp in modules:
+            m = os.path.split(imp)[-1][:-3]
+            if qualified:
+                # Use package name qualifier so that modules of same name get reloaded by unique path
+                module = getattr(__import__(pkg, globals(), locals(), [m]), m)
+            else:
+                module = __import__(m)
+            attr_list.append(tuple([getattr(module, attr) for attr in attrs]))
 
+        if CACHE_FLAG:
+            _write_cache(cache_file, key, attr_list)
         return attr_list
 
+    def loadModules(self, module_path, attr1, attr2):
+        """
+        Decorator method to load all modules found
+        within a specified path.
+        @param module_path: directory path to modules
+        @param attr1: module attribute used as key to list
+        @param attr2: module attribute used as value to list
+        @return: a list of (key, value) tuples from the modules
+        """
+        return self.loadModuleAttributes(module_path, [attr1, attr2])
+
+    setattr(Class, "loadModuleAttributes", loadModuleAttributes)
     setattr(Class, "loadModules", loadModules)
     return Class
-    
\ No newline at end of file
@@ -0,0 +1,276 @@
+#!/bin/env python
+#===============================================================================
+# NAME: packet_decoder.py
+#
+# DESCRIPTION: Precompiled decoders for channel telemetry and log event
+#              packets.  For every channel or event ID one struct.Struct is
+#              built that covers the packet header (size, descriptor, ID and
+#              time) plus all fixed size values, so a packet is decoded with
+#              a single unpack_from() instead of one type object per field.
+#              Strings, whose size is only known once they are read, are
+#              decoded inline and serializables by a copy of their type
+#              object.
+#
+#              Decoding is stateless: the type objects of the shared
+#              ChannelLoader/EventLoader dictionaries are never written to,
+#              so any number of threads or processes may decode at once.
+#              decode_record() returns the result as an immutable
+#              ChannelRecord or EventRecord.
+#
+# Copyright 2015, California Institute of Technology.
+# ALL RIGHTS RESERVED. U.S. Government Sponsorship acknowledged.
+#===============================================================================
+#
+# Python standard modules
+#
+import collections
+import copy
+import struct
+
+from models.serialize.type_exceptions import *
+from models.serialize import u8_type
+from models.serialize import u16_type
+from models.serialize import u32_type
+from models.serialize import u64_type
+from models.serialize import i8_type
+from models.serialize import i16_type
+from models.serialize import i32_type
+from models.serialize import i64_type
+from models.serialize import f32_type
+from models.serialize import f64_type
+from models.serialize import bool_type
+from models.serialize import enum_type
+from models.serialize import string_type
+
+# Packet header: size, descriptor, ID, time base, time context, seconds, useconds
+HEADER_FORMAT = ">IIIHBII"
+HEADER = struct.Struct(HEADER_FORMAT)
+ID     = struct.Struct(">I")
+ID_OFFSET = 8
+STR_SIZE = struct.Struct(">H")
+
+# Decoded packets; time is (time_base, time_context, time_secs, time_usecs)
+ChannelRecord = collections.namedtuple('ChannelRecord', 'id name time value')
+EventRecord   = collections.namedtuple('EventRecord', 'id name severity time args text')
+
+
+def _i8(val):
+    # I8Type deserializes unsigned and rejects values above 127
+    if val > 127:
+        raise TypeRangeException(val)
+    return val
+
+def _bool(val):
+    return val == 0xFF
+
+def _enum(type_obj):
+    members = dict()
+    for member in type_obj.enum_dict().keys():
+        members.setdefault(type_obj.enum_dict()[member], member)
+    def convert(val):
+        if val not in members:
+            raise TypeRangeException(val)
+        return members[val]
+    return convert
+
+
+def field_format(type_obj):
+    """
+    Return (struct format code, converter) for a fixed size type object,
+    or None if the type has to be decoded by the object itself.  The
+    converter is None when the unpacked value is used as is.
+    """
+    t = type(type_obj)
+    if t is u8_type.U8Type:
+        return ('B', None)
+    elif t is u16_type.U16Type:
+        return ('H', None)
+    elif t is u32_type.U32Type:
+        return ('I', None)
+    elif t is u64_type.U64Type:
+        return ('Q', None)
+    elif t is i8_type.I8Type:
+        return ('B', _i8)
+    elif t is i16_type.I16Type:
+        return ('h', None)
+    elif t is i32_type.I32Type:
+        return ('i', None)
+    elif t is i64_type.I64Type:
+        return ('q', None)
+    elif t is f32_type.F32Type:
+        return ('f', None)
+    elif t is f64_type.F64Type:
+        return ('d', None)
+    elif t is bool_type.BoolType:
+        return ('B', _bool)
+    elif t is enum_type.EnumType:
+        return ('i', _enum(type_obj))
+    return None
+
+
+def decode_string(msg, offset, max_string_len=None):
+    """
+    Return (string, serialized size) of the string serialized at offset.
+    Raises StringSizeException if the string is longer than max_string_len,
+    like StringType.deserialize.
+    """
+    if len(msg) < offset + STR_SIZE.size:
+        raise DeserializeException("Not enough data to deserialize! Needed: %d Left: %d" % (STR_SIZE.size, len(msg) - offset))
+    size = STR_SIZE.unpack_from(msg, offset)[0]
+    if len(msg) - offset - STR_SIZE.size < size:
+        raise DeserializeException("Not enough data to deserialize! Needed: %d Left: %d" % (size, len(msg) - offset - STR_SIZE.size))
+    if max_string_len is not None and size > max_string_len:
+        raise StringSizeException(size, max_string_len)
+    offset += STR_SIZE.size
+    return (msg[offset:offset + size], STR_SIZE.size + size)
+
+
+class CompiledPacket(object):
+    """
+    Decoder for the packets of one channel or event ID.
+
+    Holds the Struct covering the header and the leading fixed size values,
+    the converters for those values and the type objects of any remaining
+    values that need per-type decoding.
+    """
+    __slots__ = ('struct', 'converters', 'tail')
+
+    def __init__(self, type_objs):
+        fmt = HEADER_FORMAT
+        self.converters = []
+        self.tail = []
+        for i, type_obj in enumerate(type_objs):
+            field = field_format(type_obj)
+            if field is None:
+                self.tail = type_objs[i:]
+                break
+            fmt += field[0]
+            self.converters.append(field[1])
+        self.struct = struct.Struct(fmt)
+
+    def decode(self, msg, error_label):
+        """
+        Return the header tuple and the list of decoded values.  Values that
+        fail their type check are replaced by "ERR" like the type objects do.
+        """
+        fields = self.struct.unpack_from(msg, 0)
+        header = fields[:7]
+        vals = []
+        for convert, val in zip(self.converters, fields[7:]):
+            if convert is not None:
+                try:
+                    val = convert(val)
+                except TypeException as e:
+                    print "%s deserialize exception %s" % (error_label, e.getMsg())
+                    val = "ERR"
+            vals.append(val)
+        offset = self.struct.size
+        for n, type_obj in enumerate(self.tail):
+            try:
+                if type(type_obj) is string_type.StringType:
+                    (val, size) = decode_string(msg, offset, type_obj.max_string_len)
+                else:
+                    # Never deserialize into the shared dictionary object
+                    type_obj = copy.deepcopy(type_obj)
+                    type_obj.deserialize(msg, offset)
+                    (val, size) = (type_obj.val, type_obj.getSize())
+            except TypeException as e:
+                print "%s deserialize exception %s" % (error_label, e.getMsg())
+                # The size of the failed value is unknown, so are the rest
+                vals.extend(["ERR"] * (len(self.tail) - n))
+                break
+            vals.append(val)
+            offset = offset + size
+        return (header, vals)
+
+
+class ChannelDecoder(object):
+    """
+    Decode channel telemetry packets with the channels of a ChannelLoader
+    dictionary.  Decoders are compiled the first time an ID is seen.
+    """
+    def __init__(self, ch_obj_dict):
+        self.__ch_obj_dict = ch_obj_dict
+        self.__compiled = dict()
+
+    def compile(self, i):
+        ch_obj = self.__ch_obj_dict[i]
+        self.__compiled[i] = CompiledPacket([ch_obj.getType()])
+        return self.__compiled[i]
+
+    def decode(self, msg):
+        """
+        Decode a channel telemetry packet.
+        Returns (id, (time_base, time_context, time_secs, time_usecs), value),
+        value being None if the ID is not in the dictionary.
+        """
+        i = ID.unpack_from(msg, ID_OFFSET)[0]
+        compiled = self.__compiled.get(i)
+        if compiled is None:
+            if i not in self.__ch_obj_dict:
+                header = HEADER.unpack_from(msg, 0)
+                return (i, header[3:], None)
+            compiled = self.compile(i)
+        (header, vals) = compiled.decode(msg, "Channel")
+        return (i, header[3:], vals[0])
+
+    def decode_record(self, msg):
+        """
+        Decode a channel telemetry packet into a ChannelRecord, whose name
+        and value are None if the ID is not in the dictionary.
+        """
+        (i, t, value) = self.decode(msg)
+        ch_obj = self.__ch_obj_dict.get(i)
+        name = None
+        if ch_obj is not None:
+            name = ch_obj.getName()
+        return ChannelRecord(i, name, t, value)
+
+
+class EventDecoder(object):
+    """
+    Decode log event packets with the events of an EventLoader
+    dictionary.  Decoders are compiled the first time an ID is seen.
+    """
+    def __init__(self, event_obj_dict):
+        self.__event_obj_dict = event_obj_dict
+        self.__compiled = dict()
+
+    def compile(self, i):
+        event_obj = self.__event_obj_dict[i]
+        self.__compiled[i] = CompiledPacket([arg[2] for arg in event_obj.getArgs()])
+        return self.__compiled[i]
+
+    def decode(self, msg):
+        """
+        Decode a log event packet.
+        Returns (id, (time_base, time_context, time_secs, time_usecs), args),
+        args being a list laid out like Event.deserialize() returns it
+        (a leading 0 followed by the argument values), or None if the ID
+        is not in the dictionary.
+        """
+        i = ID.unpack_from(msg, ID_OFFSET)[0]
+        compiled = self.__compiled.get(i)
+        if compiled is None:
+            if i not in self.__event_obj_dict:
+                header = HEADER.unpack_from(msg, 0)
+                return (i, header[3:], None)
+            compiled = self.compile(i)
+        (header, vals) = compiled.decode(msg, "Event")
+        return (i, header[3:], [0] + vals)
+
+    def decode_record(self, msg):
+        """
+        Decode a log event packet into an EventRecord.  args holds only the
+        argument values and text the formatted message.  All fields but id
+        and time are None if the ID is not in the dictionary.
+        """
+        (i, t, event_args) = self.decode(msg)
+        event_obj = self.__event_obj_dict.get(i)
+        if event_obj is None:
+            return EventRecord(i, None, None, t, None, None)
+        try:
+            text = event_obj.stringify(event_args)
+        except (TypeError, ValueError):
+            text = None
+        return EventRecord(i, event_obj.getName(), event_obj.getSeverity(), t, tuple(event_args[1:]), text)
@@ -1,7 +1,6 @@
 import os
 import Tkinter
 import signal
-import datetime
 
 from controllers import observer
 
@@ -37,13 +36,11 @@ class StripChartListener(observer.Observed):
         """
         (name, i, ch, t, ch_value,f,lr,lo,ly,hy,ho,hr) = msg
 
-        # Time handling here?
+        # Seconds since the epoch; the strip charts convert them to plot
+        # dates in bulk
         (tb, tc, ts, tus) = t
 
-        dt_object = datetime.datetime.fromtimestamp(ts)
-        dt_object = dt_object + datetime.timedelta(microseconds=tus)
-
-        self.__tlm = {'ch_name':name , 'ch_value':ch_value, 'datetime_object':dt_object}
+        self.__tlm = {'ch_name':name , 'ch_value':ch_value, 'timestamp':ts + tus * 1e-6}
 
         self.observers_notify()
             
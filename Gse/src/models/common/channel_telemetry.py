@@ -26,6 +26,7 @@ from models.serialize.i64_type import *
 from models.serialize.string_type import *
 from models.serialize.serializable_type import *
 
+import copy
 import struct
 
 
@@ -80,12 +81,15 @@ class Channel(object):
         '''
         Deserialize event arguments
         @param ser_data: Binary input of the channel value.
+        The channel type object is not modified, so channels may be
+        deserialized from several threads at once.
         '''
         #type_base.showBytes(ser_data[offset:])
         #
         try:
-            self.__ch_type.deserialize(ser_data, offset)
-            val = self.__ch_type.val
+            ch_type = copy.deepcopy(self.__ch_type)
+            ch_type.deserialize(ser_data, offset)
+            val = ch_type.val
         except TypeException as e:
             print "Channel deserialize exception %s"%(e.getMsg())
             val = "ERR"
@@ -26,6 +26,7 @@ from models.serialize.i64_type import *
 from models.serialize.string_type import *
 from models.serialize.serializable_type import *
 
+import copy
 import struct
 from enum import Enum
 import traceback
@@ -83,6 +84,8 @@ class Event(object):
         '''
         Deserialize event arguments
         @param ser_data: Binary input data of id followed by args
+        The argument type objects are not modified, so events may be
+        deserialized from several threads at once.
         '''
         vals = []
         #
@@ -91,7 +94,7 @@ class Event(object):
         args = list(self.__arguments)
         offset = 0
         for arg in args:
-            arg_obj = arg[2]
+            arg_obj = copy.deepcopy(arg[2])
             try:
                 #print arg_obj
                 arg_obj.deserialize(ser_data, offset)
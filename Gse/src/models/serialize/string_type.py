@@ -39,6 +39,10 @@ class StringType(type_base.BaseType):
         self._check_val(val)
         self.__val = val
 
+    @property
+    def max_string_len(self):
+        return self.__max_string_len
+
 
     def serialize(self):
         """
@@ -137,7 +137,10 @@ class ConfigManager(ConfigParser.SafeConfigParser):
         self.__prop['performance'] = dict()
         self.__prop['performance']['stripchart_update_rate']  = 500 # Milliseconds
         self.__prop['performance']['telem_table_update_rate'] = 500 # Milliseconds
+        self.__prop['performance']['gui_update_rate']         = 100 # Milliseconds between batched listener updates
         self.__prop['performance']['status_light_deadband'] = 3 # Seconds
+        self.__prop['performance']['log_flush_records']     = 1000 # Pending log records that wake the log writer
+        self.__prop['performance']['log_flush_interval']    = 500 # Milliseconds between log writes
         #
         self.__prop['severity_colors']=dict()
         self.__prop['severity_colors'][Severity.COMMAND.name]    = "lightblue"
@@ -0,0 +1,165 @@
+#!/bin/env python
+#===============================================================================
+# NAME: async_log.py
+#
+# DESCRIPTION: Background writer for the channel and event logs.  The
+#              listeners only append their records to a deque, which is
+#              safe to use from two threads without a lock.  A daemon
+#              thread drains the deque, formats each batch with one call
+#              and writes it with a single write/flush, either when enough
+#              records are pending or when the flush interval elapses.
+#
+#              Text logs keep the format of the old synchronous loggers.
+#              In binary mode the raw packets are written instead, in the
+#              size prefixed format of RAW.bin, so they can be read back
+#              column-wise with utils.binary_log.BinaryLogReader.
+#
+# Copyright 2015, California Institute of Technology.
+# ALL RIGHTS RESERVED. U.S. Government Sponsorship acknowledged.
+#===============================================================================
+#
+# Python standard modules
+#
+import atexit
+import collections
+import threading
+import time
+
+from utils import ConfigManager
+
+# Log formats selectable with gse.py --log-format
+LOG_FORMATS = ("text", "binary")
+
+# Writers still open at exit are drained by close_all()
+_writers = []
+
+
+class TimeStamp:
+    """
+    strftime() of the wall clock time, cached for the current second.
+    """
+    def __init__(self, fmt="%Y-%m-%d %H:%M:%S:", gmt=False):
+        self.__fmt = fmt
+        self.__convert = time.gmtime if gmt else time.localtime
+        self.__second = None
+        self.__stamp = None
+
+    def __call__(self, t):
+        second = int(t)
+        if second != self.__second:
+            self.__stamp = time.strftime(self.__fmt, self.__convert(second))
+            self.__second = second
+        return self.__stamp
+
+
+class AsyncLogWriter:
+    """
+    Write records to a file from a background thread.
+
+    format_batch(records) turns a list of records, in the order they were
+    logged, into one string to write.  log() never blocks and never
+    formats; it only wakes the writer thread once flush_records are
+    pending.  Otherwise the thread wakes every flush_interval seconds.
+    """
+    def __init__(self, filename, format_batch, binary=False, flush_records=1000, flush_interval=0.5):
+        self.__file = open(filename, "ab" if binary else "a")
+        self.__format_batch = format_batch
+        self.__flush_records = flush_records
+        self.__flush_interval = flush_interval
+        self.__records = collections.deque()
+        self.__wakeup = threading.Event()
+        self.__closing = False
+        self.__thread = threading.Thread(target=self.__run, name="AsyncLogWriter")
+        self.__thread.setDaemon(True)
+        self.__thread.start()
+        _writers.append(self)
+
+    def log(self, record):
+        self.__records.append(record)
+        if len(self.__records) >= self.__flush_records:
+            self.__wakeup.set()
+
+    def write_now(self, text):
+        """
+        Queue text to be written as is, bypassing format_batch().
+        """
+        self.log(_Verbatim(text))
+
+    def __run(self):
+        while not self.__closing:
+            self.__wakeup.wait(self.__flush_interval)
+            self.__wakeup.clear()
+            self.__drain()
+        self.__drain()
+
+    def __drain(self):
+        records = []
+        popleft = self.__records.popleft
+        try:
+            while True:
+                records.append(popleft())
+        except IndexError:
+            pass
+        if not records:
+            return
+        # Format runs of records between verbatim texts in one call each
+        chunks = []
+        batch = []
+        for record in records:
+            if isinstance(record, _Verbatim):
+                if batch:
+                    chunks.append(self.__format_batch(batch))
+                    batch = []
+                chunks.append(record.text)
+            else:
+                batch.append(record)
+        if batch:
+            chunks.append(self.__format_batch(batch))
+        self.__file.write("".join(chunks))
+        self.__file.flush()
+
+    def close(self):
+        """
+        Write all pending records and close the file.
+        """
+        if self.__closing:
+            return
+        self.__closing = True
+        self.__wakeup.set()
+        self.__thread.join()
+        self.__file.close()
+        if self in _writers:
+            _writers.remove(self)
+
+
+class _Verbatim(object):
+    __slots__ = ('text',)
+
+    def __init__(self, text):
+        self.text = text
+
+
+def format_packets(records):
+    """
+    Binary format_batch: records are (time, packet) with packet the raw,
+    size prefixed channel or event packet.
+    """
+    return "".join([packet for (t, packet) in records])
+
+
+def open_log(filename, format_batch, binary=False):
+    """
+    Open an AsyncLogWriter with the flush thresholds of the performance
+    section of the configuration.
+    """
+    config = ConfigManager.ConfigManager.getInstance()
+    return AsyncLogWriter(filename, format_batch, binary,
+                          config.getint('performance', 'log_flush_records'),
+                          config.getint('performance', 'log_flush_interval') / 1000.0)
+
+
+def close_all():
+    for writer in list(_writers):
+        writer.close()
+
+atexit.register(close_all)
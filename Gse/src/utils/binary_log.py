@@ -0,0 +1,234 @@
+#!/bin/env python
+#===============================================================================
+# NAME: binary_log.py
+#
+# DESCRIPTION: Offline reader for the raw binary log (RAW.bin) written by
+#              EventListener.setupBinaryLogging.  The log is memory mapped,
+#              packet boundaries are indexed in one pass and every channel
+#              is decoded at once into NumPy time and value columns using
+#              the channel dictionary types.
+#
+# Copyright 2015, California Institute of Technology.
+# ALL RIGHTS RESERVED. U.S. Government Sponsorship acknowledged.
+#===============================================================================
+#
+# Python standard modules
+#
+import collections
+import mmap
+import os
+import struct
+import sys
+from optparse import OptionParser
+
+import numpy as np
+
+# Packet descriptors
+DESC_CHANNEL = 1
+DESC_EVENT   = 2
+
+# Byte offsets within a packet: size, descriptor, ID, time base (U16),
+# time context (U8), seconds, useconds, then the value.
+DESC_OFFSET  = 4
+ID_OFFSET    = 8
+SECS_OFFSET  = 15
+USECS_OFFSET = 19
+VALUE_OFFSET = 23
+
+SIZE_WORD = struct.Struct(">I")
+STR_SIZE  = struct.Struct(">H")
+
+# NumPy dtype of every fixed size channel type, keyed by type class name
+DTYPES = {
+    'U8Type'   : '>u1',
+    'U16Type'  : '>u2',
+    'U32Type'  : '>u4',
+    'U64Type'  : '>u8',
+    'I8Type'   : '>i1',
+    'I16Type'  : '>i2',
+    'I32Type'  : '>i4',
+    'I64Type'  : '>i8',
+    'F32Type'  : '>f4',
+    'F64Type'  : '>f8',
+    'BoolType' : '>u1',
+    'EnumType' : '>i4',
+}
+
+ChannelColumns = collections.namedtuple('ChannelColumns', 'id name seconds useconds time value')
+
+
+def gather(raw, offsets, dtype):
+    """
+    Read one value of dtype at every byte offset of a uint8 array.
+    """
+    dtype = np.dtype(dtype)
+    idx = offsets[:, np.newaxis] + np.arange(dtype.itemsize)
+    return raw[idx].view(dtype).reshape(-1)
+
+
+class BinaryLogReader(object):
+    """
+    Column oriented reader of a raw binary log.
+
+    The log is a stream of packets, each a U32 size followed by size bytes
+    of descriptor and data.  index() finds every packet with a single pass
+    over the mapped file; channels() then decodes all channel packets of
+    each ID with vectorized gathers instead of one packet at a time.
+    """
+    def __init__(self, filename, ch_obj_dict=None):
+        self.__file = open(filename, "rb")
+        self.__size = os.fstat(self.__file.fileno()).st_size
+        if self.__size:
+            self.__map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.__raw = np.frombuffer(self.__map, dtype=np.uint8)
+        else:
+            self.__map = None
+            self.__raw = np.zeros(0, dtype=np.uint8)
+        self.__ch_obj_dict = ch_obj_dict or dict()
+        self.__offsets = None
+        self.__truncated = 0
+
+    def close(self):
+        self.__raw = None
+        if self.__map is not None:
+            self.__map.close()
+        self.__file.close()
+
+    def __offsets_iter(self):
+        unpack = SIZE_WORD.unpack_from
+        buf = self.__map
+        end = self.__size
+        pos = 0
+        while pos + 8 <= end:
+            nxt = pos + 4 + unpack(buf, pos)[0]
+            if nxt > end:
+                break
+            yield pos
+            pos = nxt
+        # A packet cut short by the end of the log is ignored
+        self.__truncated = end - pos
+
+    def index(self):
+        """
+        Return the byte offset of every complete packet in the log.
+        """
+        if self.__offsets is None:
+            if self.__map is None:
+                self.__offsets = np.zeros(0, dtype=np.int64)
+            else:
+                self.__offsets = np.fromiter(self.__offsets_iter(), dtype=np.int64)
+        return self.__offsets
+
+    def truncated(self):
+        """
+        Number of trailing bytes that do not form a complete packet.
+        """
+        self.index()
+        return self.__truncated
+
+    def descriptors(self):
+        """
+        Return the descriptor of every packet in index() order.
+        """
+        return gather(self.__raw, self.index() + DESC_OFFSET, '>u4')
+
+    def channels(self, ids=None):
+        """
+        Decode channel telemetry into columns.
+        @param ids: optional list of channel IDs to decode, default all.
+        @return: dictionary { ID : ChannelColumns } where seconds and
+                 useconds are the packet time words, time is seconds as
+                 float64 and value is the array of channel values.
+        """
+        offsets = self.index()
+        offsets = offsets[self.descriptors() == DESC_CHANNEL]
+        ch_ids = gather(self.__raw, offsets + ID_OFFSET, '>u4')
+
+        # Group packet offsets by ID, keeping log order within each ID
+        order = np.argsort(ch_ids, kind='mergesort')
+        ch_ids = ch_ids[order]
+        offsets = offsets[order]
+        uniq, starts = np.unique(ch_ids, return_index=True)
+        bounds = list(starts[1:]) + [len(ch_ids)]
+
+        columns = dict()
+        for i, start, end in zip(uniq, starts, bounds):
+            i = int(i)
+            if ids is not None and i not in ids:
+                continue
+            columns[i] = self.__decode_channel(i, offsets[start:end])
+        return columns
+
+    def __decode_channel(self, i, offsets):
+        raw = self.__raw
+        secs = gather(raw, offsets + SECS_OFFSET, '>u4').astype(np.uint32)
+        usecs = gather(raw, offsets + USECS_OFFSET, '>u4').astype(np.uint32)
+        t = secs + usecs * 1e-6
+
+        ch_obj = self.__ch_obj_dict.get(i)
+        name = None
+        value = None
+        if ch_obj is not None:
+            name = ch_obj.getName()
+            type_obj = ch_obj.getType()
+            type_name = type(type_obj).__name__
+            if type_name in DTYPES:
+                value = gather(raw, offsets + VALUE_OFFSET, DTYPES[type_name])
+                if type_name == 'BoolType':
+                    value = value == 0xFF
+                else:
+                    value = value.astype(value.dtype.newbyteorder('='))
+            elif type_name == 'StringType':
+                value = np.array([self.__string(o + VALUE_OFFSET) for o in offsets], dtype=object)
+            else:
+                value = np.array([self.__deserialize(type_obj, o) for o in offsets], dtype=object)
+        return ChannelColumns(i, name, secs, usecs, t, value)
+
+    def __string(self, offset):
+        n = STR_SIZE.unpack_from(self.__map, offset)[0]
+        return self.__map[offset + 2:offset + 2 + n]
+
+    def __deserialize(self, type_obj, offset):
+        size = SIZE_WORD.unpack_from(self.__map, offset)[0]
+        packet = self.__map[offset:offset + 4 + size]
+        type_obj.deserialize(packet, VALUE_OFFSET)
+        return type_obj.val
+
+
+def main():
+    parser = OptionParser(usage="%prog [options] RAW.bin",
+                          description="Decode the channels of a raw binary log into NumPy arrays")
+    parser.add_option("-d", "--dictionary", dest="generated_path", action="store", type="string",
+                      help="Generated dictionary path containing the channels package", default=None)
+    parser.add_option("-o", "--output", dest="output", action="store", type="string",
+                      help="Save the columns to this .npz file", default=None)
+    (opts, args) = parser.parse_args(sys.argv[1:])
+    if len(args) != 1:
+        parser.error("A binary log file is required")
+
+    ch_obj_dict = None
+    if opts.generated_path is not None:
+        from controllers import channel_loader
+        loader = channel_loader.ChannelLoader.getInstance()
+        loader.create(opts.generated_path + os.sep + "channels")
+        ch_obj_dict = loader.getChDict()
+
+    reader = BinaryLogReader(args[0], ch_obj_dict)
+    columns = reader.channels()
+    print("%d packets, %d channels, %d trailing bytes" % (len(reader.index()), len(columns), reader.truncated()))
+    arrays = dict()
+    for i in sorted(columns):
+        col = columns[i]
+        key = col.name or ("ID_%d" % i)
+        print("%-40s %8d samples" % (key, len(col.time)))
+        arrays[key + "_time"] = col.time
+        if col.value is not None:
+            arrays[key + "_value"] = col.value
+    if opts.output is not None:
+        np.savez(opts.output, **arrays)
+    reader.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
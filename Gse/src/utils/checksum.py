@@ -12,8 +12,23 @@
 #===============================================================================
 #
 # Python standard modules
+import struct
+
+# Words summed per struct.unpack_from call
+CHUNK_WORDS = 16384
+CHUNK = struct.Struct(">%dI" % CHUNK_WORDS)
+BYTE  = struct.Struct("B")
 
 class Checksum:
+   """
+   CFDP checksum: the modulo 2^32 sum of the file taken as big-endian
+   32-bit words, each byte weighted by its file offset modulo 4.
+
+   update() may be fed consecutive or out of order pieces of the file; each
+   piece is given with its byte offset in the file.  Aligned words are
+   summed CHUNK_WORDS at a time with struct, only the unaligned head and
+   tail bytes of a piece are added one at a time.
+   """
    def __init__(self, xSum=0):
       self.xSum = xSum
 
@@ -24,47 +39,26 @@ class Checksum:
       return not (self.xSum == other)
 
    def update(self, data, offset, length):
-      index = 0
-
-      offsetMod4 = offset % 4
-      if offsetMod4 != 0:
-         wordLength = min(length, 4 - offsetMod4)
-         self.__addWordUnaligned(data[index:], offset + index, wordLength)
-         index += wordLength
-
-      while (index + 4 <= length):
-         self.__addWordAligned(data[index:])
-         index += 4
-
-      if index < length:
-         wordLength = length - index
-         self.__addWordUnaligned(data[index:], offset + index, wordLength)
-   @property
-   def xSum(self):
-      return self.xSum
-
-   @xSum.setter
-   def xSum(self, xSum):
-      self.xSum = xSum
-
-   def __addWordAligned(self, word):
-      for i in range(4):
-         self.__addByteAtOffset(word[i], i)
-
-   def __addWordUnaligned(self, word, position, length):
-      offset = position % 4
-      for i in range(length):
-         self.__addByteAtOffset(word[i], offset)
-         offset += 1
-         if offset == 4:
-            offset = 0
-
-   def __addByteAtOffset(self, byte, offset):
-      addend = self.__mls(ord(byte), (8*(3-offset)))
-      self.xSum = int(self.__madd(addend, self.xSum))
-
-   def __madd(self, a, b):
-      return (a + b) & 0xffffffffL 
-
-   def __mls(self, a, b):
-      return (a << b) & 0xffffffffL  
+      """
+      Add data[0:length], located at byte offset in the file, to the checksum.
+      data may be a str, bytearray, memoryview or mmap.
+      """
+      total = self.xSum
+      # Unaligned head
+      head = min(length, (4 - offset % 4) % 4)
+      for i in range(head):
+         total += BYTE.unpack_from(data, i)[0] << (8 * (3 - (offset + i) % 4))
+      # Aligned words
+      index = head
+      words = (length - head) // 4
+      while words >= CHUNK_WORDS:
+         total += sum(CHUNK.unpack_from(data, index))
+         index += CHUNK.size
+         words -= CHUNK_WORDS
+      if words:
+         total += sum(struct.unpack_from(">%dI" % words, data, index))
+         index += 4 * words
+      # Unaligned tail, starting on a word boundary
+      for i in range(length - index):
+         total += BYTE.unpack_from(data, index + i)[0] << (8 * (3 - i))
+      self.xSum = int(total & 0xffffffffL)
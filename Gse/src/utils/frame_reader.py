@@ -0,0 +1,156 @@
+#!/bin/env python
+#===============================================================================
+# NAME: frame_reader.py
+#
+# DESCRIPTION: Buffered socket reader shared by the GSE socket clients and
+#              the socket server.  Data is received with recv_into() into a
+#              preallocated buffer and handed out as memoryview slices, so
+#              reading a frame does not build it up by string concatenation.
+#
+# Copyright 2015, California Institute of Technology.
+# ALL RIGHTS RESERVED. U.S. Government Sponsorship acknowledged.
+#===============================================================================
+#
+# Python standard modules
+import errno
+import select
+import socket
+import struct
+
+# Size word that starts every packet sent to the GUI clients
+SIZE_WORD = struct.Struct(">I")
+
+
+class ReaderStopped(Exception):
+   """
+   Raised by a blocking read when the reader's stop check returns True.
+   """
+   pass
+
+
+class FrameReader:
+   """
+   Read fixed length fields and size prefixed frames from a stream socket.
+
+   Received bytes accumulate in one preallocated bytearray.  Consumed bytes
+   are reclaimed by moving the unread tail to the front of the buffer only
+   when the free space at the end runs out, so every field or frame is
+   returned as a single contiguous memoryview.  A returned view is only
+   valid until the next call that receives data; copy it (tobytes()) to
+   keep it.
+
+   If a stop check is given, the socket is read with MSG_DONTWAIT and
+   select() is only called while no data is pending, so the stop check is
+   polled every poll_interval seconds without a select() per chunk.
+   """
+   def __init__(self, sock, size=1024*1024, stop=None, poll_interval=0.25):
+      self.__sock = sock
+      self.__buf  = bytearray(size)
+      self.__view = memoryview(self.__buf)
+      # Unread data is __buf[__start:__end]
+      self.__start = 0
+      self.__end   = 0
+      self.__stop  = stop
+      self.__poll_interval = poll_interval
+
+   def available(self):
+      """
+      Number of received bytes not yet consumed.
+      """
+      return self.__end - self.__start
+
+   def peek(self, n, offset=0):
+      """
+      Return a view of n unread bytes starting offset bytes into the unread
+      data, or None if they have not been received yet.  Nothing is consumed.
+      """
+      start = self.__start + offset
+      if start + n > self.__end:
+         return None
+      return self.__view[start:start + n]
+
+   def consume(self, n):
+      """
+      Discard the next n unread bytes.
+      """
+      self.__start = min(self.__start + n, self.__end)
+      if self.__start == self.__end:
+         self.__start = self.__end = 0
+
+   def fill(self, need=1):
+      """
+      Receive once into the free space of the buffer, making room for at
+      least need unread bytes first.  Returns the number of bytes received,
+      0 when the peer closed the connection.  Non-blocking sockets raise
+      socket.error (EAGAIN) as usual.
+      """
+      self.__reserve(need)
+      free = self.__view[self.__end:]
+      if self.__stop is None:
+         n = self.__sock.recv_into(free)
+      else:
+         n = self.__recv_polled(free)
+      self.__end += n
+      return n
+
+   def read(self, n):
+      """
+      Block until n bytes are available and return them as a view.
+      Returns None if the connection closed first.
+      """
+      while self.__end - self.__start < n:
+         if not self.fill(n):
+            return None
+      view = self.__view[self.__start:self.__start + n]
+      self.consume(n)
+      return view
+
+   def read_frame(self, size_offset=0):
+      """
+      Block until a complete size prefixed packet is available and return
+      it whole.  The packet starts with size_offset bytes of header, then
+      the size word, then size bytes of descriptor and data.  Returns None
+      if the connection closed first.
+      """
+      header = size_offset + SIZE_WORD.size
+      while self.__end - self.__start < header:
+         if not self.fill(header):
+            return None
+      size = SIZE_WORD.unpack_from(self.__buf, self.__start + size_offset)[0]
+      return self.read(header + size)
+
+   def __reserve(self, need):
+      """
+      Make sure need unread bytes fit between __start and the end of the
+      buffer, compacting or growing it as required.
+      """
+      if self.__start + need <= len(self.__buf) and self.__end < len(self.__buf):
+         return
+      pending = self.__end - self.__start
+      if need > len(self.__buf) or pending == len(self.__buf):
+         # A single frame larger than the buffer; grow to fit it.
+         grown = bytearray(max(need, 2 * len(self.__buf)))
+         grown[:pending] = self.__buf[self.__start:self.__end]
+         self.__buf = grown
+         self.__view = memoryview(self.__buf)
+      else:
+         self.__buf[:pending] = self.__buf[self.__start:self.__end]
+      self.__start = 0
+      self.__end = pending
+
+   def __recv_polled(self, free):
+      while True:
+         try:
+            return self.__sock.recv_into(free, 0, socket.MSG_DONTWAIT)
+         except socket.error, err:
+            if err.errno not in (errno.EAGAIN, errno.EWOULDBLOCK, errno.EINTR):
+               raise
+         while True:
+            if self.__stop():
+               raise ReaderStopped("Exiting receive loop")
+            try:
+               if select.select([self.__sock], [], [], self.__poll_interval)[0]:
+                  break
+            except select.error, err:
+               if err.args[0] != errno.EINTR:
+                  raise
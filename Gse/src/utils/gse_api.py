@@ -175,6 +175,8 @@ class GseApi(object):
     def __loop_queue(self, id, type, timeout=None):
       """
       Grabs all telemetry and data in event listener's queue until the queried event / tlm id is found.
+      Blocks on the listener queue, so it returns as soon as the id is received.
+      @param timeout: Timeout in seconds (int or float), None to wait forever.
       Returns a tuple with two lists (tlm_list,evr_list)
       """
 
@@ -182,40 +184,41 @@ class GseApi(object):
       evr_list = []
       recv_id= ''
 
+      deadline = None
       if timeout:
-        signal.signal(signal.SIGALRM, self._timeout_sig_handler)
-        signal.alarm(timeout)
+        deadline = time.time() + timeout
         print 'Waiting for', type, 'ID', id
 
-      try:
-        notFound = True
-        while notFound:
-          tlm, evr = self._pop_queue()
-          if tlm is None and evr is None:
-            time.sleep(0.1)
-          else:
-            if tlm:
-              tlm_list.append(tlm)
-              (recv_id, _) = tlm
-              if id == recv_id and type == "ch":
-                notFound = False
-            if evr:
-              evr_list.append(evr)
-              (recv_id, _) = evr
-              if id == recv_id and type == "evr":
-                notFound = False
-      except TimeoutException:
-        print 'Timeout reached, unable to find', type, 'ID', id
+      notFound = True
+      while notFound:
+        remaining = None
+        if deadline is not None:
+          remaining = deadline - time.time()
+          if remaining <= 0:
+            print 'Timeout reached, unable to find', type, 'ID', id
+            break
+        tlm, evr = self._pop_queue(remaining)
+        if tlm:
+          tlm_list.append(tlm)
+          (recv_id, _) = tlm
+          if id == recv_id and type == "ch":
+            notFound = False
+        if evr:
+          evr_list.append(evr)
+          (recv_id, _) = evr
+          if id == recv_id and type == "evr":
+            notFound = False
 
-      if timeout:
-        signal.alarm(0)
       return tlm_list, evr_list
 
-    def _pop_queue(self):
+    def _pop_queue(self, timeout=0):
       """
       Grabs one thing off of the queue and passes a tuple of (tlm,evr)
+      @param timeout: 0 to return (None,None) at once if the queue is empty,
+      None to block until something is received, otherwise block for up
+      to timeout seconds.
       """
-      (desc, recv_id, args) = self._ev_listener.update_task_api()
+      (desc, recv_id, args) = self._ev_listener.update_task_api(timeout)
       if desc and recv_id:
         recv_type = ''
         recv_type = 'ch' if desc == 0x1 else recv_type
@@ -477,7 +480,7 @@ class GseApi(object):
         evr_dict = self._events.getNameDict()
         try:
             while(blocking):
-                desc, tlm_id, args = self._ev_listener.update_task_api()
+                desc, tlm_id, args = self._ev_listener.update_task_api(None)
                 # only interested in events
                 if desc is 0x1 or desc is None:
                     continue
@@ -505,7 +508,7 @@ class GseApi(object):
         ch_dict = self._channels.getNameDict()
         try:
             while(blocking):
-                desc, tlm_id, args = self._ev_listener.update_task_api()
+                desc, tlm_id, args = self._ev_listener.update_task_api(None)
                 # only interested in channelzed telemetry
                 if desc is 0x2 or desc is None:
                     continue
@@ -151,14 +151,15 @@ class HyperlinkManager(object):
 
 class CircularBuffer(object):
   """
-  Fixed length circular buffer. 
+  Fixed length circular buffer backed by a NumPy array.
+  Points are appended one at a time with add() or in bulk with
+  extend().  halves() returns the oldest and the newest part of the
+  data as views of the buffer, without copying.
   """
-  def __init__(self, max_len):
-    self.__data    = np.zeros(max_len)
+  def __init__(self, max_len, dtype=float):
+    self.__data    = np.zeros(max_len, dtype=dtype)
     self.__max_len = max_len
-    self.__max_idx = max_len - 1
-    self.__idx     = 0
-    self.__tail    = 0
+    self.__idx     = 0 # Next write position
     self.__total   = 0
 
   def add(self, datapoint):
@@ -169,30 +170,51 @@ class CircularBuffer(object):
     self.__total += 1
 
     # Reset index when it reaches end
-    if self.__idx > self.__max_idx:
+    if self.__idx == self.__max_len:
       self.__idx = 0
 
-    # Buffer is full. Tail can move
-    if self.__total > self.__max_len:
-      self.__tail += 1
-    
-    # Reset tail when it reaches end
-    if self.__tail > self.__max_idx:
-      self.__tail = 0
+  def extend(self, datapoints):
+    """
+    Append an array of data points, overwriting the oldest ones.
+    """
+    datapoints = np.asarray(datapoints, dtype=self.__data.dtype)
+    n = len(datapoints)
+    self.__total += n
 
+    # Only the newest max_len points survive
+    if n >= self.__max_len:
+      self.__data[:] = datapoints[n - self.__max_len:]
+      self.__idx = 0
+      return
 
-  def asArray(self):
+    end = self.__idx + n
+    if end <= self.__max_len:
+      self.__data[self.__idx:end] = datapoints
+    else:
+      split = self.__max_len - self.__idx
+      self.__data[self.__idx:] = datapoints[:split]
+      self.__data[:n - split]  = datapoints[split:]
+    self.__idx = end % self.__max_len
 
-    # Array is not yet full 
-    if self.__total < self.__max_idx:
-      return self.__data[:self.__idx]
+  def __len__(self):
+    return min(self.__total, self.__max_len)
 
+  def halves(self):
+    """
+    Return (oldest, newest) views whose concatenation is the data in
+    the order it was added.
+    """
+    # Array is not yet full
+    if self.__total < self.__max_len:
+      return (self.__data[:self.__idx], self.__data[:0])
     # Array has cycled
-    else:
-      start = -(self.__max_len - self.__idx)
-      r = range(start, self.__idx)
-      return np.take(self.__data, r, mode="wrap")
-      
+    return (self.__data[self.__idx:], self.__data[:self.__idx])
+
+  def asArray(self):
+    (oldest, newest) = self.halves()
+    if len(newest) == 0:
+      return oldest
+    return np.concatenate((oldest, newest))
 
   def getData(self):
     return self.__data
@@ -207,7 +229,39 @@ class CircularBuffer(object):
     """
     Get last data point
     """
-    return self.__data[self.__tail]
+    if self.__total < self.__max_len:
+      return self.__data[0]
+    return self.__data[self.__idx]
+
+
+def minmax_decimate(x, y, bins):
+  """
+  Reduce the points (x, y) to the minimum and maximum of each of bins
+  equal runs of points, in their original order, so that a line plot
+  of bins pixels looks the same as a plot of all the points.
+  """
+  n = len(y)
+  if bins <= 0 or n <= 2 * bins:
+    return (x, y)
+
+  size = -(-n // bins)
+  full = n - n % size
+  rows = y[:full].reshape(-1, size)
+  base = np.arange(0, full, size)
+  imin = base + rows.argmin(axis=1)
+  imax = base + rows.argmax(axis=1)
+
+  idx = np.empty(2 * len(base), dtype=np.intp)
+  idx[0::2] = np.minimum(imin, imax)
+  idx[1::2] = np.maximum(imin, imax)
+
+  # Partial last run
+  if full < n:
+    rest = y[full:]
+    tail = sorted((full + rest.argmin(), full + rest.argmax()))
+    idx = np.concatenate((idx, tail))
+
+  return (x[idx], y[idx])
 
 
 
@@ -224,11 +278,24 @@ def test_CircularBuffer():
   correct = np.array(range(offset, max_len + offset)).astype(float)
 
   assert np.array_equal(correct,r.asArray())
-  assert mostRecent == r.getMostRecent()
-  assert oldest    == r.getOldest()
-
-
-
-
-
+  assert mostRecent == r.getHead()
+  assert oldest    == r.getTail()
 
+  # Bulk appends wrap the same way
+  r = CircularBuffer(max_len)
+  r.extend(range(60))
+  r.extend(range(60, max_len + offset))
+  assert np.array_equal(correct,r.asArray())
+  (first, second) = r.halves()
+  assert len(first) + len(second) == max_len
+  r.extend(range(1000))
+  assert np.array_equal(np.arange(900, 1000),r.asArray())
+
+
+def test_minmax_decimate():
+  y = np.sin(np.linspace(0, 20, 10000))
+  x = np.arange(len(y))
+  (dx, dy) = minmax_decimate(x, y, 100)
+  assert len(dx) <= 202
+  assert np.all(np.diff(dx) >= 0)
+  assert dy.max() == y.max() and dy.min() == y.min()
@@ -15,7 +15,6 @@
 
 from utils.gse_api import GseApi
 from utils.test_history import TestHistory
-import signal
 import time
 import utils.history as history
 
@@ -742,10 +741,10 @@ class TestApi(GseApi, TestHistory):
     Continues to update the history until a function f does not assert or a timeout occures
     """
 
-    def add_item_to_hist():
-      # Add a single item from the queue to the history
-      # Return true if item is added
-      tlm, evr = super(TestApi, self)._pop_queue()
+    def add_item_to_hist(timeout=0):
+      # Add a single item from the queue to the history, waiting up to
+      # timeout seconds for one. Return true if item is added
+      tlm, evr = super(TestApi, self)._pop_queue(timeout)
       if tlm is None and evr is None:
         return False
       tlm_list = []
@@ -780,24 +779,17 @@ class TestApi(GseApi, TestHistory):
         return False
 
     if timeout:
-      signal.signal(signal.SIGALRM, self._timeout_sig_handler)
-      signal.alarm(timeout)
-
-    try:
-      while assert_failing():
-        # Sleep a bit if there is nothing in the queue, and then try again:
-        if timeout:
-          time.sleep(0.1)
-        else:
-          # just check assertion once if a timeout is not set
-          fail('Unable to meet assertion.')
-    except self.TimeoutException:
-      fail('Timeout reached, unable to meet assertion.')
-    except:
-      raise
-
-    if timeout:
-      signal.alarm(0)
+      deadline = time.time() + timeout
+
+    while assert_failing():
+      if not timeout:
+        # just check assertion once if a timeout is not set
+        fail('Unable to meet assertion.')
+      # Block until the next item arrives, then try again:
+      remaining = deadline - time.time()
+      if remaining <= 0:
+        fail('Timeout reached, unable to meet assertion.')
+      add_item_to_hist(remaining)
 
   def __add_to_hist(self, tlms=[], evrs=[]):
     # Translate ids to names:
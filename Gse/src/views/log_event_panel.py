@@ -224,25 +224,18 @@ class LogEventPanel(object):
         """
         Insert log message at top of table widget.
         """
+        self.insertLogMsgs([msg_obj])
+
+    def insertLogMsgs(self, msg_objs):
+        """
+        Insert log messages at top of table widget, then filter, scroll
+        and size the columns once for all of them.
+        """
         # Temporarily reset filter so we can add entry
         self.__table.showAll()
 
-        row = "%s" % self.__table_row
-        # Skip row creation so first real entry can overwrite placeholder
-        if not self.__placeholder_entry and row == '0':
-            pass
-        else:
-            self.__table.addRow(row)
-
-        for idx, evr_data in enumerate(msg_obj):
-            # print "idx = %s, evr_data = %s" % (idx, evr_data)
-            # Handle Severity
-            if isinstance(evr_data, Severity):
-                self.__table.model.data[row][self.__column_list[idx]] = evr_data.name
-                color = self.__severity_color[evr_data.name.lower()]
-                self.__table.model.setColorAt(self.__table_row, idx, color, key='bg')
-            else:
-                self.__table.model.data[row][self.__column_list[idx]] = evr_data
+        for msg_obj in msg_objs:
+            self.__add_row(msg_obj)
 
         # Reapply filter
         self.__filter_apply()
@@ -262,6 +255,27 @@ class LogEventPanel(object):
 
         self.adjustColumnWidths()
 
+    def __add_row(self, msg_obj):
+        """
+        Add one log message row to the table model.
+        """
+        row = "%s" % self.__table_row
+        # Skip row creation so first real entry can overwrite placeholder
+        if not self.__placeholder_entry and row == '0':
+            pass
+        else:
+            self.__table.addRow(row)
+
+        for idx, evr_data in enumerate(msg_obj):
+            # print "idx = %s, evr_data = %s" % (idx, evr_data)
+            # Handle Severity
+            if isinstance(evr_data, Severity):
+                self.__table.model.data[row][self.__column_list[idx]] = evr_data.name
+                color = self.__severity_color[evr_data.name.lower()]
+                self.__table.model.setColorAt(self.__table_row, idx, color, key='bg')
+            else:
+                self.__table.model.data[row][self.__column_list[idx]] = evr_data
+
         if self.__placeholder_entry:
             self.__placeholder_entry = False
         else:
@@ -361,10 +375,11 @@ class LogEventPanel(object):
         Update the panel list widget with new log events
         @param e: this is set by observer to the LogEventListener.
         """
-        msg_tup = e.getCurrentEventLogMsg()
-        #print msg_tup
-        if msg_tup:
-            self.insertLogMsg(msg_tup[1])
+        # Events that could not be decoded are strings, not (string, tuple)
+        msg_objs = [msg_tup[1] for msg_tup in e.getCurrentEventLogMsgs() if isinstance(msg_tup, tuple)]
+        #print msg_objs
+        if msg_objs:
+            self.insertLogMsgs(msg_objs)
             # LJR added fix 4 May 2017
             self.__table.redrawTable()
         #print "update test", e, self._top
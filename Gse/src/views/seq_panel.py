@@ -547,10 +547,15 @@ class SeqBinaryWriter(object):
         """
         Write out each record as it appears in the listbox widget.
         """
-        num_records = len(seq_cmds_list)
-        sequence = ""
-        for cmd in seq_cmds_list:
-            sequence += self.__binaryCmdRecord(cmd)
+        self.writeRecords([self.__binaryCmdRecord(cmd) for cmd in seq_cmds_list])
+
+    def writeRecords(self, records):
+        """
+        Write out a sequence from a list of binary command records, as
+        made by __binaryCmdRecord.
+        """
+        num_records = len(records)
+        sequence = "".join(records)
         size = len(sequence)
         print("Sequence is %d bytes"%size)
 
@@ -923,6 +923,8 @@ class StripFrame(AxesFrame):
 
         #
         self.__channel_lines = {}
+        # Points received since the last refresh: ch_name -> ([timestamp], [value])
+        self.__pending = {}
         self.__spectrum_lines = []
         self.__limit_lines = []
 
@@ -1246,39 +1248,17 @@ class StripFrame(AxesFrame):
     def update_telem(self, tlm):
         """
         Update data specific to a channel.
-        Stream data into circular buffers.
+        Queue data for the circular buffers.
 
         @param ch_name: Channel Name
-        @param datetime_object: python datetime object created from telem timestamp
+        @param timestamp: telem time in seconds since the epoch
         @param ch_value: channel data
         """
 
-        # Unpack
-        ch_name = tlm['ch_name']
-        ch_value = tlm['ch_value']
-        datetime_object = tlm['datetime_object']
-
-        # Get circular buffers of channel
-        line_data, t_data, y_data = self.__channel_lines[ch_name]
-
-        t_data.add(md.date2num(datetime_object))
-        y_data.add(ch_value)
-
-
-        if self.__do_spectrum:
-            # Limit update time
-            if time.time() - self.__last_spectrum_update < 2:
-                pass
-            else:
-                y = y_data.asArray()
-                self.__last_spectrum_update = time.time()
-                spec, freq = matplotlib.mlab.magnitude_spectrum(y, Fs=25, window=None, pad_to=None, sides=None)
-
-                # Get the line set in __toggle_spectrum.
-                for spec_line in self.__spectrum_lines:
-                    spec_line.set_xdata(freq)
-                    spec_line.set_ydata(spec)
-
+        # Queue the point; refresh_plot() adds them to the buffers in bulk
+        (times, values) = self.__pending.setdefault(tlm['ch_name'], ([], []))
+        times.append(tlm['timestamp'])
+        values.append(tlm['ch_value'])
 
         # Do startup 
         if self.__inital_run:
@@ -1289,11 +1269,67 @@ class StripFrame(AxesFrame):
 
 
 
+    def __flush_pending(self):
+        """
+        Stream the points received since the last refresh into the
+        circular buffers, converting their timestamps to plot dates at once.
+        """
+        pending = self.__pending
+        self.__pending = {}
+        for ch_name, (times, values) in pending.items():
+            if ch_name not in self.__channel_lines:
+                continue
+            line_data, t_data, y_data = self.__channel_lines[ch_name]
+
+            times = np.array(times)
+            # Plot date of the epoch in local time, good for the whole batch
+            t0 = times[-1]
+            base = md.date2num(datetime.datetime.fromtimestamp(t0)) - t0 / 86400.0
+            t_data.extend(base + times / 86400.0)
+            try:
+                y_data.extend(values)
+            except (TypeError, ValueError):
+                # Values that failed to decode ("ERR") are not plotted
+                y_data.extend([self.__to_float(v) for v in values])
+
+        if self.__do_spectrum and pending and time.time() - self.__last_spectrum_update >= 2:
+            # Limit update time
+            line_data, t_data, y_data = self.__channel_lines.itervalues().next()
+            y = y_data.asArray()
+            self.__last_spectrum_update = time.time()
+            spec, freq = matplotlib.mlab.magnitude_spectrum(y, Fs=25, window=None, pad_to=None, sides=None)
+
+            # Get the line set in __toggle_spectrum.
+            for spec_line in self.__spectrum_lines:
+                spec_line.set_xdata(freq)
+                spec_line.set_ydata(spec)
+
+    def __to_float(self, value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return np.nan
+
+    def __plot_bins(self, t):
+        """
+        Number of min/max bins to decimate the data to: one per pixel of
+        the axes width, scaled up when only part of the data is in view.
+        """
+        width = int(self._axes.get_window_extent().width)
+        (x_min, x_max) = self._axes.get_xlim()
+        if len(t) > 1 and x_max > x_min:
+            span = t[-1] - t[0]
+            width = int(width * max(1.0, span / (x_max - x_min)))
+        return width
+
     def refresh_plot(self):
         """
         Refresh method registered to StripchartPanel.
         """       
 
+        # Data is still collected when the plot is stopped
+        self.__flush_pending()
+
         # Do not update the plot if stop button is pressed.
         if self.__stop:
             return
@@ -1301,8 +1337,8 @@ class StripFrame(AxesFrame):
         # Do not set data and scaling if ploting spectrum
         if not self.__do_spectrum:
             for line_data, t_data, y_data in self.__channel_lines.values():
-                line_data.set_xdata(t_data.asArray())
-                line_data.set_ydata(y_data.asArray())
+                t = t_data.asArray()
+                line_data.set_data(*gse_misc.minmax_decimate(t, y_data.asArray(), self.__plot_bins(t)))
         
         try:
             self.__handle_scaling()
@@ -249,9 +249,16 @@ class TelemetryPanel(object):
 
     def update(self, e):
         """
-        Update Channel Telemetry here.
+        Update Channel Telemetry here with the latest item of every channel
+        the listener received since its last update.
+        """
+        for msg in e.getCurrentChannelTelemetryItems():
+            self.__update_item(msg)
+
+    def __update_item(self, msg):
+        """
+        Update the row of one channel telemetry item.
         """
-        msg = e.getCurrentChannelTelemetryItem()
         if msg != None:
             (name, id, ch, (tb, tc, ts, tus), val, format_string, low_red, low_orange, low_yellow, high_yellow, high_orange, high_red) = msg
             if name in self.__channels_active_list:
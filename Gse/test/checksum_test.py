@@ -0,0 +1,82 @@
+#!/bin/env python
+#===============================================================================
+# NAME: checksum_test.py
+#
+# DESCRIPTION: Nose tests checking utils.checksum against a byte at a time
+#              transcription of the CFDP Checksum::update algorithm.
+#
+# Copyright 2015, California Institute of Technology.
+# ALL RIGHTS RESERVED. U.S. Government Sponsorship acknowledged.
+#===============================================================================
+#
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from utils import checksum
+from utils.checksum import Checksum
+
+
+def reference(data, offset, length, value=0):
+    """
+    CFDP Checksum::update, one byte at a time.
+    """
+    for i in range(length):
+        value = (value + (ord(data[i]) << (8 * (3 - (offset + i) % 4)))) & 0xffffffff
+    return value
+
+def random_bytes(rng, n):
+    return "".join([chr(rng.randint(0, 255)) for i in range(n)])
+
+
+def random_offsets_test():
+    rng = random.Random(1)
+    for trial in range(500):
+        n = rng.randint(0, 64)
+        data = random_bytes(rng, n)
+        offset = rng.randint(0, 1000)
+        length = rng.randint(0, n)
+        c = Checksum()
+        c.update(data, offset, length)
+        assert c.xSum == reference(data, offset, length), (offset, length)
+
+def buffer_types_test():
+    rng = random.Random(2)
+    data = random_bytes(rng, 103)
+    expected = reference(data, 3, 101)
+    for buf in (data, bytearray(data), memoryview(data)):
+        c = Checksum()
+        c.update(buf, 3, 101)
+        assert c.xSum == expected
+
+def large_buffer_test():
+    # Crosses several CHUNK_WORDS boundaries with unaligned ends
+    rng = random.Random(3)
+    n = 3 * checksum.CHUNK.size + 7
+    data = random_bytes(rng, n)
+    for offset in range(4):
+        c = Checksum()
+        c.update(data, offset, n)
+        assert c.xSum == reference(data, offset, n)
+
+def streaming_test():
+    # Feeding a file in random pieces, in any order, equals one update
+    rng = random.Random(4)
+    data = random_bytes(rng, 5000)
+    expected = reference(data, 0, len(data))
+    for trial in range(20):
+        cuts = sorted(rng.sample(range(1, len(data)), rng.randint(1, 40)))
+        pieces = zip([0] + cuts, cuts + [len(data)])
+        rng.shuffle(pieces)
+        c = Checksum()
+        for (start, end) in pieces:
+            c.update(data[start:end], start, end - start)
+        assert c.xSum == expected
+        assert c == expected
+
+def initial_value_test():
+    c = Checksum(0xfffffff0)
+    c.update("\x00\x00\x00\x20", 0, 4)
+    assert c.xSum == 0x10
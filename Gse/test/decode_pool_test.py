@@ -0,0 +1,86 @@
+#!/bin/env python
+#===============================================================================
+# NAME: decode_pool_test.py
+#
+# DESCRIPTION: Nose tests of the stateless packet decoders and of decoding
+#              a packet stream in parallel with DecodePool.
+#
+# Copyright 2015, California Institute of Technology.
+# ALL RIGHTS RESERVED. U.S. Government Sponsorship acknowledged.
+#===============================================================================
+#
+import os
+import sys
+import struct
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from controllers import packet_decoder
+from controllers.decode_pool import DecodePool
+from models.common.channel_telemetry import Channel
+from models.common.event import Event, Severity
+from models.serialize.u32_type import U32Type
+from models.serialize.f64_type import F64Type
+from models.serialize.string_type import StringType
+
+
+def make_dicts():
+    chans = dict()
+    events = dict()
+    for i in range(8):
+        chans[i] = Channel("CH_%d" % i, i, "Comp", "desc", U32Type(), None, None, None, None, None, None, None)
+        events[i] = Event("EV_%d" % i, i, Severity.ACTIVITY_HI, "%d %s", "desc",
+                          [("a", "", U32Type()), ("s", "", StringType())])
+    return chans, events
+
+def channel_packet(i, value):
+    body = struct.pack(">IHBII", i, 2, 0, 1000 + value, 500) + struct.pack(">I", value)
+    return struct.pack(">II", len(body) + 4, 1) + body
+
+def event_packet(i, value):
+    s = "event %d" % value
+    body = struct.pack(">IHBII", i, 2, 0, 1000 + value, 500) + struct.pack(">IH", value, len(s)) + s
+    return struct.pack(">II", len(body) + 4, 2) + body
+
+def make_packets(n):
+    return [channel_packet(k % 8, k) if k % 3 else event_packet(k % 8, k) for k in range(n)]
+
+
+def records_test():
+    chans, events = make_dicts()
+    record = packet_decoder.ChannelDecoder(chans).decode_record(channel_packet(3, 42))
+    assert record == packet_decoder.ChannelRecord(3, "CH_3", (2, 0, 1042, 500), 42)
+    record = packet_decoder.EventDecoder(events).decode_record(event_packet(5, 7))
+    assert record == packet_decoder.EventRecord(5, "EV_5", Severity.ACTIVITY_HI, (2, 0, 1007, 500), (7, "event 7"), "7 event 7")
+    # Decoding leaves the shared dictionary type objects untouched
+    assert events[5].getArgs()[1][2].val is None
+    assert chans[3].getType().val is None
+
+def unknown_id_test():
+    chans, events = make_dicts()
+    record = packet_decoder.ChannelDecoder(chans).decode_record(channel_packet(99, 1))
+    assert record.name is None and record.value is None
+    record = packet_decoder.EventDecoder(events).decode_record(event_packet(99, 1))
+    assert record.name is None and record.args is None
+
+def pool_order_test():
+    chans, events = make_dicts()
+    packets = make_packets(1000) + [struct.pack(">III", 8, 3, 0)]
+    ch_decoder = packet_decoder.ChannelDecoder(chans)
+    ev_decoder = packet_decoder.EventDecoder(events)
+    expected = [ch_decoder.decode_record(msg) if k % 3 else ev_decoder.decode_record(msg) for k, msg in enumerate(packets[:-1])]
+    expected.append(None)
+    for processes in (True, False):
+        pool = DecodePool(chans, events, workers=3, processes=processes, chunk_size=128)
+        assert pool.decode(packets) == expected
+        pool.close()
+
+def string_size_test():
+    events = {1: Event("EV_1", 1, Severity.ACTIVITY_HI, "%d %s", "desc",
+                       [("a", "", U32Type()), ("s", "", StringType(max_string_len=8))])}
+    decoder = packet_decoder.EventDecoder(events)
+    (i, t, args) = decoder.decode(event_packet(1, 7))
+    assert args == [0, 7, "event 7"]
+    # Longer than the type's maximum, like a corrupted size
+    (i, t, args) = decoder.decode(event_packet(1, 1234))
+    assert args == [0, 1234, "ERR"]
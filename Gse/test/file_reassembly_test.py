@@ -0,0 +1,129 @@
+#!/bin/env python
+#===============================================================================
+# NAME: file_reassembly_test.py
+#
+# DESCRIPTION: Nose tests of the downlink gap map and of reassembling files
+#              from reordered, duplicated and interrupted DATA packets.
+#
+# Copyright 2015, California Institute of Technology.
+# ALL RIGHTS RESERVED. U.S. Government Sponsorship acknowledged.
+#===============================================================================
+#
+import os
+import sys
+import random
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from controllers.file_reassembly import GapMap, Reassembler, PART_SUFFIX
+from utils.checksum import Checksum
+
+
+def chunks(data, size):
+    return [(i, data[i:i + size]) for i in range(0, len(data), size)]
+
+def file_checksum(data):
+    checksum = Checksum()
+    checksum.update(data, 0, len(data))
+    return checksum.xSum
+
+
+def gap_map_test():
+    gaps = GapMap()
+    assert gaps.add(10, 20) == [(10, 20)]
+    assert gaps.add(30, 40) == [(30, 40)]
+    assert gaps.add(15, 35) == [(20, 30)]
+    assert gaps.ranges() == [(10, 40)]
+    assert gaps.add(12, 18) == []
+    assert gaps.add(40, 45) == [(40, 45)]
+    assert gaps.ranges() == [(10, 45)]
+    assert gaps.missing(50) == [(0, 10), (45, 50)]
+    assert gaps.received() == 35
+    assert gaps.add(0, 10) == [(0, 10)]
+    assert gaps.add(45, 50) == [(45, 50)]
+    assert gaps.complete(50)
+
+
+def gap_map_random_test():
+    rng = random.Random(2)
+    size = 1000
+    gaps = GapMap()
+    have = [False] * size
+    for trial in range(300):
+        start = rng.randint(0, size - 1)
+        end = rng.randint(start, size)
+        new = gaps.add(start, end)
+        assert sum([e - s for (s, e) in new]) == have[start:end].count(False)
+        for i in range(start, end):
+            have[i] = True
+        missing = [i for (s, e) in gaps.missing(size) for i in range(s, e)]
+        assert missing == [i for i in range(size) if not have[i]]
+
+
+def reordered_test():
+    rng = random.Random(3)
+    data = "".join([chr(rng.randint(0, 255)) for i in range(5000)])
+    packets = chunks(data, 64)
+    packets += packets[::7]
+    rng.shuffle(packets)
+
+    tmp = tempfile.mkdtemp()
+    try:
+        dest = os.path.join(tmp, "file.bin")
+        reassembler = Reassembler()
+        reassembler.start(dest, len(data))
+        for (offset, chunk) in packets:
+            reassembler.data(offset, chunk)
+        transfer = reassembler.end()
+        assert transfer.complete()
+        assert transfer.checksum.xSum == file_checksum(data)
+        assert open(dest, "rb").read() == data
+        assert not os.path.exists(dest + PART_SUFFIX)
+    finally:
+        shutil.rmtree(tmp)
+
+
+def interleaved_resume_test():
+    rng = random.Random(4)
+    data_a = "".join([chr(rng.randint(0, 255)) for i in range(3000)])
+    data_b = "".join([chr(rng.randint(0, 255)) for i in range(2000)])
+    packets_a = chunks(data_a, 100)
+    packets_b = chunks(data_b, 100)
+
+    tmp = tempfile.mkdtemp()
+    try:
+        dest_a = os.path.join(tmp, "a.bin")
+        dest_b = os.path.join(tmp, "b.bin")
+
+        # A is interrupted by B, then A ends with packets still missing
+        reassembler = Reassembler()
+        reassembler.start(dest_a, len(data_a))
+        for (offset, chunk) in packets_a[:10]:
+            reassembler.data(offset, chunk)
+        reassembler.start(dest_b, len(data_b))
+        for (offset, chunk) in packets_b:
+            reassembler.data(offset, chunk)
+        assert reassembler.end().complete()
+        reassembler.start(dest_a, len(data_a))
+        for (offset, chunk) in packets_a[10:20]:
+            reassembler.data(offset, chunk)
+        transfer = reassembler.end()
+        assert transfer.missing() == [(2000, 3000)]
+        assert os.path.exists(dest_a + PART_SUFFIX)
+
+        # A new session resumes A from its gap map
+        reassembler = Reassembler()
+        transfer = reassembler.start(dest_a, len(data_a))
+        assert transfer.resumed
+        for (offset, chunk) in packets_a[15:]:
+            reassembler.data(offset, chunk)
+        transfer = reassembler.end()
+        assert transfer.complete()
+        assert transfer.checksum.xSum == file_checksum(data_a)
+        assert open(dest_a, "rb").read() == data_a
+        assert open(dest_b, "rb").read() == data_b
+        assert not os.path.exists(dest_a + PART_SUFFIX)
+    finally:
+        shutil.rmtree(tmp)
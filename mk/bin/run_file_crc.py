@@ -2,6 +2,12 @@
 
 import sys
 import os
+import zlib
+import cPickle
+from optparse import OptionParser
+
+# Files are read in chunks of this many bytes
+CHUNK_SIZE = 1 << 20
 
 math_crc32_table = [
     0x00000000, 0x77073096, 0xee0e612c, 0x990951ba,
@@ -71,6 +77,10 @@ math_crc32_table = [
 ]
 
 def crc32(data, nbytes, last, offset):
+    """
+    Table driven CRC of the first nbytes of data, continuing from last
+    unless offset is 0. Kept as the reference for crc32_update().
+    """
     
     if offset == 0:
         checksum = 0xFFFFFFFF
@@ -82,25 +92,100 @@ def crc32(data, nbytes, last, offset):
 
     return checksum
 
-filename = "%s"%sys.argv[1]
-crcfilename = "%s"%sys.argv[2]
+def crc32_update(data, checksum = 0xFFFFFFFF):
+    """
+    Continue checksum over data; the same result as crc32(), computed by
+    zlib. zlib inverts the checksum before and after, the table code does
+    not, so the inversions are undone here.
+    """
+    return (zlib.crc32(data, checksum ^ 0xFFFFFFFF) ^ 0xFFFFFFFF) & 0xFFFFFFFF
 
-crcfile = open(crcfilename,"w")
+def file_crc(filename, chunk_size = CHUNK_SIZE):
+    """
+    Return the CRC of a file, read chunk_size bytes at a time.
+    """
+    checksum = 0xFFFFFFFF
+    input_file = open(filename,"rb")
+    try:
+        while True:
+            data = input_file.read(chunk_size)
+            if not data:
+                break
+            checksum = crc32_update(data, checksum)
+    finally:
+        input_file.close()
+    return checksum
 
-input_file = open(filename,"r")
+class CrcCache:
+    """
+    CRCs of files keyed by (path, size, mtime), saved in a file between runs.
+    """
+    def __init__(self, cache_file = None):
+        self.cache_file = cache_file
+        self.crcs = {}
+        self.changed = False
+        if cache_file != None and os.path.isfile(cache_file):
+            try:
+                self.crcs = cPickle.load(open(cache_file,"rb"))
+            except Exception:
+                self.crcs = {}
 
-data = input_file.read()
-crc = 0
-offset = 0
-crc = crc32(data,len(data),crc,offset)
-crcfile.write("0x%08X\n"%crc)
- 
-input_file.close()
-crcfile.close()
+    def crc(self, filename):
+        st = os.stat(filename)
+        key = (os.path.abspath(filename), st.st_size, st.st_mtime)
+        if not self.crcs.has_key(key):
+            self.crcs[key] = file_crc(filename)
+            self.changed = True
+        return self.crcs[key]
 
+    def save(self):
+        """
+        Write the cache, dropping the entries of files that changed or no longer exist.
+        """
+        if self.cache_file == None or not self.changed:
+            return
+        crcs = {}
+        for (path, size, mtime), crc in self.crcs.items():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if (st.st_size, st.st_mtime) == (size, mtime):
+                crcs[(path, size, mtime)] = crc
+        tmp_file = "%s.%d" % (self.cache_file, os.getpid())
+        cPickle.dump(crcs, open(tmp_file,"wb"), cPickle.HIGHEST_PROTOCOL)
+        os.rename(tmp_file, self.cache_file)
+        self.changed = False
 
-    
-print "%s crc is %d (0x%08X)" % (filename,crc,crc)
-    
+def write_crc(filename, crcfilename, crc):
+    crcfile = open(crcfilename,"w")
+    crcfile.write("0x%08X\n"%crc)
+    crcfile.close()
+    print "%s crc is %d (0x%08X)" % (filename,crc,crc)
+
+def main():
+    parser = OptionParser(usage="%prog input_file crc_file\n"
+                                "       %prog -b [options] input_file...")
+    parser.add_option("-b", "--batch", dest="batch", action="store_true", default=False,
+                      help="Compute the CRC of every input file into input_file<suffix>")
+    parser.add_option("-s", "--suffix", dest="suffix", action="store", type="string", default=".crc",
+                      help="Suffix of the batch CRC files [default: %default]")
+    parser.add_option("-c", "--cache", dest="cache_file", action="store", type="string", default=None,
+                      help="File caching the CRCs by path, size and modification time")
+    (opts, args) = parser.parse_args()
 
+    cache = CrcCache(opts.cache_file)
+    if opts.batch:
+        if len(args) < 1:
+            parser.error("No input files")
+        for filename in args:
+            write_crc(filename, filename + opts.suffix, cache.crc(filename))
+    else:
+        if len(args) != 2:
+            parser.error("An input file and a CRC file are required")
+        write_crc(args[0], args[1], cache.crc(args[0]))
+    cache.save()
+    return 0
 
+if __name__ == "__main__":
+    sys.exit(main())
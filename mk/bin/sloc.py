@@ -1,39 +1,55 @@
 import sys
-import commands
 import os
 import os.path
+import re
+import hashlib
+import cPickle
+import multiprocessing
+from optparse import OptionParser
 
 # Make sure that BUILD_ROOT environment variable is set
 
-file_stats = {}
+# Counts by (counter, file content hash), see load_cache()
+sloc_cache = {}
+sloc_cache_new = {}
 
-def c_sloc_lines(file):
-	
-	LINE_COUNTER = os.environ["LINE_COUNT"]
-	cmdText = "%s %s 2>&1" %(LINE_COUNTER,file)
-	numRealLines = 0;
-	sloc = 0
+# C/C++ comments, string and character literals. An unterminated literal ends
+# at the end of the line, an unterminated block comment at the end of the file.
+c_token = re.compile(r'//[^\n]*|/\*.*?(?:\*/|\Z)|"(?:\\.|[^"\\\n])*"?|\'(?:\\.|[^\'\\\n])*\'?', re.S)
+
+def c_mask_token(match):
+	token = match.group(0)
+	if token[0] == "/":
+		# comment: keep the line breaks, mark every line of it
+		return "\n".join(["\x01"] * (token.count("\n") + 1))
+	# literal: source text without semicolons, keeping the line breaks of
+	# a literal continued with backslashes
+	return "''" + "\n" * token.count("\n")
+
+def c_sloc_lines(text):
+	"""
+	Count the lines of C/C++ source text.
+	Returns (lines, non comment source lines, comment lines, semicolons).
+	"""
+	masked = c_token.sub(c_mask_token, text)
+	lines = masked.split("\n")
+	if lines[-1] == "":
+		lines.pop()
 	ncsl = 0
 	comments = 0
-	semis = 0
-	
-	try:
-		realLineData = os.popen(cmdText).readlines() 
-		sloc = int(realLineData[1].split()[0])
-		ncsl = int(realLineData[1].split()[1])
-		comments = int(realLineData[1].split()[2])
-		semis = int(realLineData[1].split()[3])
-	except:
-		sys.stderr.write("command \"%s\" exception processing file %s\n" % (cmd,file))
-		sys.exit(-1)
-		
-	return (sloc,ncsl,comments,semis)
+	for line in lines:
+		if "\x01" in line:
+			comments += 1
+			line = line.replace("\x01","")
+		if line.strip() != "":
+			ncsl += 1
+	return (len(lines),ncsl,comments,masked.count(";"))
 
 def count_non_empty_lines(file_lines,comment):
 	non_empty_count = 0
 	comments = 0
 	raw_count = 0
-	
+
 	for line in file_lines:
 		if line.count(comment):
 			comments += 1
@@ -41,112 +57,178 @@ def count_non_empty_lines(file_lines,comment):
 		if line != "":
 			non_empty_count += 1
 		raw_count += 1
-			
+
 	return (raw_count,non_empty_count,comments,0)
-	
+
+def count_text(counter, text):
+	if counter == "c":
+		return c_sloc_lines(text)
+	elif counter == "xml":
+		return count_non_empty_lines(text.splitlines(True),"<?")
+	else:
+		return count_non_empty_lines(text.splitlines(True),"#")
+
+counters = {".c" : "c", ".cc" : "c", ".cpp" : "c", ".h" : "c", ".hpp" : "c",
+	".xml" : "xml", ".hsm" : "hash", ".txt" : "hash"}
+
 # entries are module, file, stats
-	
-def get_stats(file):
 
+def get_stats(file):
+	"""
+	Count the lines of a file. Returns (file relative to BUILD_ROOT, cache key, stats),
+	with stats (0,0,0,0) for a missing file and None for an unknown file type.
+	"""
 	file_short = file.replace(os.environ["BUILD_ROOT"]+"/","")
 
 	if not os.path.isfile(file):
 		sys.stderr.write("File %s not found!\n" % file_short)
-		file_stats[file_short] = (0,0,0,0)
-		return
-	
-	file_lines = open(file,"r").readlines()
+		return (file_short,None,(0,0,0,0))
 
 	ext = os.path.splitext(file)[1]
-	
-	if ext == ".c" or ext == ".cc" or ext == ".cpp" or ext == ".h" or ext = ".hpp":
-		file_stats[file_short] = c_sloc_lines(file)
-	elif ext == ".xml":
-		file_stats[file_short] = count_non_empty_lines(file_lines,"<?")
-	elif ext == ".hsm":
-		file_stats[file_short] = count_non_empty_lines(file_lines,"#")
-	elif ext == ".txt":
-		file_stats[file_short] = count_non_empty_lines(file_lines,"#")
-	else:
+	if not counters.has_key(ext):
 		sys.stderr.write("Unrecognized extension %s on %s\n"%(ext,file_short))
+		return (file_short,None,None)
+
+	text = open(file,"r").read()
+	key = (counters[ext],hashlib.sha1(text).hexdigest())
+	if sloc_cache.has_key(key):
+		return (file_short,key,sloc_cache[key])
+	return (file_short,key,count_text(counters[ext],text))
+
+def get_all_stats(files, jobs):
+	"""
+	Count the lines of files, in a pool of jobs processes if there are several files.
+	Returns a list of (file relative to BUILD_ROOT, stats) in the order of files.
+	"""
+	if jobs > 1 and len(files) > 1:
+		pool = multiprocessing.Pool(min(jobs,len(files)))
+		results = pool.map(get_stats, files)
+		pool.close()
+		pool.join()
+	else:
+		results = map(get_stats, files)
+	file_stats = []
+	for (file_short,key,stats) in results:
+		if key != None and not sloc_cache.has_key(key):
+			sloc_cache[key] = sloc_cache_new[key] = stats
+		if stats == None:
+			continue
+		if sloc_verbose:
+			sloc_log.write("File %s: sloc: %d ncsl: %d comments: %d semis: %d\n"%((file_short,) + stats))
+		file_stats.append((file_short,stats))
+	return file_stats
+
+def load_cache(cache_file):
+	try:
+		sloc_cache.update(cPickle.load(open(cache_file,"rb")))
+	except Exception:
+		pass
+
+def save_cache(cache_file):
+	"""
+	Add the new counts to the cache file. It is replaced with a rename, so
+	runs in parallel at worst lose each other's new counts.
+	"""
+	if not sloc_cache_new:
 		return
-	
-	if sloc_verbose:
-		sloc_log.write("File %s: sloc: %d ncsl: %d comments: %d semis: %d\n"%(file_stats[file_short][0],file_stats[file_short][1],file_stats[file_short][2],file_stats[file_short][3]))
- 
+	load_cache(cache_file)
+	tmp_file = "%s.%d" % (cache_file, os.getpid())
+	cPickle.dump(sloc_cache, open(tmp_file,"wb"), cPickle.HIGHEST_PROTOCOL)
+	os.rename(tmp_file, cache_file)
+
 if not os.environ.has_key("BUILD_ROOT"):
 	print("You must define BUILD_ROOT first.")
 	sys.exit(-1)
 
+parser = OptionParser(usage="%prog [options] (type | ncsl) file...\n"
+	"       %prog summarize file\n"
+	"       %prog collate file...")
+parser.add_option("-j", "--jobs", dest="jobs", action="store", type="int", default=multiprocessing.cpu_count(),
+	help="Number of processes counting lines [default: %default]")
+parser.add_option("-c", "--cache", dest="cache_file", action="store", type="string", default=None,
+	help="File caching the counts by file content")
+(opts, args) = parser.parse_args()
+if len(args) < 1:
+	parser.error("A type or command is required")
+
 if os.environ.has_key("SLOC_VERBOSE"):
 	sloc_verbose = True
-	sloc_log = open("sloc.log_%s"%sys.argv[1],'w')
+	sloc_log = open("sloc.log_%s"%args[0],'w')
 else:
 	sloc_verbose = False
-		
-if sys.argv[1] == "summarize":
-	file_lines = open(sys.argv[2],"r").readlines()
+
+if args[0] == "summarize":
+	file_lines = open(args[1],"r").readlines()
 	type_stats = {}
 	for line in file_lines:
 		(type,file_short,sloc_lines,ncsl_lines,comments,semis) = line.split(",")
 		if not type_stats.has_key(type):
 			type_stats[type] = [0,0,0,0]
-			
+
 		type_stats[type][0] += int(sloc_lines)
 		type_stats[type][1] += int(ncsl_lines)
 		type_stats[type][2] += int(comments)
 		type_stats[type][3] += int(semis)
-		
+
 	print("*sum*")
 	for type in type_stats.keys():
 		print ("%s,%d,%d,%d,%d"%(type,type_stats[type][0],type_stats[type][1],type_stats[type][2],type_stats[type][3]))
 	sys.exit(0)
-	
-if sys.argv[1] == "collate":
+
+if args[0] == "collate":
 	file_listing = open("file_sloc.txt","w")
 	sloc_sum_file = open("sloc_sum.txt","w")
 	type_stats = {}
-	for file in sys.argv[2:]:
+	for file in args[1:]:
 		curr_file_lines = open(file,"r").readlines()
 		sum_found = False
 		for line in curr_file_lines:
 			if line.count("*sum*"):
 				sum_found = True
 				continue
-			if sum_found: 
+			if sum_found:
 				(type,sloc_lines,ncsl_lines,comments,semis) = line.split(",")
 				if not type_stats.has_key(type):
 					type_stats[type] = [0,0,0,0]
-					
+
 				type_stats[type][0] += int(sloc_lines)
 				type_stats[type][1] += int(ncsl_lines)
 				type_stats[type][2] += int(comments)
 				type_stats[type][3] += int(semis)
 			else:
 				file_listing.write(",".join(line.split(",")[1:]))
-	
+
 	if not sum_found:
 		sys.stderr.write("File %s doesn't have *sum*!\n" % file_short)
 	else:
 		total_sloc_lines = total_ncsl_lines = total_comment_lines = total_semi_lines = 0
 		for type in type_stats.keys():
 			sloc_sum_file.write("Type: %s sloc: %d nscl: %d comments: %d semis %d\n"%(type,type_stats[type][0],type_stats[type][1],type_stats[type][2],type_stats[type][3]))
-			total_sloc_lines += type_stats[type][0]		
-			total_ncsl_lines += type_stats[type][1]		
+			total_sloc_lines += type_stats[type][0]
+			total_ncsl_lines += type_stats[type][1]
 			total_comment_lines += type_stats[type][2]
 			total_semi_lines += type_stats[type][3]
-			
-		sloc_sum_file.write("Totals: sloc: %d ncsl: %d comments: %d semis: %d\n"%(total_sloc_lines,total_ncsl_lines,total_comment_lines,total_semi_lines))		
+
+		sloc_sum_file.write("Totals: sloc: %d ncsl: %d comments: %d semis: %d\n"%(total_sloc_lines,total_ncsl_lines,total_comment_lines,total_semi_lines))
 
 	sys.exit(0)
 
-for file in sys.argv[2:]:
-	file_short = file.replace(os.environ["BUILD_ROOT"]+"/","")
-	file_stats[file] = []
-	if sloc_verbose:
-		sloc_log.write("Examining file %s\n"%file)
-	get_stats(file)
-	(sloc_lines,ncsl_lines,comments,semis) = file_stats[file_short]
-	print("%s,%s,%s,%s,%s,%s"%(sys.argv[1],file_short,sloc_lines,ncsl_lines,comments,semis))
+if opts.cache_file != None:
+	load_cache(opts.cache_file)
 
+file_stats = get_all_stats(args[1:], opts.jobs)
+
+if args[0] == "ncsl":
+	# per file and total lines in the format of the ncsl counter, read by process_ncsl_sloc.py
+	totals = [0,0,0,0]
+	for (file_short,stats) in file_stats:
+		print("%8d %8d %8d %8d %s"%(stats + (file_short,)))
+		for i in range(4):
+			totals[i] += stats[i]
+	print("%8d %8d %8d %8d total \t[ncsl:sloc:comments:semis]"%tuple(totals))
+else:
+	for (file_short,(sloc_lines,ncsl_lines,comments,semis)) in file_stats:
+		print("%s,%s,%s,%s,%s,%s"%(args[0],file_short,sloc_lines,ncsl_lines,comments,semis))
 
+if opts.cache_file != None:
+	save_cache(opts.cache_file)
@@ -19,7 +19,7 @@ PERL_BASE := /usr
 export PERL_BIN := $(PERL_BASE)/bin/perl
 export PERL_LIB := $(PERL_BASE)/lib
 
-SLOC_COUNTER := ${BUILD_ROOT}/mk/bin/ncsl -v -i
+SLOC_COUNTER := $(PYTHON_BIN) ${BUILD_ROOT}/mk/bin/sloc.py ncsl -c ${BUILD_ROOT}/mk/makefiles/sloc_cache.pkl
 PROCESS_SLOC := ${BUILD_ROOT}/mk/bin/process_ncsl_sloc.py
 FILE_HASH := $(PYTHON_BIN) ${BUILD_ROOT}/mk/bin/run_file_hash.py
 GEN_VERSION := $(PYTHON_BIN) $(BUILD_ROOT)/mk/bin/gen_git_version.py
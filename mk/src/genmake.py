@@ -1,10 +1,107 @@
 import sys
 import os
+import hashlib
+import cPickle
+import cStringIO
+import multiprocessing
+from optparse import OptionParser
 import parsers.mod_mk_parser
 import parsers.variable_list_parser
 
 # arguments:
 # 1 = name of file to generate
+# -j = number of processes parsing the modules
+# -f = ignore the manifest and regenerate all modules
+
+# The manifest records the mod.mk files of each module with their modification
+# times and content hashes, and the Makefile text generated from them. Only the
+# modules whose mod.mk files changed are parsed again.
+manifest_name = "genmake_manifest.pkl"
+# change when the format of the manifest changes
+manifest_version = 1
+
+generated_files = ["/ac_targets.mk","/bin_targets.mk","/vars.mk"]
+
+# sources of the generator, resolved before the change to BUILD_ROOT
+generator_sources = [os.path.abspath(os.path.splitext(parsers.mod_mk_parser.__file__)[0] + ".py"),
+		os.path.abspath(os.path.splitext(__file__)[0] + ".py")]
+
+def fileHash(file_name):
+	fd = open(file_name,'rb')
+	try:
+		return hashlib.sha1(fd.read()).hexdigest()
+	finally:
+		fd.close()
+
+def fileState(file_name, old_state):
+	"""
+	Return (mtime, size, hash) of a file, None if it is missing. The file is
+	only read if its modification time or size differ from old_state.
+	"""
+	try:
+		st = os.stat(file_name)
+	except OSError:
+		return None
+	if old_state != None and old_state[0:2] == (st.st_mtime, st.st_size):
+		return old_state
+	return (st.st_mtime, st.st_size, fileHash(file_name))
+
+def generatorHash():
+	"""
+	Hash of the inputs shared by all modules: the builds list and the
+	generator code. If it changes, every module is regenerated.
+	"""
+	gen_hash = hashlib.sha1(str(manifest_version))
+	for file_name in [os.environ["BUILD_ROOT"] + "/mk/configs/builds/builds.mk"] + generator_sources:
+		gen_hash.update(fileHash(file_name))
+	return gen_hash.hexdigest()
+
+def loadManifest(manifest_file, gen_hash):
+	try:
+		fd = open(manifest_file,'rb')
+		try:
+			manifest = cPickle.load(fd)
+		finally:
+			fd.close()
+	except Exception:
+		return None
+	if manifest.get("generator") != gen_hash:
+		return None
+	return manifest
+
+def saveManifest(manifest_file, manifest):
+	tmp_file = "%s.%d" % (manifest_file, os.getpid())
+	fd = open(tmp_file,'wb')
+	cPickle.dump(manifest, fd, cPickle.HIGHEST_PROTOCOL)
+	fd.close()
+	os.rename(tmp_file, manifest_file)
+
+def parseModule(module):
+	"""
+	Parse the mod.mk files of a module and generate its Makefile text.
+	Returns (error, mod.mk files, vars text, ac targets text, bin targets text).
+	"""
+	# for module name, remove slashes
+	module_name = module.replace("/","").replace("\\","")
+
+	if os.environ.has_key("PARSER_VERBOSE"):
+		print ("Processing module \"%s\" dir %s"%(module_name,module))
+
+	vars_fd = cStringIO.StringIO()
+	ac_targets_fd = cStringIO.StringIO()
+	bin_targets_fd = cStringIO.StringIO()
+	try:
+		parser = parsers.mod_mk_parser.ModMkParser(module_name,module,True)
+		parser.generateVariables(vars_fd)
+		parser.generateTargets(ac_targets_fd,bin_targets_fd)
+	except parsers.mod_mk_parser.CfgParseError, ex:
+		return (ex.getErr(),None,None,None,None)
+	return (None,parser.getModFiles(),vars_fd.getvalue(),ac_targets_fd.getvalue(),bin_targets_fd.getvalue())
+
+def writeFile(file_name, text):
+	fd = open(file_name,'w')
+	fd.write(text)
+	fd.close()
 
 #os.environ["PARSER_VERBOSE"] = "true"
 # Make sure that BUILD_ROOT environment variable is set
@@ -13,8 +110,17 @@ if not os.environ.has_key("BUILD_ROOT"):
 	print("You must define BUILD_ROOT first.")
 	sys.exit(-1)
 
-makefiledir = sys.argv[1]
-	
+opt_parser = OptionParser(usage="%prog [options] makefile_dir")
+opt_parser.add_option("-j", "--jobs", dest="jobs", action="store", type="int", default=multiprocessing.cpu_count(),
+		help="Number of processes parsing the modules [default: %default]")
+opt_parser.add_option("-f", "--force", dest="force", action="store_true", default=False,
+		help="Ignore the manifest and regenerate all modules")
+(opts, args) = opt_parser.parse_args()
+if len(args) != 1:
+	opt_parser.error("The Makefile directory is required")
+
+makefiledir = args[0]
+
 print "Generating Makefiles in %s"%	makefiledir
 
 
@@ -24,9 +130,9 @@ except parsers.variable_list_parser.VariableParseError, ex:
 	# delete the partial or old Makefile
 	print("**Error: " + ex.getErr() + "**")
 	sys.exit(-1)
-	
+
 deployment_list = mod_file_parser.getValList("DEPLOYMENTS")
-	
+
 all_module_list = []
 
 for deployment in deployment_list:
@@ -38,83 +144,101 @@ for deployment in deployment_list:
 	# write deployment targets
 
 other_module_list = mod_file_parser.getValList("OTHER_MODULES")
-		
-# instantiate parsers for modules
-
-parser_list = []
 
 # change to root of modules
 os.chdir(os.environ["BUILD_ROOT"])
 
 all_module_list += other_module_list
 
+# find the modules whose mod.mk files changed since the last run
+
+manifest_file = makefiledir + "/" + manifest_name
+gen_hash = generatorHash()
+manifest = None
+if not opts.force:
+	manifest = loadManifest(manifest_file, gen_hash)
+if manifest == None:
+	manifest = {"generator" : gen_hash, "modules" : [], "files" : {}, "generated" : {}}
+
+file_states = {}
+stale_module_list = []
 for module in all_module_list:
-	
-	# for module name, remove slashes
-	module_name = module.replace("/","").replace("\\","")
-	
-	if os.environ.has_key("PARSER_VERBOSE"):
-		print ("Processing module \"%s\" dir %s"%(module_name,module))
+	if not manifest["generated"].has_key(module):
+		stale_module_list.append(module)
+		continue
+	for mod_file in manifest["generated"][module][0]:
+		if not file_states.has_key(mod_file):
+			file_states[mod_file] = fileState(mod_file, manifest["files"].get(mod_file))
+		if file_states[mod_file] == None or file_states[mod_file][2] != manifest["files"][mod_file][2]:
+			stale_module_list.append(module)
+			break
+
+outputs_exist = True
+for file in generated_files:
+	if not os.path.isfile(makefiledir + file):
+		outputs_exist = False
+
+if not stale_module_list and all_module_list == manifest["modules"] and outputs_exist:
+	print("Makefiles are up to date.")
+	sys.exit(0)
+
+# parse the changed modules, in parallel if there are several
 
-	try:
-		parser_list.append(parsers.mod_mk_parser.ModMkParser(module_name,module,True))
-	except parsers.mod_mk_parser.CfgParseError, ex:
-		print("**Error: " + ex.getErr() + "**")
-		for file in ["/ac_targets.mk","/bin_targets.mk","/vars.mk"]:
-			del_file = sys.argv[1] + file
+if os.environ.has_key("PARSER_VERBOSE"):
+	print("Parsing %d of %d modules"%(len(stale_module_list),len(all_module_list)))
+
+# read the builds list before the workers start so they share it
+parsers.mod_mk_parser.getBuildTargets()
+
+if opts.jobs > 1 and len(stale_module_list) > 1:
+	pool = multiprocessing.Pool(opts.jobs)
+	results = pool.map(parseModule, stale_module_list)
+	pool.close()
+	pool.join()
+else:
+	results = map(parseModule, stale_module_list)
+
+for module, (error, mod_files, vars_text, ac_targets_text, bin_targets_text) in zip(stale_module_list, results):
+	if error != None:
+		print("**Error: " + error + "**")
+		for file in generated_files:
+			del_file = makefiledir + file
 			if os.path.exists(del_file):
 				#print "Deleting %s" % del_file
 				os.unlink(del_file)
 		sys.exit(-1)
-
+	manifest["generated"][module] = (mod_files, vars_text, ac_targets_text, bin_targets_text)
+	for mod_file in mod_files:
+		file_states[mod_file] = fileState(mod_file, None)
 
 # generate variable makefile
-	
-file_descriptor = open("%s/vars.mk"%makefiledir,'w')
-
-# write front of makefile to file
-
-if os.environ.has_key("PARSER_VERBOSE"):
-	print ("Opening Makefile")
-
-file_descriptor.write("# *** Genearated Makefile ***\n# Modifications will be overwritten.\n\n")
-#file_descriptor.write("include $(BUILD_ROOT)/mk/makefiles/front.mk\n")
 
-# write variables
 if os.environ.has_key("PARSER_VERBOSE"):
 	print("Writing Makefile variables")
 
-for parser in parser_list:
-	try:
-		parser.generateVariables(file_descriptor)
-	except parsers.mod_mk_parser.CfgParseError, message:
-		print("**Error: " + message.getErr() + "**")
-		sys.exit(-1)
-		
-file_descriptor.close()
+# write front of makefile to file
+vars_text = ["# *** Genearated Makefile ***\n# Modifications will be overwritten.\n\n"]
+#vars_text.append("include $(BUILD_ROOT)/mk/makefiles/front.mk\n")
+for module in all_module_list:
+	vars_text.append(manifest["generated"][module][1])
+writeFile(makefiledir + "/vars.mk", "".join(vars_text))
 
 # generate ac and binary targets
 
-ac_targets_file_descriptor = open("%s/ac_targets.mk"%makefiledir,'w')
-bin_targets_file_descriptor = open("%s/bin_targets.mk"%makefiledir,'w')
-
-#  write overall section
-#file_descriptor.write("include $(BUILD_ROOT)/mk/makefiles/deployments.mk\n")
-#file_descriptor.write("include $(BUILD_ROOT)/mk/makefiles/middle.mk\n")
-
-# write targets
-
 if os.environ.has_key("PARSER_VERBOSE"):
 	print("Writing Makefile targets")
-	
-for parser in parser_list:
-	try:
-		parser.generateTargets(ac_targets_file_descriptor,bin_targets_file_descriptor)
-	except parsers.mod_mk_parser.CfgParseError, message:
-		print("**Error: " + message.getErr() + "**")
-		sys.exit(-1)
 
-ac_targets_file_descriptor.close()
-bin_targets_file_descriptor.close()
+writeFile(makefiledir + "/ac_targets.mk", "".join([manifest["generated"][module][2] for module in all_module_list]))
+writeFile(makefiledir + "/bin_targets.mk", "".join([manifest["generated"][module][3] for module in all_module_list]))
+
+# only keep the modules and files still in use
+
+manifest["modules"] = all_module_list
+manifest["generated"] = dict([(module, manifest["generated"][module]) for module in all_module_list])
+manifest["files"] = {}
+for module in all_module_list:
+	for mod_file in manifest["generated"][module][0]:
+		manifest["files"][mod_file] = file_states[mod_file]
+saveManifest(manifest_file, manifest)
 
 print("Makefile generation complete.")
@@ -142,6 +142,24 @@ class CfgParseError:
     
 mod_make_cfg = "mod.mk"
 
+# Build target suffixes by builds file, so builds.mk is read once per process
+build_targets_cache = {}
+
+def getBuildTargets(builds_file = None):
+    """
+    Return the build target suffixes ("", "_LINUX", ...) listed in
+    mk/configs/builds/builds.mk.
+    """
+    if builds_file == None:
+        builds_file = os.environ["BUILD_ROOT"] + "/mk/configs/builds/builds.mk"
+    if not build_targets_cache.has_key(builds_file):
+        build_targets = ["",]
+        build_file_parser = parsers.variable_list_parser.VariableListParser(builds_file,":=")
+        for build in build_file_parser.getValList("BUILDS"):
+            build_targets += "_%s"%(build),
+        build_targets_cache[builds_file] = build_targets
+    return list(build_targets_cache[builds_file])
+
 class ModMkParser:
     
     
@@ -163,12 +181,8 @@ class ModMkParser:
         self.directory_string = directory.replace("/","_")
         self.directory = directory
         self.isModule = isModule # indicates whether this represents a module in the make system
-        self.build_targets = ["",]
-
         # read build_targets
-        build_file_parser = parsers.variable_list_parser.VariableListParser(os.environ["BUILD_ROOT"] + "/mk/configs/builds/builds.mk",":=")
-        for build in build_file_parser.getValList("BUILDS"):
-            self.build_targets += "_%s"%(build),
+        self.build_targets = getBuildTargets()
         # default to empty source lists so missing variables
         # are taken care of when makefile is generated.
         for target in self.build_targets:
@@ -340,6 +354,15 @@ class ModMkParser:
 
             self.subdir_parser_list.append(ModMkParser(self.module_name+subdir, directory+"/"+subdir,False))
                 
+    def getModFiles(self):
+        """
+        Return the mod.mk files this parser and its subdirectory parsers read.
+        """
+        mod_files = [self.mod_file_name]
+        for parser in self.subdir_parser_list:
+            mod_files += parser.getModFiles()
+        return mod_files
+
     def generateVariables(self, file_descriptor):
         
         # generate this module's variables
@@ -0,0 +1,99 @@
+#!/bin/env python
+#===============================================================================
+# NAME: run_file_crc_test.py
+#
+# DESCRIPTION: Nose tests of mk/bin/run_file_crc.py: the zlib based, streaming
+#              CRC must match the table driven CRC for any data and for any
+#              chunk size, and the batch mode cache must follow file changes.
+#
+# Copyright 2015, California Institute of Technology.
+# ALL RIGHTS RESERVED. U.S. Government Sponsorship acknowledged.
+#===============================================================================
+#
+import imp
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+
+script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bin", "run_file_crc.py")
+run_file_crc = imp.load_source("run_file_crc", script)
+
+
+def random_data(rand, size):
+    return "".join([chr(rand.randint(0, 255)) for i in range(size)])
+
+def reference_crc(data):
+    return run_file_crc.crc32(data, len(data), 0, 0)
+
+def write_file(directory, name, data):
+    filename = os.path.join(directory, name)
+    fd = open(filename, "wb")
+    fd.write(data)
+    fd.close()
+    return filename
+
+
+def random_data_test():
+    rand = random.Random(1)
+    for size in [0, 1, 2, 3, 4, 5, 255, 256, 1000, 4096, 65537]:
+        data = random_data(rand, size)
+        assert run_file_crc.crc32_update(data) == reference_crc(data)
+
+def continuation_test():
+    rand = random.Random(2)
+    first = random_data(rand, 300)
+    second = random_data(rand, 77)
+    last = run_file_crc.crc32(first, len(first), 0, 0)
+    expected = run_file_crc.crc32(second, len(second), last, len(first))
+    assert run_file_crc.crc32_update(second, run_file_crc.crc32_update(first)) == expected
+
+def chunk_boundaries_test():
+    rand = random.Random(3)
+    directory = tempfile.mkdtemp()
+    try:
+        for size in [0, 1, 63, 64, 65, 1000]:
+            data = random_data(rand, size)
+            filename = write_file(directory, "data%d.bin" % size, data)
+            for chunk_size in [1, 2, 3, 7, 63, 64, 65, size + 1, run_file_crc.CHUNK_SIZE]:
+                assert run_file_crc.file_crc(filename, chunk_size) == reference_crc(data)
+    finally:
+        shutil.rmtree(directory)
+
+def cache_test():
+    directory = tempfile.mkdtemp()
+    try:
+        filename = write_file(directory, "image.bin", "flight image")
+        cache_file = os.path.join(directory, "crc.cache")
+        cache = run_file_crc.CrcCache(cache_file)
+        assert cache.crc(filename) == reference_crc("flight image")
+        cache.save()
+        cache = run_file_crc.CrcCache(cache_file)
+        assert cache.crc(filename) == reference_crc("flight image")
+        assert not cache.changed
+        # A new size and modification time is a new key
+        write_file(directory, "image.bin", "new flight image")
+        os.utime(filename, (1000, 1000))
+        assert cache.crc(filename) == reference_crc("new flight image")
+        assert cache.changed
+    finally:
+        shutil.rmtree(directory)
+
+def batch_test():
+    rand = random.Random(4)
+    directory = tempfile.mkdtemp()
+    try:
+        files = []
+        for n in range(3):
+            data = random_data(rand, 100 * n)
+            files.append((write_file(directory, "bin%d" % n, data), data))
+        cache_file = os.path.join(directory, "crc.cache")
+        subprocess.check_call([sys.executable, script, "-b", "-c", cache_file] + [f for (f, data) in files],
+                              stdout=open(os.devnull, "w"))
+        for (filename, data) in files:
+            assert open(filename + ".crc").read() == "0x%08X\n" % reference_crc(data)
+        assert os.path.isfile(cache_file)
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,63 @@
+#!/bin/env python
+#===============================================================================
+# NAME: sloc_test.py
+#
+# DESCRIPTION: Nose tests of the C/C++ line counter of mk/bin/sloc.py: comments
+#              and literals spanning lines must keep every physical line.
+#
+# Copyright 2015, California Institute of Technology.
+# ALL RIGHTS RESERVED. U.S. Government Sponsorship acknowledged.
+#===============================================================================
+#
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bin", "sloc.py")
+
+
+def ncsl_stats(name, text):
+    # runs "sloc.py ncsl" on a file with text, returns its ncsl, sloc, comments, semis
+    directory = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(directory, name)
+        fd = open(filename, "w")
+        fd.write(text)
+        fd.close()
+        env = dict(os.environ)
+        env["BUILD_ROOT"] = directory
+        output = subprocess.Popen([sys.executable, script, "-j", "1", "ncsl", filename],
+                                  stdout=subprocess.PIPE, env=env).communicate()[0]
+    finally:
+        shutil.rmtree(directory)
+    fields = output.splitlines()[0].split()
+    assert fields[4] == name
+    return tuple([int(field) for field in fields[0:4]])
+
+
+def comments_test():
+    text = ("// line comment\n"
+            "int a; /* block\n"
+            "   comment; */\n"
+            "\n"
+            "int b;\n")
+    assert ncsl_stats("comments.cpp", text) == (5, 2, 3, 2)
+
+def continued_string_test():
+    text = ("#include <stdio.h>\n"
+            "\n"
+            "int main() {\n"
+            "    const char* s = \"abc\\\n"
+            "def;\";\n"
+            "    // comment\n"
+            "    printf(\"%s\\n\", s);\n"
+            "    return 0;\n"
+            "}\n")
+    assert ncsl_stats("continued.c", text) == (9, 7, 1, 3)
+
+def continued_char_test():
+    text = ("char c = '\\\n"
+            "x';\n")
+    assert ncsl_stats("char.c", text) == (2, 2, 0, 1)
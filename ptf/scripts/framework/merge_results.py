@@ -0,0 +1,127 @@
+# *******************************************************************************
+# * Copyright 2006, by the California Institute of Technology.
+# * ALL RIGHTS RESERVED. United States Government Sponsorship
+# * acknowledged. Any commercial use must be negotiated with the Office
+# * of Technology Transfer at the California Institute of Technology.
+# *
+# * This software may be subject to U.S. export control laws and
+# * regulations. By accepting this document, the user agrees to comply
+# * with all applicable U.S. export laws and regulations.  User has the
+# * responsibility to obtain export licenses,
+# * or other export authority as may be required before exporting such
+# * information to foreign countries or providing access to foreign
+# * persons.
+# *
+
+# Merges the output directories of runtests.py shards (--shard i/N) into one
+# output directory: the *.results_N directories are copied into it and the
+# Summary files are combined into one, in test list order.
+
+import sys
+import os
+import glob
+import optparse
+import shutil
+import time
+
+SEPARATOR = "******************"
+
+def read_summary(summary_file_path):
+	# returns a list of (test entry, results directory, summary lines) of the
+	# tests in a runtests Summary file
+	tests = []
+	summary_text = open(summary_file_path,'r').read()
+	for block in summary_text.split(SEPARATOR + "\n\n"):
+		lines = block.splitlines(True)
+		if len(lines) < 3:
+			continue
+		dirname = None
+		for line in lines:
+			if line.startswith("Test standard output in: "):
+				dirname = os.path.dirname(line[len("Test standard output in: "):].strip())
+		if dirname == None or dirname.rfind(".results_") == -1:
+			print "Badly formed test summary in %s:\n%s"%(summary_file_path,block)
+			sys.exit(-1)
+		entry = int(dirname[dirname.rfind(".results_") + len(".results_"):])
+		tests.append((entry,dirname,lines))
+	return tests
+
+def status_line(lines):
+	# the PASSED/FAILED/KILLED line follows the start time and ENV files lines
+	for n in range(len(lines)):
+		if lines[n].startswith("Test start time: "):
+			n += 1
+			if n < len(lines) and lines[n].startswith("ENV files: "):
+				n += 1
+			if n < len(lines):
+				return lines[n].rstrip("\n")
+	return None
+
+parser = optparse.OptionParser(usage="%prog [options] shard_output_dir...")
+parser.add_option("-o",default=None,dest="output_dir",help="Merged output directory. Must not exist.")
+parser.add_option("-q",action="store_true",dest="quiet",help="Run with minimal output")
+
+(options,shard_dirs) = parser.parse_args()
+
+if options.output_dir == None or len(shard_dirs) == 0:
+	parser.error("An output directory and shard output directories are required")
+
+output_dir = os.path.abspath(options.output_dir)
+if os.path.isdir(output_dir):
+	print("Destination output directory already exists!")
+	sys.exit(-1)
+
+tests = {}
+for shard_dir in shard_dirs:
+	summary_files = sorted(glob.glob(shard_dir + "/Summary-*"))
+	if len(summary_files) == 0:
+		print "No Summary file in %s"%shard_dir
+		sys.exit(-1)
+	# the last summary, if runtests was run more than once
+	for (entry,dirname,lines) in read_summary(summary_files[-1]):
+		if tests.has_key(entry):
+			print "Test %d is in shards %s and %s"%(entry,tests[entry][0],shard_dir)
+			sys.exit(-1)
+		tests[entry] = (shard_dir,dirname,lines)
+
+os.makedirs(output_dir,0755)
+summary_file_path = output_dir + "/Summary-%s"%time.strftime("%Y-%m-%d-%H-%M-%S",time.gmtime())
+summary_file = open(summary_file_path,'w')
+
+a_test_failed = False
+entries = sorted(tests.keys())
+for entry in entries:
+	(shard_dir,dirname,lines) = tests[entry]
+	# results directory of the test in its shard, found from the shard directory if it moved
+	shard_results = os.path.join(shard_dir,os.path.basename(dirname))
+	new_dirname = output_dir + "/" + os.path.basename(dirname)
+	if os.path.isdir(shard_results):
+		shutil.copytree(shard_results,new_dirname,True)
+	elif options.quiet == None:
+		print "Results directory %s not found"%shard_results
+	for line in lines:
+		if line.startswith("Test standard output in: ") or line.startswith("Test standard error in: "):
+			line = line.replace(dirname,new_dirname)
+		summary_file.write(line)
+	summary_file.write(SEPARATOR + "\n\n")
+
+	status = status_line(lines)
+	print "[%d] %s"%(entry,status)
+	if status == None or status.rstrip()[-6:] != "PASSED":
+		a_test_failed = True
+
+summary_file.close()
+
+# tests missing from all shards, e.g. after an interrupt
+missing = []
+if entries:
+	missing = [entry for entry in range(entries[-1] + 1) if not tests.has_key(entry)]
+if missing:
+	print "Missing tests: %s"%" ".join([str(entry) for entry in missing])
+	a_test_failed = True
+
+if options.quiet == None:
+	print "Merged %d tests from %d shards into %s"%(len(entries),len(shard_dirs),output_dir)
+
+if a_test_failed:
+	sys.exit(1)
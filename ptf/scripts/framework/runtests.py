@@ -23,6 +23,7 @@ import xml.sax
 import commands
 import scripts.helpers.parsers.env_file_parser
 import scripts.helpers.process_helper
+import scripts.framework.test_scheduler
 import time
 import signal
 import socket
@@ -49,11 +50,26 @@ parser.add_option("-a",default="nogds",dest="gds",help="Set gds program.")
 parser.add_option("-d",default="FSW", dest="deployment",help="Specify a deployment")
 parser.add_option("-p",default=None, dest="python_debug",help="Debug Python")
 parser.add_option("-q",action="store_true", dest="quiet",help="Run with minimal output")
+parser.add_option("-j",default=1,type="int",dest="jobs",help="Number of tests to run at the same time. Longest tests, by the durations in the stats file, start first.")
+parser.add_option("-T",default=None,type="float",dest="timeout",help="Kill tests running longer than this many seconds. A suite entry can set its own with ENV(TEST_TIMEOUT=seconds). Without either, TEST_TIMEOUT in the environment is used.")
+parser.add_option("--shard",default=None,dest="shard",help="Run only shard i/N (1 <= i <= N) of the tests, split by the durations in the stats file. Shards must be started with the same stats file contents.")
+parser.add_option("--stats-file",default=None,dest="stats_file",help="Read the test durations from this file instead of HOST_STAT_FILE.")
 
 # stash arguments
 	
 (options,arg) = parser.parse_args(sys.argv)
 
+# check shard
+shard_index = shard_count = None
+if options.shard != None:
+	try:
+		(shard_index,shard_count) = [int(val) for val in options.shard.split("/")]
+	except ValueError:
+		shard_index = 0
+	if shard_index < 1 or shard_index > shard_count:
+		print "Bad shard %s. Should be i/N with 1 <= i <= N."%options.shard
+		sys.exit(-1)
+
 args = "target=" + options.target + " compiler=" + options.compiler + " simulator=" + options.simulator + " master=" + options.master + " gds=" + options.gds
 
 # only keep environment variables we want to keep
@@ -68,6 +84,9 @@ args = "target=" + options.target + " compiler=" + options.compiler + " simulato
 if (options.session_id == None):
 	print "Generating session id."
 	session_id = os.getenv("USER") + "--" + time.strftime("%Y-%m-%d-%H-%M-%S",time.gmtime())
+	if shard_count != None:
+		# shards started together get different output directories
+		session_id += "-shard%dof%d"%(shard_index,shard_count)
 	print "Session id: " + session_id
 else:
 	session_id = options.session_id
@@ -287,30 +306,23 @@ for arg in sys.argv:
 			
 			
 		
-# store current directory
-current_dir = os.path.abspath(os.curdir)
-
 # run tests
 
-# register signal handler for when user issues SIGINT (i.e. hits Ctrl-C)
+scheduler = scripts.framework.test_scheduler.Scheduler(options.jobs,os.environ.get("HOST_PORT_LOCK_DIR"))
 
-current_test_process = None
+# register signal handler for when user issues SIGINT (i.e. hits Ctrl-C)
 
 def sighandler(signum, frame):
 	if signum == signal.SIGINT:
-		if current_test_process:
-			print "Runtests Received SIGINT! Killing current test " + testname
-			current_test_process.kill()
-			current_test_process.wait()
-			raise "Exiting due to SIGINT."
+		if scheduler.running:
+			print "Runtests Received SIGINT! Killing current tests " + " ".join([run.testname for run in scheduler.running])
+		scheduler.interrupt()
 		
 	
 signal.signal(signal.SIGINT, sighandler)
 
 a_test_failed = False
 
-test_entry = 0
-
 os.makedirs(output_dir,0755)
 summary_file_path = output_dir + "/Summary-%s"%time.strftime("%Y-%m-%d-%H-%M-%S",time.gmtime())
 summary_file = open(summary_file_path,'w')
@@ -320,92 +332,120 @@ if os.environ.has_key("TEST_ARCHIVE_DIR"):
 	archive_dir =  os.environ["TEST_ARCHIVE_DIR"] + "/" + os.path.split(output_dir)[1]
 	os.makedirs(archive_dir,0755)
 
+# set up the environment and command of each test; tests do not change the runtests environment or directory
+
+run_list = []
+test_entry = 0
+
 for test in test_list:
 	(testdesc, script, envlist,envValList) = test
 	testname = os.path.splitext(os.path.basename(script))[0]
-	os.environ["TSTDIR"] = os.path.split(script)[0]
 	dirname = "%s/%s.results_%d" % (output_dir,testname,test_entry)
-		
-	os.environ["TSTOUTDIR"] = dirname
-	if options.quiet == None:
-		print "Making directory " + dirname
-	os.makedirs(dirname)
+	# read in environment file, if specified
+	new_env = {}
+	new_env["TSTDIR"] = os.path.split(script)[0]
+	new_env["TSTOUTDIR"] = dirname
 	# make fake home directory
 	#os.makedirs(dirname + "/FAKE_HOME")
 	# set home directory to location
-	#os.environ["HOME"]  = dirname + "/FAKE_HOME"
-	# change to output directory and run
-	os.chdir(dirname)
-	if options.quiet == None:
-		print "******************\n" + testdesc + "\n******************"
-		print "Test standard output in: " + dirname + "/" + testname + ".stdout" 
-		print "Test standard error in: " + dirname + "/" + testname + ".stderr" 
-
-	summary_file.write("******************\n" + testdesc + "\n******************\n")
-	summary_file.write("Script: %s\n"%script)	
-	summary_file.write("Test standard output in: " + dirname + "/" + testname + ".stdout\n")	
-	summary_file.write("Test standard error in: " + dirname + "/" + testname + ".stderr\n")
-	
-	open("test_desc.txt",'w').write("Test Description: %s\n"%testdesc)
+	#new_env["HOME"]  = dirname + "/FAKE_HOME"
+	if envlist != None:
+		for envfile in envlist:
+			if os.path.isfile(envfile) == False:
+				print "Suite ENV config file %s for script %s not found."%(envfile,script)
+				sys.exit(-1)
+			# read env file into environment
+			scripts.helpers.parsers.env_file_parser.EnvFileReader().read_file(envfile,new_env)
+	if envValList != None:
+		for (var,value) in envValList:
+			new_env[var] = value
+
 	# Check for Python files
 	(base,ext) = os.path.splitext(script)
 	
+	executable = script
 	test_args = ()
 	
 	if ext == ".py":
 		test_args = (script,)
 		if options.python_debug == None:
 			# run normal python
-			script = os.environ["HOST_PYTHON"]
+			executable = os.environ["HOST_PYTHON"]
 		else:
 			# run idle
-			script = os.environ["HOST_PYTHON_IDLE"]
-	
-	start_time = time.strftime("%Y-%m-%d-%H-%M-%S",time.gmtime())
-	summary_file.write("Test start time: %s\n"%start_time)
-	current_test_process = scripts.helpers.process_helper.BackgroundProcess()
-	# read in environment file, if specified
-	new_env = {}
-	if envlist != None:
-		summary_file.write("ENV files: %s\n"%" ".join(envlist))
-		for envfile in envlist:
-			if os.path.isfile(envfile) == False:
-				print "Suite ENV config file %s for script %s not found."%(envfile,base + ext)
-				sys.exit(-1)
-			# read env file into environment
-			scripts.helpers.parsers.env_file_parser.EnvFileReader().read_file(envfile,new_env)
-	if envValList != None:
-		for (var,value) in envValList:
-			new_env[var] = value
-	
-	summary_file.flush()	
-	current_test_process.start(script,test_args,testname + ".stdout",testname + ".stderr",new_env)
-	status = current_test_process.wait()
-	end_time = time.strftime("%Y-%m-%d-%H-%M-%S",time.gmtime())
+			executable = os.environ["HOST_PYTHON_IDLE"]
+
+	# the suite entry's timeout, then -T, then TEST_TIMEOUT of the runtests environment
+	timeout = None
+	if new_env.has_key("TEST_TIMEOUT"):
+		timeout = float(new_env["TEST_TIMEOUT"])
+	elif options.timeout != None:
+		timeout = options.timeout
+	elif os.environ.has_key("TEST_TIMEOUT"):
+		timeout = float(os.environ["TEST_TIMEOUT"])
+
+	run = scripts.framework.test_scheduler.TestRun(test_entry,testdesc,script,executable,test_args,dirname,new_env,timeout)
+	run.envlist = envlist
+	run_list.append(run)
+	test_entry += 1
+
+if options.stats_file != None:
+	durations = scripts.framework.test_scheduler.read_durations(options.stats_file)
+else:
+	durations = scripts.framework.test_scheduler.read_durations(os.environ.get("HOST_STAT_FILE"))
+
+# the results directories keep the test list numbers, so shard results can be merged
+if shard_count != None:
+	run_list = scripts.framework.test_scheduler.shard(run_list,shard_index,shard_count,durations)
+	print "Shard %d/%d: %d of %d tests"%(shard_index,shard_count,len(run_list),test_entry)
+
+if options.jobs > 1:
+	run_list = scripts.framework.test_scheduler.longest_first(run_list,durations)
+
+def test_started(run):
+	if options.quiet == None:
+		print "Making directory " + run.dirname
+		print "******************\n" + run.desc + "\n******************"
+		print "Test standard output in: " + run.stdout_file 
+		print "Test standard error in: " + run.stderr_file 
+
+# summaries of finished tests waiting for the tests before them in the test list
+summaries = {}
+next_summary = 0
+
+for run in scheduler.run(run_list,test_started):
+	summary = "******************\n" + run.desc + "\n******************\n"
+	summary += "Script: %s\n"%run.script
+	summary += "Test standard output in: " + run.stdout_file + "\n"
+	summary += "Test standard error in: " + run.stderr_file + "\n"
+	summary += "Test start time: %s\n"%run.start_time
+	if run.envlist != None:
+		summary += "ENV files: %s\n"%" ".join(run.envlist)
+
+	status = run.status
 	if status == None:
 		outcome = "killed"
-		print "[%d] %-60.60s%30.30s"%(test_entry,testdesc,"KILLED")
-		summary_file.write("%-60.60s%30.30s\n"%(testdesc,"KILLED"))
+		print "[%d] %-60.60s%30.30s"%(run.entry,run.desc,"KILLED")
+		summary += "%-60.60s%30.30s\n"%(run.desc,"KILLED")
 		a_test_failed = True;
-		break
 	elif status == 0:
 		outcome = "passed"
-		print "[%d] %-60.60s%30.30s"%(test_entry,testdesc,bcolors.GREEN + "PASSED" + bcolors.ENDC)
-		summary_file.write("%-60.60s%30.30s\n"%(testdesc,"PASSED"))
+		print "[%d] %-60.60s%30.30s"%(run.entry,run.desc,bcolors.GREEN + "PASSED" + bcolors.ENDC)
+		summary += "%-60.60s%30.30s\n"%(run.desc,"PASSED")
 	else:
 		outcome = "failed"
 		# search for description of failure
-		if os.path.isfile("status.txt"):
-			status_text  = open("status.txt",'r').readline().strip()
+		if os.path.isfile(run.dirname + "/status.txt"):
+			status_text  = open(run.dirname + "/status.txt",'r').readline().strip()
 		else:
 			status_text = bcolors.RED + "FAILED" + bcolors.ENDC
 			
 		if options.quiet == None:
-#			print testname + " **FAILED**. Status = " + str(status)
-			print "%-60.60s%30.30s"%(testdesc,status_text)
+#			print run.testname + " **FAILED**. Status = " + str(status)
+			print "%-60.60s%30.30s"%(run.desc,status_text)
 		else: 
-			print "[%d] %-60.60s%30.30s"%(test_entry,testdesc,status_text)
-		summary_file.write("%-60.60s%30.30s\n"%(testdesc,status_text))
+			print "[%d] %-60.60s%30.30s"%(run.entry,run.desc,status_text)
+		summary += "%-60.60s%30.30s\n"%(run.desc,status_text)
 		
 		a_test_failed = True;
 	if options.quiet == None:
@@ -416,35 +456,42 @@ for test in test_list:
 		# append to current file
 		try:
 			stat_file = open(os.environ["HOST_STAT_FILE"],'a')
-			stat_file.write(testname + "\t" + outcome + "\t" + start_time + "\t" + end_time + "\t" + os.environ['USER'] + "\t" + socket.gethostname() + "\t\"" + args + "\"\n")
+			stat_file.write(run.testname + "\t" + outcome + "\t" + run.start_time + "\t" + run.end_time + "\t" + os.environ['USER'] + "\t" + socket.gethostname() + "\t\"" + args + "\"\t" + run.desc + "\n")
 			stat_file.close()
 		except:
 			print "Unable to write stats file " + os.environ["HOST_STAT_FILE"]
 			
 	if os.environ.has_key("TEST_ARCHIVE_DIR"):
-		os.chdir(output_dir)
 		# copy test data to archive directory
-		cmd = "rsync -aHx %s %s"%(dirname,archive_dir)
+		cmd = "rsync -aHx %s %s"%(run.dirname,archive_dir)
 		# print cmd
 		(status,output) = commands.getstatusoutput(cmd)
 		if status != 0:
 			print "Unable to archive test directory! %s"%output
 		else:
-			summary_file.write("Archived to %s\n"%archive_dir)
+			summary += "Archived to %s\n"%archive_dir
 			
 		
 		if os.environ.has_key("TEST_ARCHIVE_REMOVE_SOURCE"):
 			# Only remove source if arhcive worked
 			if os.environ["TEST_ARCHIVE_REMOVE_SOURCE"] and status == 0:
-				rm_cmd = "rm -rf %s"%dirname
+				rm_cmd = "rm -rf %s"%run.dirname
 				(status,output) = commands.getstatusoutput(rm_cmd)
 				if status != 0:
-					print "Error deleting source directory %s: %s"%(dirname,output)
+					print "Error deleting source directory %s: %s"%(run.dirname,output)
 		
-	summary_file.write("******************\n\n")
+	summary += "******************\n\n"
+
+	# write the summaries in test list order
+	summaries[run.entry] = summary
+	while summaries.has_key(next_summary):
+		summary_file.write(summaries.pop(next_summary))
+		next_summary += 1
 	summary_file.flush()	
-			
-	test_entry += 1
+
+# after an interrupt, write the summaries of the tests that ran
+for entry in sorted(summaries.keys()):
+	summary_file.write(summaries[entry])
 
 summary_file.close()
 
@@ -453,13 +500,7 @@ if os.environ.has_key("TEST_ARCHIVE_DIR"):
 	cmd = "cp %s %s"%(summary_file_path,archive_dir)
 	(status,output) = commands.getstatusoutput(cmd)
 	if status != 0:
-		print "Error copying summary file to %s: %s"%(dirname,output)
-
-current_test_process = None
+		print "Error copying summary file to %s: %s"%(archive_dir,output)
 
-os.chdir(current_dir)
-
-if a_test_failed:
+if a_test_failed or scheduler.interrupted:
 	sys.exit(1)
-
-
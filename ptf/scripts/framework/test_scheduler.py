@@ -0,0 +1,255 @@
+# *******************************************************************************
+# * Copyright 2006, by the California Institute of Technology.
+# * ALL RIGHTS RESERVED. United States Government Sponsorship
+# * acknowledged. Any commercial use must be negotiated with the Office
+# * of Technology Transfer at the California Institute of Technology.
+# *
+# * This software may be subject to U.S. export control laws and
+# * regulations. By accepting this document, the user agrees to comply
+# * with all applicable U.S. export laws and regulations.  User has the
+# * responsibility to obtain export licenses,
+# * or other export authority as may be required before exporting such
+# * information to foreign countries or providing access to foreign
+# * persons.
+# *
+
+# Runs the tests of runtests.py, several at a time. Each test runs in its own
+# results directory with its own environment, gets a free TCP port in
+# TEST_PORT and is killed if it runs longer than its timeout.
+
+import os
+import errno
+import time
+import calendar
+import signal
+import socket
+import scripts.helpers.process_helper
+
+# time format of the test start and end times in the stats file
+STAT_TIME_FORMAT = "%Y-%m-%d-%H-%M-%S"
+
+def read_durations(stat_file):
+	# returns the mean duration in seconds of each test in the stats file, by
+	# test description, or by test name for lines written without one
+	totals = {}
+	if stat_file == None or not os.path.isfile(stat_file):
+		return {}
+	try:
+		stat_lines = open(stat_file,'r').readlines()
+	except IOError:
+		return {}
+	for line in stat_lines:
+		fields = line.rstrip("\n").split("\t")
+		if len(fields) < 4:
+			continue
+		try:
+			start = calendar.timegm(time.strptime(fields[2],STAT_TIME_FORMAT))
+			end = calendar.timegm(time.strptime(fields[3],STAT_TIME_FORMAT))
+		except ValueError:
+			continue
+		if len(fields) > 7:
+			key = fields[7]
+		else:
+			key = fields[0]
+		(total,count) = totals.get(key,(0,0))
+		totals[key] = (total + end - start,count + 1)
+	durations = {}
+	for key in totals.keys():
+		(total,count) = totals[key]
+		durations[key] = float(total) / count
+	return durations
+
+def longest_first(runs, durations):
+	# orders runs by decreasing recorded duration; runs without a recorded
+	# duration go first, since they may be the longest
+	def key(run):
+		if durations.has_key(run.desc):
+			return (1,-durations[run.desc],run.entry)
+		if durations.has_key(run.testname):
+			return (1,-durations[run.testname],run.entry)
+		return (0,0,run.entry)
+	return sorted(runs,key=key)
+
+def shard(runs, index, count, durations):
+	# splits runs into count shards of about the same total recorded duration
+	# and returns shard index (1 to count), in test list order. Every shard
+	# must be computed from the same durations.
+	def duration(run):
+		if durations.has_key(run.desc):
+			return durations[run.desc]
+		if durations.has_key(run.testname):
+			return durations[run.testname]
+		return None
+	known = [duration(run) for run in runs if duration(run) != None]
+	if known:
+		default = sum(known) / len(known)
+	else:
+		default = 1.0
+	def weight(run):
+		if duration(run) == None:
+			return default
+		return duration(run)
+	loads = [0.0] * count
+	shards = [[] for i in range(count)]
+	# longest first, each to the least loaded shard
+	for run in sorted(runs,key=lambda run: (-weight(run),run.entry)):
+		i = loads.index(min(loads))
+		loads[i] += weight(run)
+		shards[i].append(run)
+	return sorted(shards[index - 1],key=lambda run: run.entry)
+
+class PortAllocator(object):
+	# hands out free TCP ports, never the same one to two running tests. With a
+	# lock_dir, each port is also reserved by a file in it, so that tests run by
+	# other runtests processes (shards) do not get the same port
+	def __init__(self, lock_dir = None):
+		self.ports = set()
+		self.lock_dir = lock_dir
+		if lock_dir != None and not os.path.isdir(lock_dir):
+			try:
+				os.makedirs(lock_dir)
+			except OSError:
+				# made by another runtests
+				pass
+
+	def allocate(self):
+		while True:
+			sock = socket.socket(socket.AF_INET,socket.SOCK_STREAM)
+			sock.bind(("",0))
+			port = sock.getsockname()[1]
+			sock.close()
+			if not port in self.ports and self.reserve(port):
+				self.ports.add(port)
+				return port
+
+	def reserve(self, port):
+		if self.lock_dir == None:
+			return True
+		lock_file = "%s/%d"%(self.lock_dir,port)
+		try:
+			fd = os.open(lock_file,os.O_WRONLY | os.O_CREAT | os.O_EXCL,0644)
+		except OSError:
+			# reserved; remove the file if its process is gone, and try another port
+			try:
+				os.kill(int(open(lock_file,'r').read()),0)
+			except (IOError, ValueError):
+				pass
+			except OSError, e:
+				if e.errno == errno.ESRCH:
+					try:
+						os.unlink(lock_file)
+					except OSError:
+						pass
+			return False
+		os.write(fd,"%d"%os.getpid())
+		os.close(fd)
+		return True
+
+	def release(self, port):
+		self.ports.discard(port)
+		if self.lock_dir != None:
+			try:
+				os.unlink("%s/%d"%(self.lock_dir,port))
+			except OSError:
+				pass
+
+class TestRun(object):
+	# one test of the test list: the script runs as executable with args in
+	# dirname, with env added to the environment
+	def __init__(self, entry, desc, script, executable, args, dirname, env, timeout):
+		self.entry = entry
+		self.desc = desc
+		self.script = script
+		self.testname = os.path.splitext(os.path.basename(script))[0]
+		self.executable = executable
+		self.args = args
+		self.dirname = dirname
+		self.stdout_file = dirname + "/" + self.testname + ".stdout"
+		self.stderr_file = dirname + "/" + self.testname + ".stderr"
+		self.env = env
+		self.timeout = timeout
+		self.process = None
+		self.port = None
+		self.start_time = None
+		self.end_time = None
+		self.started = None
+		self.kill_time = None
+		self.timed_out = False
+		self.status = None
+
+	def start(self, port):
+		os.makedirs(self.dirname)
+		open(self.dirname + "/test_desc.txt",'w').write("Test Description: %s\n"%self.desc)
+		self.port = port
+		if port != None:
+			self.env["TEST_PORT"] = str(port)
+		self.start_time = time.strftime(STAT_TIME_FORMAT,time.gmtime())
+		self.started = time.time()
+		self.process = scripts.helpers.process_helper.BackgroundProcess()
+		self.process.start(self.executable,self.args,self.stdout_file,self.stderr_file,self.env,self.dirname,True)
+
+	def poll(self):
+		# returns True once the test has finished, setting status
+		(finished,status) = self.process.poll()
+		if not finished:
+			return False
+		self.end_time = time.strftime(STAT_TIME_FORMAT,time.gmtime())
+		if self.kill_time != None:
+			# killed for a timeout or an interrupt
+			self.status = None
+		else:
+			self.status = status
+		return True
+
+	def kill(self, sig=signal.SIGINT):
+		if self.kill_time == None:
+			self.kill_time = time.time()
+		self.process.kill(sig)
+
+class Scheduler(object):
+	# runs TestRuns, at most jobs at a time, in the given order
+	def __init__(self, jobs = 1, port_lock_dir = None, kill_grace = 10.0, poll_period = 0.05):
+		self.jobs = jobs
+		self.kill_grace = kill_grace
+		self.poll_period = poll_period
+		self.ports = PortAllocator(port_lock_dir)
+		self.interrupted = False
+		self.running = []
+
+	def interrupt(self):
+		# called from a signal handler: kill the running tests, start no more
+		self.interrupted = True
+
+	def run(self, runs, on_start = None):
+		# generator of the finished runs, in order of completion. A test killed
+		# by a timeout or an interrupt has status None.
+		pending = list(runs)
+		while pending or self.running:
+			if self.interrupted:
+				pending = []
+				for run in self.running:
+					if run.kill_time == None:
+						run.kill()
+			while pending and len(self.running) < self.jobs:
+				run = pending.pop(0)
+				run.start(self.ports.allocate())
+				self.running.append(run)
+				if on_start != None:
+					on_start(run)
+			finished = []
+			for run in self.running:
+				if run.poll():
+					finished.append(run)
+				elif run.kill_time != None:
+					# the test did not stop on SIGINT
+					if time.time() - run.kill_time > self.kill_grace:
+						run.process.kill(signal.SIGKILL)
+				elif run.timeout != None and time.time() - run.started > run.timeout:
+					run.timed_out = True
+					run.kill()
+			for run in finished:
+				self.running.remove(run)
+				self.ports.release(run.port)
+				yield run
+			if not finished:
+				time.sleep(self.poll_period)
@@ -12,8 +12,11 @@ class BackgroundProcess(object):
 
 	def __init__(self):
 		self.pid = 0
+		self.process = None
 
-	def start(self, executable, arguments, stdout_file, stderr_file, env = None):
+	def start(self, executable, arguments, stdout_file, stderr_file, env = None, cwd = None, new_group = False):
+		# cwd: directory to run in, instead of the current directory
+		# new_group: run in a new process group, so kill() stops its children too
 
 		cmd = (executable,) + arguments
 		
@@ -29,7 +32,16 @@ class BackgroundProcess(object):
 				
 		stdoutfile = open(stdout_file,'w')
 		stderrfile = open(stderr_file,'w')
-		self.pid = subprocess.Popen(args=cmd, stdout=stdoutfile, stderr=stderrfile, env=new_env).pid
+		if new_group:
+			preexec_fn = os.setpgrp
+		else:
+			preexec_fn = None
+		# keep the Popen object: subprocess reaps the children of dropped ones
+		# when another process starts, and their status would be lost
+		self.process = subprocess.Popen(args=cmd, stdout=stdoutfile, stderr=stderrfile, env=new_env, cwd=cwd, preexec_fn=preexec_fn)
+		self.pid = self.process.pid
+		stdoutfile.close()
+		stderrfile.close()
 			
 	def kill(self, sig=signal.SIGINT):
 		try:
@@ -43,14 +55,17 @@ class BackgroundProcess(object):
 
 	def wait(self):
 		try:
-			(pid, rawstatus) = os.waitpid(self.pid,0)
-			assert pid == self.pid,"Process Helper: Returned PID != expected PID"
-			# mask and shift real status
-			status = (rawstatus & 0xFF00) >> 8
-			return status
+			return self.process.wait()
 		except:
 			print "Process %i already exited or interrupted." % self.pid
 			return None
+
+	def poll(self):
+		# returns (finished, status); status as for wait(), negative if the
+		# process was killed by a signal
+		if self.process.poll() == None:
+			return (False, None)
+		return (True, self.process.returncode)
 	
 class BackgroundProcessWithPipe(object):
 	def __init__(self):
@@ -0,0 +1,28 @@
+#!/dsw/Python-2.4.3r1_32/bin/python
+
+# Runs short tests several at a time with the runtests scheduler and checks
+# that each one finishes with its own exit status.
+
+import sys
+import shutil
+import tempfile
+import scripts.framework.test_scheduler
+
+work_dir = tempfile.mkdtemp()
+runs = []
+for entry in range(16):
+	args = ("-c","exit %d"%(entry % 4),)
+	runs.append(scripts.framework.test_scheduler.TestRun(entry,"Exit %d"%(entry % 4),"exit.sh","/bin/sh",args,
+		"%s/exit.results_%d"%(work_dir,entry),{},None))
+
+failed = False
+try:
+	for run in scripts.framework.test_scheduler.Scheduler(3).run(runs):
+		print "Test %d status %s"%(run.entry,run.status)
+		if run.status != run.entry % 4:
+			failed = True
+finally:
+	shutil.rmtree(work_dir)
+
+if failed:
+	sys.exit(1)